@@ -1,43 +1,89 @@
 from logging.config import fileConfig
 import os
-from sqlalchemy import engine_from_config
+from sqlalchemy import JSON, String, create_engine, text
 from sqlalchemy import pool
+from sqlalchemy.dialects.postgresql import JSONB
 
 from alembic import context
 
 from sqlmodel import SQLModel
 import sys
-sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from app.db import DATABASE_URL
 from app.models import *  # noqa: F401
+from app.sqltypes import JSONText
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
 config = context.config
 
 # Interpret the config file for Python logging.
-fileConfig(config.config_file_name)
+if config.config_file_name is not None and config.attributes.get("configure_logger", True):
+    fileConfig(config.config_file_name)
 
 target_metadata = SQLModel.metadata
 
 
+# Índices con sentido y NULLS LAST por columna (0009): Alembic no los puede comparar
+UNCOMPARED_INDEXES = {"ix_experience_feed", "ix_experience_year_feed"}
+
+
+def include_object(obj, name, type_, reflected, compare_to):
+    if type_ == "index" and name in UNCOMPARED_INDEXES:
+        return False
+    # La búsqueda la administra app/search.py, no los modelos: tabla FTS5 (SQLite) y
+    # columna search_vector con su índice GIN (PostgreSQL)
+    if type_ == "column" and name == "search_vector":
+        return False
+    if type_ == "index" and name.endswith("_search_vector"):
+        return False
+    return not (type_ == "table" and name.startswith("search_index"))
+
+
+def compare_type(context, inspected_column, metadata_column, inspected_type, metadata_type):
+    # JSONText es JSONB en PostgreSQL; en SQLite es texto JSON, así que la columna VARCHAR
+    # que creó la baseline es equivalente (SQLite no tiene un tipo JSON propio)
+    if isinstance(metadata_type, JSONText):
+        expected = JSONB if context.dialect.name == "postgresql" else (String, JSON)
+        return not isinstance(inspected_type, expected)
+    return None
+
+
+# Espera máxima por el lock de un ALTER en PostgreSQL: si hay transacciones largas sobre la
+# tabla, la migración falla (y se reintenta) en vez de dejar en cola las lecturas de la API
+MIGRATION_LOCK_TIMEOUT = os.getenv("MIGRATION_LOCK_TIMEOUT", "5s")
+
+
+def _url() -> str:
+    # alembic.ini no guarda credenciales: la URL sale de DATABASE_URL, igual que la API
+    return config.get_main_option("sqlalchemy.url") or DATABASE_URL
+
+
 def run_migrations_offline():
-    url = os.getenv("DATABASE_URL") or "postgresql://postgres:postgres@db:5432/portafolio"
-    context.configure(url=url, target_metadata=target_metadata, literal_binds=True)
+    context.configure(url=_url(), target_metadata=target_metadata, literal_binds=True, include_object=include_object,
+                      compare_type=compare_type)
 
     with context.begin_transaction():
         context.run_migrations()
 
 
 def run_migrations_online():
-    connectable = engine_from_config(
-        config.get_section(config.config_ini_section),
-        prefix="sqlalchemy.",
-        poolclass=pool.NullPool,
-    )
+    connectable = create_engine(_url(), poolclass=pool.NullPool)
 
     with connectable.connect() as connection:
-        context.configure(connection=connection, target_metadata=target_metadata)
+        if connection.dialect.name == "postgresql" and MIGRATION_LOCK_TIMEOUT:
+            connection.execute(text("SELECT set_config('lock_timeout', :value, false)"), {"value": MIGRATION_LOCK_TIMEOUT})
+            connection.commit()
+
+        # Una transacción por revisión: si una falla, las anteriores quedan aplicadas
+        context.configure(
+            connection=connection,
+            target_metadata=target_metadata,
+            include_object=include_object,
+            compare_type=compare_type,
+            transaction_per_migration=True,
+        )
 
         with context.begin_transaction():
             context.run_migrations()
@@ -0,0 +1,128 @@
+"""baseline: tablas originales del portafolio
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18
+
+Sobre una BD existente (creada con create_all o con los scripts migrate_*.py) no hace
+nada: cada tabla se crea solo si falta. Las columnas que agregaron después los scripts
+migrate_projects_v*/migrate_certs*/migrate_pro_forms las agrega 0002 sin recrear tablas.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from app.migrations import create_table_if_missing
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+TABLES = ["blog", "proyecto", "cliente", "cotizacion", "service", "profile",
+          "experience", "education", "timeline", "certification", "contact"]
+
+
+def upgrade():
+    create_table_if_missing(
+        op, "blog",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("title", sa.String(), nullable=False),
+        sa.Column("content", sa.String(), nullable=False),
+    )
+    create_table_if_missing(
+        op, "proyecto",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("title", sa.String(), nullable=False),
+        sa.Column("category", sa.String(), nullable=False),
+        sa.Column("status", sa.String(), nullable=False),
+        sa.Column("version", sa.String(), nullable=False),
+        sa.Column("description", sa.String(), nullable=False),
+        sa.Column("image_url", sa.String(), nullable=False),
+        sa.Column("demo_url", sa.String(), nullable=False),
+        sa.Column("repo_url", sa.String(), nullable=False),
+        sa.Column("stack", sa.String(), nullable=False),
+    )
+    create_table_if_missing(
+        op, "cliente",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("name", sa.String(), nullable=False),
+        sa.Column("role", sa.String(), nullable=True),
+        sa.Column("company", sa.String(), nullable=True),
+        sa.Column("testimonial", sa.String(), nullable=True),
+        sa.Column("email", sa.String(), nullable=True),
+        sa.Column("website", sa.String(), nullable=True),
+        sa.Column("image_url", sa.String(), nullable=True),
+    )
+    create_table_if_missing(
+        op, "cotizacion",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("nombre", sa.String(), nullable=False),
+        sa.Column("email", sa.String(), nullable=False),
+        sa.Column("telefono", sa.String(), nullable=True),
+        sa.Column("servicio", sa.String(), nullable=True),
+        sa.Column("mensaje", sa.String(), nullable=True),
+        sa.Column("status", sa.String(), nullable=True),
+        sa.Column("created_at", sa.String(), nullable=True),
+    )
+    create_table_if_missing(
+        op, "service",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("name", sa.String(), nullable=False),
+        sa.Column("description", sa.String(), nullable=True),
+    )
+    create_table_if_missing(
+        op, "profile",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("full_name", sa.String(), nullable=False),
+        sa.Column("title", sa.String(), nullable=False),
+        sa.Column("profile_image", sa.String(), nullable=True),
+        sa.Column("profile_video", sa.String(), nullable=True),
+    )
+    create_table_if_missing(
+        op, "experience",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("company", sa.String(), nullable=False),
+        sa.Column("position", sa.String(), nullable=False),
+        sa.Column("period", sa.String(), nullable=False),
+        sa.Column("description", sa.String(), nullable=True),
+        sa.Column("technologies", sa.String(), nullable=True),
+    )
+    create_table_if_missing(
+        op, "education",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("degree", sa.String(), nullable=False),
+        sa.Column("institution", sa.String(), nullable=False),
+        sa.Column("location", sa.String(), nullable=False),
+        sa.Column("start_year", sa.String(), nullable=False),
+        sa.Column("end_year", sa.String(), nullable=False),
+        sa.Column("certificate_url", sa.String(), nullable=True),
+    )
+    create_table_if_missing(
+        op, "timeline",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("year", sa.String(), nullable=False),
+        sa.Column("title", sa.String(), nullable=False),
+        sa.Column("description", sa.String(), nullable=False),
+    )
+    create_table_if_missing(
+        op, "certification",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("title", sa.String(), nullable=False),
+        sa.Column("issuer", sa.String(), nullable=False),
+        sa.Column("date", sa.String(), nullable=False),
+        sa.Column("credential_url", sa.String(), nullable=True),
+    )
+    create_table_if_missing(
+        op, "contact",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("email", sa.String(), nullable=False),
+        sa.Column("phone", sa.String(), nullable=True),
+        sa.Column("linkedin", sa.String(), nullable=True),
+        sa.Column("github", sa.String(), nullable=True),
+        sa.Column("location", sa.String(), nullable=True),
+    )
+
+
+def downgrade():
+    for table in reversed(TABLES):
+        op.drop_table(table)
@@ -0,0 +1,55 @@
+"""columnas agregadas por los scripts migrate_projects_v*, migrate_certs* y migrate_pro_forms
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18
+
+Esos scripts actualizaban el esquema con DROP TABLE proyecto + reseed (con downtime y
+pérdida de datos). Acá todas las columnas son nullable y sin default, así que en
+PostgreSQL el ADD COLUMN es solo un cambio de catálogo y la tabla sigue disponible. La galería (media) de los proyectos existentes se rellena en lotes a partir
+de image_url / video_url, como la armaban los seeds de migrate_projects_v3.
+"""
+import json
+from alembic import op
+import sqlalchemy as sa
+
+from app.migrations import add_column_if_missing, backfill
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+COLUMNS = {
+    # migrate_projects_v3 / v4_calendar / v5_client
+    "proyecto": ["video_url", "media", "deployment_date", "client_name"],
+    # migrate_certs / migrate_certs_v2
+    "certification": ["description", "icon", "level", "color", "badge"],
+    # migrate_pro_forms
+    "experience": ["location", "employment_type"],
+    "education": ["field_of_study", "description"],
+    # scripts/migrate_timeline
+    "timeline": ["category", "icon"],
+}
+
+
+def _project_media(row):
+    media = [{"type": "image", "url": row["image_url"]}] if row["image_url"] else []
+    if row["video_url"]:
+        media.append({"type": "video", "url": row["video_url"]})
+    return {"media": json.dumps(media)}
+
+
+def upgrade():
+    for table, columns in COLUMNS.items():
+        for column in columns:
+            add_column_if_missing(op, table, sa.Column(column, sa.String(), nullable=True))
+
+    backfill(op, "proyecto", ["image_url", "video_url"], _project_media, pending="media IS NULL")
+
+
+def downgrade():
+    for table, columns in COLUMNS.items():
+        with op.batch_alter_table(table) as batch:
+            for column in columns:
+                batch.drop_column(column)
@@ -0,0 +1,142 @@
+"""stack/media/technologies como JSONB con índices GIN, índice de categoría
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18
+
+En PostgreSQL no se usa ALTER COLUMN ... TYPE JSONB (reescribe la tabla con un lock
+exclusivo durante todo el cast). Para cada columna:
+
+1. se agrega `<columna>_jsonb` (nullable: solo catálogo) y un trigger que la completa en
+   cada INSERT/UPDATE mientras dura la migración;
+2. se completan en lotes las filas existentes, normalizando los textos que no son JSON;
+3. en una transacción corta se borra la columna vieja y se renombra la nueva. El NOT NULL
+   de stack se apoya en un CHECK validado antes, así que tampoco recorre la tabla.
+
+Los índices GIN se crean después, CONCURRENTLY. En SQLite las columnas ya son JSON
+(texto): solo se crean los índices (comunes, porque SQLite no tiene GIN).
+"""
+import json
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import JSONB
+
+from app.migrations import add_column_if_missing, backfill, create_index_if_missing, drop_index_if_exists
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+# (tabla, columna, valor por defecto si está vacía, NOT NULL)
+JSON_COLUMNS = [
+    ("proyecto", "stack", "[]", True),
+    ("proyecto", "media", "[]", False),
+    ("experience", "technologies", None, False),
+]
+
+
+def _normalize(value, default):
+    """Devuelve el texto como JSON válido (los arrays viejos a veces venían separados por coma)"""
+    if value is None or not value.strip():
+        return default
+    try:
+        json.loads(value)
+        return value
+    except ValueError:
+        return json.dumps([item.strip() for item in value.split(",") if item.strip()])
+
+
+def _converter(column, default):
+    def compute(row):
+        fixed = _normalize(row[column], default)
+        return {f"{column}_jsonb": json.loads(fixed)} if fixed is not None else None
+    return compute
+
+
+# Espacios que quita str.strip() en los textos que se ven en la práctica
+_WHITESPACE = "E' \\t\\n\\r'"
+
+
+def _sync_function(name, column, new, default):
+    """
+    Función del trigger con la misma normalización que _normalize: vacío -> default,
+    JSON válido tal cual, y si no, array de los elementos separados por coma (sin
+    espacios ni elementos vacíos). Así las filas que escribe la app durante el backfill
+    quedan igual que las que escribe el backfill.
+    """
+    value = f"btrim(NEW.{column}, {_WHITESPACE})"
+    empty = f"'{default}'::jsonb" if default is not None else "NULL"
+    items = (
+        f"SELECT btrim(item, {_WHITESPACE}) FROM unnest(string_to_array(NEW.{column}, ',')) "
+        f"WITH ORDINALITY AS t(item, position) WHERE btrim(item, {_WHITESPACE}) <> '' ORDER BY position"
+    )
+    return (
+        f"CREATE OR REPLACE FUNCTION {name}() RETURNS trigger AS $$ BEGIN "
+        f"IF NEW.{column} IS NULL OR {value} = '' THEN NEW.{new} := {empty}; "
+        f"ELSE BEGIN NEW.{new} := NEW.{column}::jsonb; "
+        f"EXCEPTION WHEN others THEN NEW.{new} := to_jsonb(ARRAY({items})); END; "
+        f"END IF; RETURN NEW; END $$ LANGUAGE plpgsql"
+    )
+
+
+def _column_type(bind, table, column):
+    return bind.execute(sa.text(
+        "SELECT data_type FROM information_schema.columns WHERE table_name = :t AND column_name = :c"
+    ), {"t": table, "c": column}).scalar()
+
+
+def _to_jsonb(bind, table, column, default, not_null):
+    new = f"{column}_jsonb"
+    sync = f"{table}_{column}_to_jsonb"
+    check = f"ck_{table}_{new}_not_null"
+
+    add_column_if_missing(op, table, sa.Column(new, JSONB(), nullable=True))
+    # Lo que la app escriba mientras corre el backfill también llega a la columna nueva.
+    # UPDATE OF: el propio backfill (que solo escribe la nueva) no lo dispara.
+    op.execute(_sync_function(sync, column, new, default))
+    op.execute(f"DROP TRIGGER IF EXISTS {sync} ON {table}")
+    op.execute(f"CREATE TRIGGER {sync} BEFORE INSERT OR UPDATE OF {column} ON {table} FOR EACH ROW EXECUTE FUNCTION {sync}()")
+
+    # backfill confirma lo anterior (trigger activo) y escribe en lotes, cada uno en su transacción
+    backfill(op, table, [column], _converter(column, default), pending=f"{new} IS NULL", types={new: JSONB()})
+
+    if not_null:
+        # NOT VALID no recorre la tabla; VALIDATE la recorre sin bloquear escrituras
+        op.execute(f"ALTER TABLE {table} DROP CONSTRAINT IF EXISTS {check}")
+        op.execute(f"ALTER TABLE {table} ADD CONSTRAINT {check} CHECK ({new} IS NOT NULL) NOT VALID")
+        with op.get_context().autocommit_block():
+            op.execute(f"ALTER TABLE {table} VALIDATE CONSTRAINT {check}")
+
+    # Intercambio: solo cambios de catálogo, en la transacción de la revisión
+    op.execute(f"DROP TRIGGER {sync} ON {table}")
+    op.execute(f"DROP FUNCTION {sync}()")
+    op.execute(f"ALTER TABLE {table} DROP COLUMN {column}")
+    op.execute(f"ALTER TABLE {table} RENAME COLUMN {new} TO {column}")
+    if not_null:
+        # PostgreSQL 12+ usa el CHECK validado y no vuelve a recorrer la tabla
+        op.execute(f"ALTER TABLE {table} ALTER COLUMN {column} SET NOT NULL")
+        op.execute(f"ALTER TABLE {table} DROP CONSTRAINT {check}")
+
+
+def upgrade():
+    bind = op.get_bind()
+    create_index_if_missing(op, "ix_proyecto_category", "proyecto", ["category"])
+
+    if bind.dialect.name == "postgresql":
+        for table, column, default, not_null in JSON_COLUMNS:
+            if _column_type(bind, table, column) != "jsonb":
+                _to_jsonb(bind, table, column, default, not_null)
+
+    create_index_if_missing(op, "ix_proyecto_stack", "proyecto", ["stack"], postgresql_using="gin")
+    create_index_if_missing(op, "ix_experience_technologies", "experience", ["technologies"], postgresql_using="gin")
+
+
+def downgrade():
+    bind = op.get_bind()
+    drop_index_if_exists(op, "ix_experience_technologies", "experience")
+    drop_index_if_exists(op, "ix_proyecto_stack", "proyecto")
+    if bind.dialect.name == "postgresql":
+        for table, column, _, _ in JSON_COLUMNS:
+            op.execute(f"ALTER TABLE {table} ALTER COLUMN {column} TYPE VARCHAR USING {column}::text")
+    drop_index_if_exists(op, "ix_proyecto_category", "proyecto")
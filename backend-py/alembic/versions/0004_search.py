@@ -0,0 +1,44 @@
+"""búsqueda full-text (search_vector + GIN en PostgreSQL, FTS5 en SQLite)
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18
+
+En PostgreSQL la columna se agrega sin reescribir la tabla y la mantiene un trigger
+(app/search.py); las filas existentes se completan en lotes y el índice GIN se crea
+CONCURRENTLY, así que la tabla sigue aceptando escrituras durante la migración.
+"""
+from alembic import op
+
+from app.migrations import backfill_sql, create_index_if_missing
+from app.search import DOCUMENTS, ensure_search_schema
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    bind = op.get_bind()
+    ensure_search_schema(bind)
+    if bind.dialect.name != "postgresql":
+        return
+    for kind, (table, _, _, vector) in DOCUMENTS.items():
+        backfill_sql(op, table, f"search_vector = {vector}", "search_vector IS NULL")
+        create_index_if_missing(op, f"ix_{table}_search_vector", table, ["search_vector"], postgresql_using="gin")
+
+
+def downgrade():
+    bind = op.get_bind()
+    for kind, (table, _, _, _) in DOCUMENTS.items():
+        if bind.dialect.name == "postgresql":
+            op.execute(f"DROP INDEX IF EXISTS ix_{table}_search_vector")
+            op.execute(f"DROP TRIGGER IF EXISTS {table}_search_vector ON {table}")
+            op.execute(f"DROP FUNCTION IF EXISTS {table}_search_vector()")
+            op.execute(f"ALTER TABLE {table} DROP COLUMN IF EXISTS search_vector")
+        elif bind.dialect.name == "sqlite":
+            for suffix in ("ai", "ad", "au"):
+                op.execute(f"DROP TRIGGER IF EXISTS {kind}_search_{suffix}")
+    if bind.dialect.name == "sqlite":
+        op.execute("DROP TABLE IF EXISTS search_index")
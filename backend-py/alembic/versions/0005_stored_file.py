@@ -0,0 +1,60 @@
+"""stored_file: subidas deduplicadas por SHA-256 y derivados responsive
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18
+
+Las columnas agregadas son nullable (solo cambio de catálogo) y los índices se crean
+CONCURRENTLY en PostgreSQL (app/migrations.py).
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from app.migrations import add_column_if_missing, create_index_if_missing, create_table_if_missing
+from app.sqltypes import JSONText
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    create_table_if_missing(
+        op, "stored_file",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("sha256", sa.String(), nullable=False),
+        sa.Column("backend", sa.String(), nullable=False),
+        sa.Column("url", sa.String(), nullable=False),
+        sa.Column("content_type", sa.String(), nullable=False),
+        sa.Column("size", sa.Integer(), nullable=False),
+        sa.Column("refs", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.UniqueConstraint("sha256", "backend", name="uq_stored_file_sha256_backend"),
+    )
+    create_index_if_missing(op, "ix_stored_file_sha256", "stored_file", ["sha256"])
+    create_index_if_missing(op, "ix_stored_file_url", "stored_file", ["url"])
+
+    for column in (
+        sa.Column("width", sa.Integer(), nullable=True),
+        sa.Column("height", sa.Integer(), nullable=True),
+        sa.Column("variants", JSONText(), nullable=True),
+        sa.Column("placeholder", sa.String(), nullable=True),
+    ):
+        add_column_if_missing(op, "stored_file", column)
+
+    if op.get_bind().dialect.name == "postgresql":
+        # Tablas creadas con create_all antes de usar fechas con zona horaria. Sin USING y con
+        # la sesión en UTC, PostgreSQL 12+ cambia el tipo sin reescribir la tabla.
+        op.execute("SET LOCAL timezone = 'UTC'")
+        op.execute(
+            "DO $$ BEGIN "
+            "IF (SELECT data_type FROM information_schema.columns "
+            "    WHERE table_name = 'stored_file' AND column_name = 'created_at') = 'timestamp without time zone' THEN "
+            "  ALTER TABLE stored_file ALTER COLUMN created_at TYPE TIMESTAMPTZ; "
+            "END IF; END $$"
+        )
+
+
+def downgrade():
+    op.drop_table("stored_file")
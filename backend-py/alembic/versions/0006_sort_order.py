@@ -0,0 +1,33 @@
+"""sort_order: orden de visualización editable desde el admin
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18
+
+Con DEFAULT constante PostgreSQL 11+ agrega la columna sin reescribir la tabla, y los
+índices se crean CONCURRENTLY (app/migrations.py) sin bloquear las escrituras.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from app.migrations import add_column_if_missing, create_index_if_missing, drop_index_if_exists
+
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+TABLES = ["proyecto", "experience", "education", "timeline", "certification"]
+
+
+def upgrade():
+    for table in TABLES:
+        add_column_if_missing(op, table, sa.Column("sort_order", sa.Integer(), nullable=False, server_default="0"))
+        create_index_if_missing(op, f"ix_{table}_sort_order", table, ["sort_order", "id"])
+
+
+def downgrade():
+    for table in TABLES:
+        drop_index_if_exists(op, f"ix_{table}_sort_order", table)
+        with op.batch_alter_table(table) as batch:
+            batch.drop_column("sort_order")
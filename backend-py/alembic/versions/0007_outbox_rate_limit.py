@@ -0,0 +1,49 @@
+"""email_outbox (cotizaciones) y rate_limit_bucket
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-18
+
+Tablas nuevas: la cola de mails de cotizaciones y los contadores del rate limit.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from app.migrations import create_index_if_missing, create_table_if_missing
+
+revision = "0007"
+down_revision = "0006"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    create_table_if_missing(
+        op, "email_outbox",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("cotizacion_id", sa.Integer(), sa.ForeignKey("cotizacion.id"), nullable=True),
+        sa.Column("to_address", sa.String(), nullable=False),
+        sa.Column("reply_to", sa.String(), nullable=True),
+        sa.Column("subject", sa.String(), nullable=False),
+        sa.Column("body", sa.String(), nullable=False),
+        sa.Column("status", sa.String(), nullable=False),
+        sa.Column("attempts", sa.Integer(), nullable=False),
+        sa.Column("next_attempt_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("last_error", sa.String(), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("sent_at", sa.DateTime(timezone=True), nullable=True),
+    )
+    create_index_if_missing(op, "ix_email_outbox_due", "email_outbox", ["status", "next_attempt_at"])
+
+    create_table_if_missing(
+        op, "rate_limit_bucket",
+        sa.Column("key", sa.String(), primary_key=True),
+        sa.Column("tokens", sa.Float(), nullable=False),
+        sa.Column("allowed", sa.Boolean(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False),
+    )
+
+
+def downgrade():
+    op.drop_table("rate_limit_bucket")
+    op.drop_table("email_outbox")
@@ -0,0 +1,78 @@
+"""Fechas tipadas (DATE / TIMESTAMP) junto a los textos libres, e índices secundarios
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-18
+
+Los textos (`deployment_date`, `period`, `year`, ...) se mantienen para mostrarlos; las
+columnas nuevas se derivan de ellos con app/dates.py (acá en el backfill y después en los
+eventos before_insert/before_update de los modelos). Las filas cuyo texto no se puede
+interpretar quedan en NULL y se vuelven a intentar si se corre de nuevo la migración.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from app.dates import DERIVED
+from app.migrations import add_column_if_missing, backfill, create_index_if_missing, drop_index_if_exists
+
+revision = "0008"
+down_revision = "0007"
+branch_labels = None
+depends_on = None
+
+COLUMNS = {
+    "proyecto": [sa.Column("deployed_on", sa.Date(), nullable=True)],
+    "cotizacion": [sa.Column("received_at", sa.DateTime(timezone=True), nullable=True)],
+    "certification": [sa.Column("issued_on", sa.Date(), nullable=True)],
+    "education": [sa.Column("start_on", sa.Date(), nullable=True), sa.Column("end_on", sa.Date(), nullable=True)],
+    "timeline": [sa.Column("event_on", sa.Date(), nullable=True)],
+    "experience": [sa.Column("start_on", sa.Date(), nullable=True), sa.Column("end_on", sa.Date(), nullable=True)],
+}
+
+# (nombre, tabla, columnas): orden y filtros frecuentes de los listados
+INDEXES = [
+    ("ix_proyecto_status", "proyecto", ["status"]),
+    ("ix_proyecto_deployed_on", "proyecto", ["deployed_on", "id"]),
+    ("ix_cotizacion_status", "cotizacion", ["status"]),
+    ("ix_cotizacion_received_at", "cotizacion", ["received_at"]),
+    ("ix_certification_issued_on", "certification", ["issued_on", "id"]),
+    ("ix_education_start_on", "education", ["start_on", "id"]),
+    ("ix_timeline_event_on", "timeline", ["event_on", "id"]),
+    ("ix_timeline_category", "timeline", ["category"]),
+    ("ix_experience_start_on", "experience", ["start_on", "id"]),
+]
+
+
+def _converter(table: str):
+    def compute(row: dict):
+        values = {column: parser(row[source]) for column, (source, parser) in DERIVED[table].items()}
+        return {column: value for column, value in values.items() if value is not None} or None
+
+    return compute
+
+
+def upgrade():
+    for table, columns in COLUMNS.items():
+        for column in columns:
+            add_column_if_missing(op, table, column)
+    for name, table, columns in INDEXES:
+        create_index_if_missing(op, name, table, columns)
+
+    for table, derived in DERIVED.items():
+        sources = sorted({source for source, _ in derived.values()})
+        # Pendientes: texto cargado y ninguna columna tipada calculada todavía
+        pending = " AND ".join(
+            [f"({' OR '.join(f'{source} IS NOT NULL' for source in sources)})"]
+            + [f"{column} IS NULL" for column in derived]
+        )
+        types = {column.name: column.type for column in COLUMNS[table]}
+        backfill(op, table, sources, _converter(table), pending=pending, types=types)
+
+
+def downgrade():
+    for name, table, _ in reversed(INDEXES):
+        drop_index_if_exists(op, name, table)
+    for table, columns in COLUMNS.items():
+        with op.batch_alter_table(table) as batch:
+            for column in columns:
+                batch.drop_column(column.name)
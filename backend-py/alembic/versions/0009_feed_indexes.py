@@ -0,0 +1,48 @@
+"""Índices del orden de timeline y experience (sort_order + desempate cronológico)
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-18
+
+Reemplazan a los índices (sort_order, id) de 0006 y a timeline(category) de 0008: el
+listado ordena por (sort_order, fecha, id) y, agrupado, por (fecha, sort_order, id) o
+(category, sort_order, fecha, id). Experience va con la fecha descendente y NULLS LAST;
+SQLite no acepta NULLS LAST en un índice, pero ahí DESC ya deja los NULL al final.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from app.migrations import create_index_if_missing, drop_index_if_exists
+
+revision = "0009"
+down_revision = "0008"
+branch_labels = None
+depends_on = None
+
+
+def _start_on_desc():
+    nulls = " NULLS LAST" if op.get_bind().dialect.name == "postgresql" else ""
+    return sa.text(f"start_on DESC{nulls}")
+
+
+def upgrade():
+    create_index_if_missing(op, "ix_timeline_feed", "timeline", ["sort_order", "event_on", "id"])
+    create_index_if_missing(op, "ix_timeline_year_feed", "timeline", ["event_on", "sort_order", "id"])
+    create_index_if_missing(op, "ix_timeline_category_feed", "timeline", ["category", "sort_order", "event_on", "id"])
+    create_index_if_missing(op, "ix_experience_feed", "experience", ["sort_order", _start_on_desc(), "id"])
+    create_index_if_missing(op, "ix_experience_year_feed", "experience", [_start_on_desc(), "sort_order", "id"])
+
+    # Prefijos de los índices nuevos: ya no los usa ninguna consulta
+    drop_index_if_exists(op, "ix_timeline_sort_order", "timeline")
+    drop_index_if_exists(op, "ix_timeline_category", "timeline")
+    drop_index_if_exists(op, "ix_experience_sort_order", "experience")
+
+
+def downgrade():
+    create_index_if_missing(op, "ix_timeline_sort_order", "timeline", ["sort_order", "id"])
+    create_index_if_missing(op, "ix_timeline_category", "timeline", ["category"])
+    create_index_if_missing(op, "ix_experience_sort_order", "experience", ["sort_order", "id"])
+    for name, table in (("ix_timeline_feed", "timeline"), ("ix_timeline_year_feed", "timeline"),
+                        ("ix_timeline_category_feed", "timeline"), ("ix_experience_feed", "experience"),
+                        ("ix_experience_year_feed", "experience")):
+        drop_index_if_exists(op, name, table)
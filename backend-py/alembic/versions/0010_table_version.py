@@ -0,0 +1,41 @@
+"""table_version: versión compartida de cada tabla pública (ETag / cache entre workers)
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-18
+
+Las versiones se incrementan en la misma transacción que cada escritura (app/versions.py).
+"""
+from datetime import datetime, timezone
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.migrations import create_table_if_missing
+
+revision = "0010"
+down_revision = "0009"
+branch_labels = None
+depends_on = None
+
+TABLES = ["blog", "proyecto", "experience", "education", "timeline", "certification", "contact", "profile"]
+
+
+def upgrade():
+    create_table_if_missing(
+        op, "table_version",
+        sa.Column("name", sa.String(), primary_key=True),
+        sa.Column("version", sa.Integer(), nullable=False),
+        sa.Column("modified_at", sa.DateTime(timezone=True), nullable=False),
+    )
+    table = sa.table("table_version", sa.column("name"), sa.column("version"),
+                     sa.column("modified_at", sa.DateTime(timezone=True)))
+    existing = {row[0] for row in op.get_bind().execute(sa.select(table.c.name))} if not op.get_context().as_sql else set()
+    now = datetime.now(timezone.utc)
+    rows = [{"name": name, "version": 0, "modified_at": now} for name in TABLES if name not in existing]
+    if rows:
+        op.bulk_insert(table, rows)
+
+
+def downgrade():
+    op.drop_table("table_version")
@@ -0,0 +1,30 @@
+"""filas por defecto de profile y contact
+
+Revision ID: 0011
+Revises: 0010
+Create Date: 2026-10-18
+
+Antes las creaba el primer GET (una escritura dentro de una lectura, y dos workers en
+frío podían crear dos). Solo se insertan si la tabla está vacía; el downgrade las deja.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from app.models import DEFAULT_CONTACT, DEFAULT_PROFILE
+
+revision = "0011"
+down_revision = "0010"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    for name, values in (("profile", DEFAULT_PROFILE), ("contact", DEFAULT_CONTACT)):
+        table = sa.table(name, *(sa.column(column) for column in values))
+        if not op.get_context().as_sql and op.get_bind().execute(sa.select(sa.literal(1)).select_from(table).limit(1)).first():
+            continue
+        op.bulk_insert(table, [values])
+
+
+def downgrade():
+    pass
@@ -0,0 +1,32 @@
+"""versión de stored_file en table_version
+
+Revision ID: 0012
+Revises: 0011
+Create Date: 2026-10-18
+
+Las respuestas de proyectos y blog incluyen los derivados de sus imágenes (stored_file),
+así que su ETag y su cache también dependen de esa tabla.
+"""
+from datetime import datetime, timezone
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0012"
+down_revision = "0011"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    table = sa.table("table_version", sa.column("name"), sa.column("version"),
+                     sa.column("modified_at", sa.DateTime(timezone=True)))
+    if not op.get_context().as_sql and op.get_bind().execute(
+        sa.select(table.c.name).where(table.c.name == "stored_file")
+    ).first():
+        return
+    op.bulk_insert(table, [{"name": "stored_file", "version": 0, "modified_at": datetime.now(timezone.utc)}])
+
+
+def downgrade():
+    op.execute("DELETE FROM table_version WHERE name = 'stored_file'")
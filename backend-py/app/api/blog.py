@@ -1,31 +1,53 @@
-from fastapi import APIRouter, HTTPException
+import re
+from fastapi import APIRouter, HTTPException, Depends, Response
 from typing import List
-from sqlmodel import Session, select
-from app.db import engine
+from app.db import async_session
 from app.models import Blog
+from app.cache import read_through, invalidate
+from app.versions import conditional
+from app.pagination import ListParams, list_params, fetch_page, page_response
+from app.responses import json_response
+from app.api.upload import attach_images
 
 router = APIRouter()
 
+# URLs dentro del contenido (markdown / HTML); las que son imágenes subidas salen en `images`
+CONTENT_URL = re.compile(r"https?://[^\s\"'<>()\[\]]+")
+
+
+def image_urls(row: dict) -> list:
+    return CONTENT_URL.findall(row.get("content") or "")
+
 
 @router.post("/", response_model=Blog)
-def create_blog(item: Blog):
-    with Session(engine) as session:
+async def create_blog(item: Blog):
+    async with async_session() as session:
         session.add(item)
-        session.commit()
-        session.refresh(item)
+        await session.commit()
+        await session.refresh(item)
+        invalidate("blog")
         return item
 
 
-@router.get("/", response_model=List[Blog])
-def list_blogs():
-    with Session(engine) as session:
-        return session.exec(select(Blog)).all()
+@router.get("/", response_model=List[Blog], dependencies=[Depends(conditional("blog", "stored_file"))])
+async def list_blogs(response: Response, page: ListParams = Depends(list_params(Blog))):
+    async def _load():
+        async with async_session() as session:
+            rows, next_cursor = await fetch_page(session, Blog, page)
+            if not page.fields:
+                await attach_images(await session.connection(), rows, image_urls)
+            return rows, next_cursor
 
+    rows, next_cursor = await read_through("blog", _load, key=page.key, tags=("blog", "stored_file"))
+    return page_response(response, page, rows, next_cursor)
 
-@router.get("/{item_id}", response_model=Blog)
-def get_blog(item_id: int):
-    with Session(engine) as session:
-        item = session.get(Blog, item_id)
+
+@router.get("/{item_id}", response_model=Blog, dependencies=[Depends(conditional("blog", "stored_file"))])
+async def get_blog(item_id: int, response: Response):
+    async with async_session() as session:
+        item = await session.get(Blog, item_id)
         if not item:
             raise HTTPException(status_code=404, detail="Not found")
-        return item
+        row = item.model_dump()
+        await attach_images(await session.connection(), [row], image_urls)
+        return json_response(row, response)
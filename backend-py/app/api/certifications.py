@@ -1,7 +1,10 @@
-from fastapi import APIRouter, HTTPException
-from sqlmodel import Session, select
-from app.db import engine
+from fastapi import APIRouter, HTTPException, Depends, Response
+from app.db import async_session
 from app.models import Certification
+from app.cache import read_through, invalidate
+from app.versions import conditional
+from app.pagination import ListParams, list_params, fetch_page, page_response
+from app.bulk import bulk_schema, apply_bulk, next_sort_order
 from typing import List, Optional
 from pydantic import BaseModel
 
@@ -33,16 +36,19 @@ class CertificationUpdate(BaseModel):
     credential_url: Optional[str] = None
 
 
-@router.get("", response_model=List[Certification])
-def get_certifications():
-    with Session(engine) as session:
-        certs = session.exec(select(Certification)).all()
-        return certs
+@router.get("", response_model=List[Certification], dependencies=[Depends(conditional("certification"))])
+async def get_certifications(response: Response, page: ListParams = Depends(list_params(Certification))):
+    async def _load():
+        async with async_session() as session:
+            return await fetch_page(session, Certification, page)
+
+    rows, next_cursor = await read_through("certification", _load, key=page.key)
+    return page_response(response, page, rows, next_cursor)
 
 
 @router.post("", response_model=Certification)
-def create_certification(cert_data: CertificationCreate):
-    with Session(engine) as session:
+async def create_certification(cert_data: CertificationCreate):
+    async with async_session() as session:
         cert = Certification(
             title=cert_data.title,
             issuer=cert_data.issuer,
@@ -54,16 +60,18 @@ def create_certification(cert_data: CertificationCreate):
             badge=cert_data.badge,
             credential_url=cert_data.credential_url
         )
+        cert.sort_order = await next_sort_order(session, Certification)
         session.add(cert)
-        session.commit()
-        session.refresh(cert)
+        await session.commit()
+        await session.refresh(cert)
+        invalidate("certification")
         return cert
 
 
 @router.put("/{cert_id}", response_model=Certification)
-def update_certification(cert_id: int, cert_data: CertificationUpdate):
-    with Session(engine) as session:
-        cert = session.get(Certification, cert_id)
+async def update_certification(cert_id: int, cert_data: CertificationUpdate):
+    async with async_session() as session:
+        cert = await session.get(Certification, cert_id)
         if not cert:
             raise HTTPException(status_code=404, detail="Certification not found")
         
@@ -78,18 +86,29 @@ def update_certification(cert_id: int, cert_data: CertificationUpdate):
         cert.credential_url = cert_data.credential_url
         
         session.add(cert)
-        session.commit()
-        session.refresh(cert)
+        await session.commit()
+        await session.refresh(cert)
+        invalidate("certification")
         return cert
 
 
 @router.delete("/{cert_id}")
-def delete_certification(cert_id: int):
-    with Session(engine) as session:
-        cert = session.get(Certification, cert_id)
+async def delete_certification(cert_id: int):
+    async with async_session() as session:
+        cert = await session.get(Certification, cert_id)
         if not cert:
             raise HTTPException(status_code=404, detail="Certification not found")
         
-        session.delete(cert)
-        session.commit()
+        await session.delete(cert)
+        await session.commit()
+        invalidate("certification")
         return {"message": "Certification deleted"}
+
+
+CertificationBulk = bulk_schema("Certification", CertificationCreate, CertificationUpdate)
+
+
+@router.post("/bulk")
+async def bulk_certifications(data: CertificationBulk):
+    """Altas, cambios, bajas y orden de visualización en una sola transacción (un commit)"""
+    return await apply_bulk(Certification, "certification", data)
@@ -1,37 +1,36 @@
-from fastapi import APIRouter
-from sqlmodel import Session, select
-from app.db import engine
-from app.models import Contact
+from fastapi import APIRouter, Depends
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.db import async_session
+from app.models import Contact, DEFAULT_CONTACT
+from app.cache import read_through, invalidate
+from app.versions import conditional
 
 router = APIRouter()
 
 
-@router.get("")
-def get_contact():
+async def load_contact(session: AsyncSession) -> Contact:
+    """Devuelve el contacto; si no hay fila (la crea la migración 0011), los valores por defecto sin guardarlos"""
+    contact = (await session.exec(select(Contact).order_by(Contact.id))).first()
+    return contact or Contact(**DEFAULT_CONTACT)
+
+
+@router.get("", dependencies=[Depends(conditional("contact"))])
+async def get_contact():
     """Obtener datos de contacto (solo hay uno)"""
-    with Session(engine) as session:
-        contact = session.exec(select(Contact)).first()
-        if not contact:
-            # Crear contacto por defecto si no existe
-            contact = Contact(
-                email="contact@example.com",
-                phone="",
-                linkedin="",
-                github="",
-                location="Chile"
-            )
-            session.add(contact)
-            session.commit()
-            session.refresh(contact)
-        return contact
+    async def _load():
+        async with async_session() as session:
+            return (await load_contact(session)).model_dump()
+
+    return await read_through("contact", _load)
 
 
 @router.post("")
-def update_contact(contact_data: Contact):
+async def update_contact(contact_data: Contact):
     """Actualizar o crear contacto"""
-    with Session(engine) as session:
+    async with async_session() as session:
         # Buscar contacto existente
-        existing = session.exec(select(Contact)).first()
+        existing = (await session.exec(select(Contact))).first()
         
         if existing:
             # Actualizar existente
@@ -52,5 +51,6 @@ def update_contact(contact_data: Contact):
             )
             session.add(new_contact)
         
-        session.commit()
+        await session.commit()
+        invalidate("contact")
         return {"message": "Contact saved successfully"}
@@ -1,7 +1,10 @@
-from fastapi import APIRouter, HTTPException
-from sqlmodel import Session, select
-from app.db import engine
+from fastapi import APIRouter, HTTPException, Depends, Response
+from app.db import async_session
 from app.models import Education
+from app.cache import read_through, invalidate
+from app.versions import conditional
+from app.pagination import ListParams, list_params, fetch_page, page_response
+from app.bulk import bulk_schema, apply_bulk, next_sort_order
 from typing import List, Optional
 from pydantic import BaseModel
 
@@ -31,17 +34,20 @@ class EducationUpdate(BaseModel):
     certificate_url: Optional[str] = None
 
 
-@router.get("", response_model=List[Education])
-def get_education():
-    with Session(engine) as session:
-        education = session.exec(select(Education)).all()
-        return education
+@router.get("", response_model=List[Education], dependencies=[Depends(conditional("education"))])
+async def get_education(response: Response, page: ListParams = Depends(list_params(Education))):
+    async def _load():
+        async with async_session() as session:
+            return await fetch_page(session, Education, page)
+
+    rows, next_cursor = await read_through("education", _load, key=page.key)
+    return page_response(response, page, rows, next_cursor)
 
 
 @router.post("", response_model=Education)
-def create_education(edu_data: EducationCreate):
+async def create_education(edu_data: EducationCreate):
     try:
-        with Session(engine) as session:
+        async with async_session() as session:
             edu = Education(
                 degree=edu_data.degree,
                 institution=edu_data.institution,
@@ -52,9 +58,11 @@ def create_education(edu_data: EducationCreate):
                 description=edu_data.description,
                 certificate_url=edu_data.certificate_url
             )
+            edu.sort_order = await next_sort_order(session, Education)
             session.add(edu)
-            session.commit()
-            session.refresh(edu)
+            await session.commit()
+            await session.refresh(edu)
+            invalidate("education")
             return edu
     except Exception as e:
         print(f"Error creating education: {str(e)}")
@@ -62,10 +70,10 @@ def create_education(edu_data: EducationCreate):
 
 
 @router.put("/{edu_id}", response_model=Education)
-def update_education(edu_id: int, edu_data: EducationUpdate):
+async def update_education(edu_id: int, edu_data: EducationUpdate):
     try:
-        with Session(engine) as session:
-            edu = session.get(Education, edu_id)
+        async with async_session() as session:
+            edu = await session.get(Education, edu_id)
             if not edu:
                 raise HTTPException(status_code=404, detail="Education not found")
             
@@ -79,8 +87,9 @@ def update_education(edu_id: int, edu_data: EducationUpdate):
             edu.certificate_url = edu_data.certificate_url
             
             session.add(edu)
-            session.commit()
-            session.refresh(edu)
+            await session.commit()
+            await session.refresh(edu)
+            invalidate("education")
             return edu
     except HTTPException:
         raise
@@ -90,13 +99,22 @@ def update_education(edu_id: int, edu_data: EducationUpdate):
 
 
 @router.delete("/{edu_id}")
-def delete_education(edu_id: int):
-    with Session(engine) as session:
-        edu = session.get(Education, edu_id)
+async def delete_education(edu_id: int):
+    async with async_session() as session:
+        edu = await session.get(Education, edu_id)
         if not edu:
             raise HTTPException(status_code=404, detail="Education not found")
         
-        session.delete(edu)
-        session.commit()
+        await session.delete(edu)
+        await session.commit()
+        invalidate("education")
         return {"message": "Education deleted"}
 
+
+EducationBulk = bulk_schema("Education", EducationCreate, EducationUpdate)
+
+
+@router.post("/bulk")
+async def bulk_education(data: EducationBulk):
+    """Altas, cambios, bajas y orden de visualización en una sola transacción (un commit)"""
+    return await apply_bulk(Education, "education", data)
@@ -1,22 +1,63 @@
-from fastapi import APIRouter, BackgroundTasks
+import logging
+import os
+from typing import Optional
+from fastapi import APIRouter, Depends
 from pydantic import BaseModel, EmailStr
+from app.db import async_session
+from app.models import Cotizacion, EmailOutbox, utcnow
+from app.ratelimit import rate_limit
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
+
+# Destinatario de los avisos de nuevas cotizaciones (el dueño del portafolio); si falta,
+# el mismo SMTP_FROM. Sin ninguno de los dos no se encola el aviso.
+QUOTE_NOTIFY_TO = os.getenv("QUOTE_NOTIFY_TO") or os.getenv("SMTP_FROM", "")
 
 
 class CotizacionRequest(BaseModel):
     nombre: str
     email: EmailStr
     telefono: str | None = None
+    servicio: str | None = None
     mensaje: str
 
 
-@router.post("/", status_code=202)
-def enviar_cotizacion(payload: CotizacionRequest, background_tasks: BackgroundTasks):
-    # Placeholder: add background task to send email or persist the quote.
-    # In production add a real email sender (SMTP, SendGrid, etc.)
-    def _fake_send(p: CotizacionRequest):
-        print("Enviar cotizacion:", p.dict())
+def quote_email(cotizacion: Cotizacion) -> Optional[EmailOutbox]:
+    if not QUOTE_NOTIFY_TO:
+        logger.warning("Cotización %s sin aviso por correo: falta QUOTE_NOTIFY_TO / SMTP_FROM", cotizacion.id)
+        return None
+    lines = [
+        f"Nombre: {cotizacion.nombre}",
+        f"Email: {cotizacion.email}",
+        f"Teléfono: {cotizacion.telefono or '-'}",
+        f"Servicio: {cotizacion.servicio or '-'}",
+        "",
+        cotizacion.mensaje or "",
+    ]
+    return EmailOutbox(
+        cotizacion_id=cotizacion.id,
+        to_address=QUOTE_NOTIFY_TO,
+        reply_to=cotizacion.email,
+        subject=f"Nueva cotización de {cotizacion.nombre}",
+        body="\n".join(lines),
+    )
+
 
-    background_tasks.add_task(_fake_send, payload)
-    return {"status": "accepted"}
+@router.post("/", status_code=202, dependencies=[Depends(rate_limit("cotizacion", "5/minute"))])
+async def enviar_cotizacion(payload: CotizacionRequest):
+    """
+    Guarda la cotización y encola el aviso por correo en la misma transacción.
+    El envío lo hace el worker del outbox (python -m app.workers.outbox), así que la
+    respuesta sale apenas se confirma el INSERT y un pico de cotizaciones no retiene
+    workers de la API esperando al servidor SMTP.
+    """
+    async with async_session() as session:
+        cotizacion = Cotizacion(**payload.model_dump(), created_at=utcnow().isoformat())
+        session.add(cotizacion)
+        # flush para tener el id de la cotización antes de crear el correo
+        await session.flush()
+        if email := quote_email(cotizacion):
+            session.add(email)
+        await session.commit()
+        return {"status": "accepted", "id": cotizacion.id}
@@ -1,7 +1,11 @@
-from fastapi import APIRouter, HTTPException
-from sqlmodel import Session, select
-from app.db import engine
+from fastapi import APIRouter, HTTPException, Depends, Response, Query
+from app.db import async_session, async_engine
 from app.models import Experience
+from app.cache import read_through, invalidate
+from app.versions import conditional
+from app.pagination import ListParams, list_params, fetch_page, page_response
+from app.bulk import bulk_schema, apply_bulk, next_sort_order
+from app.sqltypes import json_array_contains
 from typing import List, Optional
 from pydantic import BaseModel
 
@@ -29,18 +33,31 @@ class ExperienceUpdate(BaseModel):
     technologies: Optional[str] = None
 
 
-@router.get("", response_model=List[Experience])
-def get_experiences():
-    """Obtener todas las experiencias"""
-    with Session(engine) as session:
-        experiences = session.exec(select(Experience)).all()
-        return experiences
+@router.get("", response_model=List[Experience], dependencies=[Depends(conditional("experience"))])
+async def get_experiences(
+    response: Response,
+    page: ListParams = Depends(list_params(Experience)),
+    technology: Optional[List[str]] = Query(default=None, description="Tecnologías (todas deben estar presentes)"),
+    group: Optional[str] = Query(default=None, pattern="^year$", description="Agrupar: [{key, items}] por año de inicio"),
+):
+    """Obtener todas las experiencias: orden del admin y, a igualdad, la más reciente primero"""
+    where = []
+    if technology:
+        where.append(json_array_contains(Experience.__table__.c.technologies, technology, async_engine.dialect.name))
+
+    async def _load():
+        async with async_session() as session:
+            return await fetch_page(session, Experience, page, where=where, group=group)
+
+    key = (page.key, tuple(sorted(technology or ())), group)
+    rows, next_cursor = await read_through("experience", _load, key=key)
+    return page_response(response, page, rows, next_cursor)
 
 
 @router.post("", response_model=Experience)
-def create_experience(exp_data: ExperienceCreate):
+async def create_experience(exp_data: ExperienceCreate):
     """Crear nueva experiencia"""
-    with Session(engine) as session:
+    async with async_session() as session:
         exp = Experience(
             company=exp_data.company,
             position=exp_data.position,
@@ -50,17 +67,19 @@ def create_experience(exp_data: ExperienceCreate):
             description=exp_data.description,
             technologies=exp_data.technologies
         )
+        exp.sort_order = await next_sort_order(session, Experience)
         session.add(exp)
-        session.commit()
-        session.refresh(exp)
+        await session.commit()
+        await session.refresh(exp)
+        invalidate("experience")
         return exp
 
 
 @router.put("/{exp_id}", response_model=Experience)
-def update_experience(exp_id: int, exp_data: ExperienceUpdate):
+async def update_experience(exp_id: int, exp_data: ExperienceUpdate):
     """Actualizar experiencia"""
-    with Session(engine) as session:
-        exp = session.get(Experience, exp_id)
+    async with async_session() as session:
+        exp = await session.get(Experience, exp_id)
         if not exp:
             raise HTTPException(status_code=404, detail="Experience not found")
         
@@ -73,19 +92,30 @@ def update_experience(exp_id: int, exp_data: ExperienceUpdate):
         exp.technologies = exp_data.technologies
         
         session.add(exp)
-        session.commit()
-        session.refresh(exp)
+        await session.commit()
+        await session.refresh(exp)
+        invalidate("experience")
         return exp
 
 
 @router.delete("/{exp_id}")
-def delete_experience(exp_id: int):
+async def delete_experience(exp_id: int):
     """Eliminar experiencia"""
-    with Session(engine) as session:
-        exp = session.get(Experience, exp_id)
+    async with async_session() as session:
+        exp = await session.get(Experience, exp_id)
         if not exp:
             raise HTTPException(status_code=404, detail="Experience not found")
         
-        session.delete(exp)
-        session.commit()
+        await session.delete(exp)
+        await session.commit()
+        invalidate("experience")
         return {"message": "Experience deleted"}
+
+
+ExperienceBulk = bulk_schema("Experience", ExperienceCreate, ExperienceUpdate)
+
+
+@router.post("/bulk")
+async def bulk_experiences(data: ExperienceBulk):
+    """Altas, cambios, bajas y orden de visualización en una sola transacción (un commit)"""
+    return await apply_bulk(Experience, "experience", data)
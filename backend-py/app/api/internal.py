@@ -0,0 +1,84 @@
+import hmac
+import os
+from typing import Optional
+from fastapi import APIRouter, Depends, Header, HTTPException
+from fastapi.responses import FileResponse
+from app.cache import cache
+from app.compression import compressed_cache
+from app.db import pool_stats
+from app.sqltrace import query_stats
+from app.profiling import list_profiles, profile_path, PROFILING_ENABLED
+
+
+def valid_internal_token(*tokens: Optional[str]) -> bool:
+    """True si alguno de los tokens recibidos es INTERNAL_TOKEN (sin INTERNAL_TOKEN, nunca)"""
+    expected = os.getenv("INTERNAL_TOKEN")
+    return bool(expected) and any(hmac.compare_digest(expected.encode(), token.encode()) for token in tokens if token)
+
+
+def valid_internal_headers(x_internal_token: Optional[str], authorization: Optional[str]) -> bool:
+    """X-Internal-Token o `Authorization: Bearer <token>` (los endpoints internos y X-Profile)"""
+    bearer = authorization[7:] if authorization and authorization.lower().startswith("bearer ") else None
+    return valid_internal_token(x_internal_token, bearer)
+
+
+def require_internal_token(
+    x_internal_token: Optional[str] = Header(default=None),
+    authorization: Optional[str] = Header(default=None),
+):
+    """
+    Los endpoints internos exigen el header X-Internal-Token (o `Authorization: Bearer
+    <token>`, que es lo que envía el scrape de Prometheus) igual a INTERNAL_TOKEN. Sin
+    INTERNAL_TOKEN definido quedan deshabilitados (404), no abiertos.
+    """
+    if not os.getenv("INTERNAL_TOKEN"):
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not valid_internal_headers(x_internal_token, authorization):
+        raise HTTPException(status_code=403, detail="Forbidden")
+
+
+router = APIRouter(dependencies=[Depends(require_internal_token)])
+
+
+@router.get("/cache")
+def cache_stats():
+    """Estadísticas de la cache de lectura (hits, misses, tamaño, evicciones)"""
+    return {**cache.stats(), "compression": compressed_cache.stats()}
+
+
+@router.post("/cache/clear")
+def cache_clear():
+    cache.clear()
+    compressed_cache.clear()
+    return {"message": "Cache cleared"}
+
+
+@router.get("/pool")
+def pool():
+    """Estadísticas del pool de conexiones de este worker (prestadas, overflow, espera, churn)"""
+    return pool_stats()
+
+
+@router.get("/queries")
+def queries():
+    """Consultas lentas y avisos de N+1 recientes de este worker"""
+    return query_stats()
+
+
+# Los perfiles (nombres de funciones, rutas de archivos, tiempos) quedan detrás del mismo
+# token que el resto del router: sin INTERNAL_TOKEN, 404
+
+
+@router.get("/profiles")
+def profiles():
+    """Perfiles guardados por el perfilado bajo demanda (más recientes primero)"""
+    return {"enabled": PROFILING_ENABLED, "profiles": list_profiles()}
+
+
+@router.get("/profiles/{name}")
+def download_profile(name: str):
+    path = profile_path(name)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    media_type = "text/html" if path.suffix == ".html" else "application/octet-stream"
+    return FileResponse(path, media_type=media_type, filename=name)
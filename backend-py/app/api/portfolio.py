@@ -0,0 +1,119 @@
+import orjson
+from fastapi import APIRouter, HTTPException, Request, Response
+from typing import Optional
+from sqlalchemy import Text, case, cast, func, literal_column, select
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+from app.db import async_engine
+from app.models import Proyecto, Timeline, Education, Experience, Certification, Profile, Contact, DEFAULT_PROFILE, DEFAULT_CONTACT
+from app.cache import read_through
+from app.versions import check_not_modified
+from app.responses import json_response
+from app.pagination import display_order
+from app.sqltypes import JSONText
+from app.api.upload import attach_images
+from app.api.proyectos import image_urls
+
+router = APIRouter()
+
+# Secciones disponibles en el snapshot: (modelo, valores si falta la fila | None si es una
+# lista). profile y contact son una sola fila; el resto, la tabla entera en orden de display.
+SECTIONS = {
+    "profile": (Profile, DEFAULT_PROFILE),
+    "contact": (Contact, DEFAULT_CONTACT),
+    "experiences": (Experience, None),
+    "education": (Education, None),
+    "timeline": (Timeline, None),
+    "certifications": (Certification, None),
+    "proyectos": (Proyecto, None),
+}
+
+
+def _row_json(table, dialect: str):
+    """Objeto JSON con todas las columnas de la fila (las JSONText van como JSON anidado)"""
+    pairs = []
+    for column in table.c:
+        value = column
+        if isinstance(column.type, JSONText) and dialect == "sqlite":
+            # Texto JSON en SQLite: json() lo anida; si no es JSON válido va como string
+            value = case((func.json_valid(column) == 1, func.json(column)), else_=column)
+        pairs += [literal_column(f"'{column.name}'"), value]
+    return func.json_build_object(*pairs) if dialect == "postgresql" else func.json_object(*pairs)
+
+
+def _section_query(model, single: bool, dialect: str):
+    """Subconsulta escalar con la sección como texto JSON (objeto o array)"""
+    table = model.__table__
+    row = _row_json(table, dialect)
+    if single:
+        query = select(row).order_by(table.c.id).limit(1)
+    elif dialect == "postgresql":
+        query = select(func.json_agg(aggregate_order_by(row, *display_order(model))))
+    else:
+        # SQLite agrega en el orden de la subconsulta; json() conserva los objetos como JSON
+        rows = select(row.label("row")).order_by(*display_order(model)).subquery()
+        query = select(func.json_group_array(func.json(rows.c.row)))
+    return cast(query.scalar_subquery(), Text)
+
+
+def _decode(model, value: Optional[str], defaults: Optional[dict]):
+    """Texto JSON de la sección -> lo mismo que daría model_dump() de cada fila"""
+    if value is None:
+        return model(**defaults).model_dump() if defaults is not None else []
+    data = orjson.loads(value)
+    json_columns = [column.name for column in model.__table__.c if isinstance(column.type, JSONText)]
+    for row in [data] if defaults is not None else data:
+        for name in json_columns:
+            # Igual que JSONText al leer: texto JSON, no la estructura
+            row[name] = JSONText().process_result_value(row[name], None)
+    return data
+
+
+async def load_sections(sections: list) -> dict:
+    """Todas las secciones pedidas en una sola consulta (una subconsulta por sección)"""
+    dialect = async_engine.dialect.name
+    query = select(*(
+        _section_query(SECTIONS[name][0], SECTIONS[name][1] is not None, dialect).label(name)
+        for name in sections
+    ))
+    async with async_engine.connect() as conn:
+        row = (await conn.execute(query)).one()
+        snapshot = {
+            name: _decode(SECTIONS[name][0], value, SECTIONS[name][1])
+            for name, value in zip(sections, row)
+        }
+        if "proyectos" in snapshot:
+            # Derivados de las imágenes (stored_file): una consulta más, solo con proyectos
+            await attach_images(conn, snapshot["proyectos"], image_urls)
+    return snapshot
+
+
+def section_tables(sections: list) -> list:
+    """Tablas de las que depende el snapshot (ETag y tags de la cache)"""
+    tables = [SECTIONS[name][0].__tablename__ for name in sections]
+    return tables + ["stored_file"] if "proyectos" in sections else tables
+
+
+def parse_include(include: Optional[str]) -> list:
+    """Convierte `?include=profile,proyectos` en la lista de secciones pedidas"""
+    if not include:
+        return list(SECTIONS)
+    names = [name.strip() for name in include.split(",") if name.strip()]
+    unknown = [name for name in names if name not in SECTIONS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown sections: {', '.join(unknown)}")
+    return names
+
+
+@router.get("")
+async def get_portfolio(request: Request, response: Response, include: Optional[str] = None):
+    """
+    Snapshot público del portafolio en una sola respuesta.
+    Todas las secciones salen de una sola consulta (un round trip, una conexión del pool),
+    más la de los derivados de las imágenes si se piden los proyectos.
+    """
+    sections = parse_include(include)
+    tables = section_tables(sections)
+    await check_not_modified(request, response, *tables)
+
+    snapshot = await read_through("portfolio", lambda: load_sections(sections), key=tuple(sections), tags=tables)
+    return json_response(snapshot, response)
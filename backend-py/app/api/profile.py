@@ -1,36 +1,36 @@
-from fastapi import APIRouter, HTTPException
-from sqlmodel import Session, select
-from app.db import engine
-from app.models import Profile
+from fastapi import APIRouter, Depends
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.db import async_session
+from app.models import Profile, DEFAULT_PROFILE
+from app.cache import read_through, invalidate
+from app.versions import conditional
 
 router = APIRouter()
 
 
-@router.get("")
-def get_profile():
+async def load_profile(session: AsyncSession) -> Profile:
+    """Devuelve el perfil; si no hay fila (la crea la migración 0011), los valores por defecto sin guardarlos"""
+    profile = (await session.exec(select(Profile).order_by(Profile.id))).first()
+    return profile or Profile(**DEFAULT_PROFILE)
+
+
+@router.get("", dependencies=[Depends(conditional("profile"))])
+async def get_profile():
     """Obtener perfil (solo hay uno)"""
-    with Session(engine) as session:
-        profile = session.exec(select(Profile)).first()
-        if not profile:
-            # Crear perfil por defecto si no existe
-            profile = Profile(
-                full_name="Favio Jiménez",
-                title="Ingeniero de Software Full Stack",
-                profile_image="",
-                profile_video=""
-            )
-            session.add(profile)
-            session.commit()
-            session.refresh(profile)
-        return profile
+    async def _load():
+        async with async_session() as session:
+            return (await load_profile(session)).model_dump()
+
+    return await read_through("profile", _load)
 
 
 @router.post("")
-def update_profile(profile_data: Profile):
+async def update_profile(profile_data: Profile):
     """Actualizar o crear perfil"""
-    with Session(engine) as session:
+    async with async_session() as session:
         # Buscar perfil existente
-        existing = session.exec(select(Profile)).first()
+        existing = (await session.exec(select(Profile))).first()
         
         if existing:
             # Actualizar existente
@@ -49,5 +49,6 @@ def update_profile(profile_data: Profile):
             )
             session.add(new_profile)
         
-        session.commit()
+        await session.commit()
+        invalidate("profile")
         return {"message": "Profile saved successfully"}
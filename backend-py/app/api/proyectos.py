@@ -1,9 +1,16 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Depends, Response, Query
 from typing import List, Optional
+import json
 from pydantic import BaseModel
-from sqlmodel import Session, select
-from app.db import engine
+from app.db import async_session, async_engine
 from app.models import Proyecto
+from app.cache import read_through, invalidate
+from app.versions import conditional
+from app.pagination import ListParams, list_params, fetch_page, page_response
+from app.bulk import bulk_schema, apply_bulk, next_sort_order
+from app.sqltypes import json_array_contains
+from app.responses import json_response
+from app.api.upload import attach_images
 
 router = APIRouter()
 
@@ -38,32 +45,71 @@ class ProyectoUpdate(BaseModel):
     deployment_date: Optional[str] = None
     client_name: Optional[str] = None
 
-@router.get("", response_model=List[Proyecto])
-def list_proyectos():
-    with Session(engine) as session:
-        return session.exec(select(Proyecto)).all()
+def image_urls(row: dict) -> list:
+    """Imágenes que referencia el proyecto: la portada y las de la galería (media)"""
+    urls = [row.get("image_url")]
+    try:
+        media = json.loads(row.get("media") or "[]")
+    except ValueError:
+        media = []
+    if isinstance(media, list):
+        urls += [item.get("url") for item in media if isinstance(item, dict) and item.get("type") == "image"]
+    return [url for url in urls if url]
 
-@router.get("/{item_id}", response_model=Proyecto)
-def get_proyecto(item_id: int):
-    with Session(engine) as session:
-        item = session.get(Proyecto, item_id)
+
+@router.get("", response_model=List[Proyecto], dependencies=[Depends(conditional("proyecto", "stored_file"))])
+async def list_proyectos(
+    response: Response,
+    page: ListParams = Depends(list_params(Proyecto)),
+    stack: Optional[List[str]] = Query(default=None, description="Tecnologías (todas deben estar en el stack)"),
+    category: Optional[str] = None,
+    status: Optional[str] = None,
+):
+    where = []
+    if stack:
+        where.append(json_array_contains(Proyecto.__table__.c.stack, stack, async_engine.dialect.name))
+    if category:
+        where.append(Proyecto.__table__.c.category == category)
+    if status:
+        where.append(Proyecto.__table__.c.status == status)
+
+    async def _load():
+        async with async_session() as session:
+            rows, next_cursor = await fetch_page(session, Proyecto, page, where=where)
+            if not page.fields:
+                # Con `fields` la respuesta tiene solo las columnas pedidas
+                await attach_images(await session.connection(), rows, image_urls)
+            return rows, next_cursor
+
+    key = (page.key, tuple(sorted(stack or ())), category, status)
+    rows, next_cursor = await read_through("proyecto", _load, key=key, tags=("proyecto", "stored_file"))
+    return page_response(response, page, rows, next_cursor)
+
+@router.get("/{item_id}", response_model=Proyecto, dependencies=[Depends(conditional("proyecto", "stored_file"))])
+async def get_proyecto(item_id: int, response: Response):
+    async with async_session() as session:
+        item = await session.get(Proyecto, item_id)
         if not item:
             raise HTTPException(status_code=404, detail="Proyecto not found")
-        return item
+        row = item.model_dump()
+        await attach_images(await session.connection(), [row], image_urls)
+        return json_response(row, response)
 
 @router.post("", response_model=Proyecto)
-def create_proyecto(data: ProyectoCreate):
-    with Session(engine) as session:
+async def create_proyecto(data: ProyectoCreate):
+    async with async_session() as session:
         item = Proyecto(**data.model_dump())
+        item.sort_order = await next_sort_order(session, Proyecto)
         session.add(item)
-        session.commit()
-        session.refresh(item)
+        await session.commit()
+        await session.refresh(item)
+        invalidate("proyecto")
         return item
 
 @router.put("/{item_id}", response_model=Proyecto)
-def update_proyecto(item_id: int, data: ProyectoUpdate):
-    with Session(engine) as session:
-        item = session.get(Proyecto, item_id)
+async def update_proyecto(item_id: int, data: ProyectoUpdate):
+    async with async_session() as session:
+        item = await session.get(Proyecto, item_id)
         if not item:
             raise HTTPException(status_code=404, detail="Proyecto not found")
         
@@ -72,17 +118,28 @@ def update_proyecto(item_id: int, data: ProyectoUpdate):
             setattr(item, key, value)
             
         session.add(item)
-        session.commit()
-        session.refresh(item)
+        await session.commit()
+        await session.refresh(item)
+        invalidate("proyecto")
         return item
 
 @router.delete("/{item_id}")
-def delete_proyecto(item_id: int):
-    with Session(engine) as session:
-        item = session.get(Proyecto, item_id)
+async def delete_proyecto(item_id: int):
+    async with async_session() as session:
+        item = await session.get(Proyecto, item_id)
         if not item:
             raise HTTPException(status_code=404, detail="Proyecto not found")
         
-        session.delete(item)
-        session.commit()
+        await session.delete(item)
+        await session.commit()
+        invalidate("proyecto")
         return {"message": "Proyecto deleted"}
+
+
+ProyectoBulk = bulk_schema("Proyecto", ProyectoCreate, ProyectoUpdate)
+
+
+@router.post("/bulk")
+async def bulk_proyectos(data: ProyectoBulk):
+    """Altas, cambios, bajas y orden de visualización en una sola transacción (un commit)"""
+    return await apply_bulk(Proyecto, "proyecto", data)
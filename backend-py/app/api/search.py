@@ -0,0 +1,40 @@
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from typing import Optional
+from app.db import async_engine
+from app.cache import read_through
+from app.versions import check_not_modified
+from app.search import DOCUMENTS, search
+
+router = APIRouter()
+
+
+@router.get("")
+async def search_content(
+    request: Request,
+    response: Response,
+    q: str = Query(..., min_length=2, max_length=200),
+    type: Optional[str] = Query(default=None, description="proyecto,blog,experience,certification"),
+    limit: int = Query(default=20, ge=1, le=50),
+    offset: int = Query(default=0, ge=0),
+):
+    """Búsqueda full-text con ranking y snippets resaltados (<mark>)"""
+    kinds = [kind.strip() for kind in type.split(",") if kind.strip()] if type else list(DOCUMENTS)
+    unknown = [kind for kind in kinds if kind not in DOCUMENTS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown types: {', '.join(unknown)}")
+
+    await check_not_modified(request, response, *kinds)
+
+    async def _load():
+        async with async_engine.connect() as conn:
+            # Se pide una fila extra para saber si hay página siguiente
+            return await search(conn, q, kinds, limit=limit + 1, offset=offset)
+
+    results = await read_through("search", _load, key=(q, tuple(kinds), limit, offset), tags=kinds)
+    return {
+        "query": q,
+        "results": results[:limit],
+        "limit": limit,
+        "offset": offset,
+        "next_offset": offset + limit if len(results) > limit else None,
+    }
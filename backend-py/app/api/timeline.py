@@ -1,7 +1,10 @@
-from fastapi import APIRouter, HTTPException
-from sqlmodel import Session, select
-from app.db import engine
+from fastapi import APIRouter, HTTPException, Depends, Response, Query
+from app.db import async_session
 from app.models import Timeline
+from app.cache import read_through, invalidate
+from app.versions import conditional
+from app.pagination import ListParams, list_params, fetch_page, page_response
+from app.bulk import bulk_schema, apply_bulk, next_sort_order
 from typing import List, Optional
 from pydantic import BaseModel
 
@@ -25,16 +28,28 @@ class TimelineUpdate(BaseModel):
     icon: Optional[str] = None
 
 
-@router.get("", response_model=List[Timeline])
-def get_timeline():
-    with Session(engine) as session:
-        timeline = session.exec(select(Timeline)).all()
-        return timeline
+@router.get("", response_model=List[Timeline], dependencies=[Depends(conditional("timeline"))])
+async def get_timeline(
+    response: Response,
+    page: ListParams = Depends(list_params(Timeline)),
+    category: Optional[str] = None,
+    group: Optional[str] = Query(default=None, pattern="^(year|category)$",
+                                 description="Agrupar: [{key, items}] por año o categoría"),
+):
+    """Hitos ya ordenados: orden del admin y, a igualdad, cronológico (más antiguo primero)"""
+    where = [Timeline.__table__.c.category == category] if category else []
+
+    async def _load():
+        async with async_session() as session:
+            return await fetch_page(session, Timeline, page, where=where, group=group)
+
+    rows, next_cursor = await read_through("timeline", _load, key=(page.key, category, group))
+    return page_response(response, page, rows, next_cursor)
 
 
 @router.post("", response_model=Timeline)
-def create_timeline(item_data: TimelineCreate):
-    with Session(engine) as session:
+async def create_timeline(item_data: TimelineCreate):
+    async with async_session() as session:
         item = Timeline(
             year=item_data.year,
             title=item_data.title,
@@ -42,16 +57,18 @@ def create_timeline(item_data: TimelineCreate):
             category=item_data.category,
             icon=item_data.icon
         )
+        item.sort_order = await next_sort_order(session, Timeline)
         session.add(item)
-        session.commit()
-        session.refresh(item)
+        await session.commit()
+        await session.refresh(item)
+        invalidate("timeline")
         return item
 
 
 @router.put("/{item_id}", response_model=Timeline)
-def update_timeline(item_id: int, item_data: TimelineUpdate):
-    with Session(engine) as session:
-        item = session.get(Timeline, item_id)
+async def update_timeline(item_id: int, item_data: TimelineUpdate):
+    async with async_session() as session:
+        item = await session.get(Timeline, item_id)
         if not item:
             raise HTTPException(status_code=404, detail="Timeline not found")
         
@@ -62,18 +79,29 @@ def update_timeline(item_id: int, item_data: TimelineUpdate):
         item.icon = item_data.icon
         
         session.add(item)
-        session.commit()
-        session.refresh(item)
+        await session.commit()
+        await session.refresh(item)
+        invalidate("timeline")
         return item
 
 
 @router.delete("/{item_id}")
-def delete_timeline(item_id: int):
-    with Session(engine) as session:
-        item = session.get(Timeline, item_id)
+async def delete_timeline(item_id: int):
+    async with async_session() as session:
+        item = await session.get(Timeline, item_id)
         if not item:
             raise HTTPException(status_code=404, detail="Timeline not found")
         
-        session.delete(item)
-        session.commit()
+        await session.delete(item)
+        await session.commit()
+        invalidate("timeline")
         return {"message": "Timeline deleted"}
+
+
+TimelineBulk = bulk_schema("Timeline", TimelineCreate, TimelineUpdate)
+
+
+@router.post("/bulk")
+async def bulk_timeline(data: TimelineBulk):
+    """Altas, cambios, bajas y orden de visualización en una sola transacción (un commit)"""
+    return await apply_bulk(Timeline, "timeline", data)
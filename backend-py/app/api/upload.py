@@ -1,66 +1,292 @@
+import hashlib
+import io
+import json
+import logging
 import os
-import cloudinary
-import cloudinary.uploader
-from fastapi import APIRouter, UploadFile, File, HTTPException
-import uuid
+import time
+from typing import Iterable, Optional
+import anyio
+from fastapi import APIRouter, Depends, UploadFile, File, HTTPException
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import select
+from app.db import async_session
+from app.cache import invalidate
+from app.models import StoredFile
+from app.storage import StorageBackend, get_storage, backend_for_url, storage_key
+from app.images import build_variants, should_process
+from app.ratelimit import rate_limit
+from app import metrics
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
 
-# Configuración de Cloudinary
-cloudinary.config(
-    cloud_name=str(os.getenv("CLOUDINARY_CLOUD_NAME", "")).strip(),
-    api_key=str(os.getenv("CLOUDINARY_API_KEY", "")).strip(),
-    api_secret=str(os.getenv("CLOUDINARY_API_SECRET", "")).strip(),
-    secure=True
-)
+# Límites de subida (el tamaño y el tipo también los corta BodySizeLimitMiddleware mientras llegan los datos)
+UPLOAD_MAX_BYTES = int(os.getenv("UPLOAD_MAX_MB", "100")) * 1024 * 1024
+UPLOAD_ALLOWED_TYPES = ("image/", "video/", "application/pdf")
+CHUNK_SIZE = 1024 * 1024
 
-@router.post("")
+# Las llamadas al storage son bloqueantes: van a un thread propio con su propio
+# límite para no ocupar el threadpool que usan el resto de rutas sync
+_provider_limiter = anyio.CapacityLimiter(int(os.getenv("UPLOAD_CONCURRENCY", "4")))
+
+
+def sniff_content_type(head: bytes) -> str | None:
+    """Detecta el tipo real por los magic bytes (no confiamos en el Content-Type del cliente)"""
+    if head.startswith(b"\xff\xd8\xff"):
+        return "image/jpeg"
+    if head.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "image/png"
+    if head.startswith((b"GIF87a", b"GIF89a")):
+        return "image/gif"
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "image/webp"
+    if head[4:8] == b"ftyp":
+        brand = head[8:12]
+        if brand in (b"avif", b"avis"):
+            return "image/avif"
+        if brand in (b"heic", b"heix", b"mif1"):
+            return "image/heic"
+        return "video/quicktime" if brand == b"qt  " else "video/mp4"
+    if head.startswith(b"\x1aE\xdf\xa3"):
+        return "video/webm"
+    if head.startswith(b"%PDF"):
+        return "application/pdf"
+    return None
+
+
+def allowed_content_type(head: bytes) -> str:
+    """Tipo detectado en los primeros bytes del archivo; 415 si no es uno de los permitidos"""
+    content_type = sniff_content_type(head[:32])
+    if content_type is None or not content_type.startswith(UPLOAD_ALLOWED_TYPES):
+        raise HTTPException(status_code=415, detail="Tipo de archivo no permitido")
+    return content_type
+
+
+def inspect_upload(fileobj) -> tuple:
+    """
+    Recorre el archivo por bloques (memoria acotada) validando tipo y tamaño y calculando
+    su SHA-256. Bloqueante: se ejecuta en un thread. Devuelve (content_type, size, sha256)
+    y deja el archivo listo para volver a leerse desde el inicio.
+    """
+    digest = hashlib.sha256()
+    size = 0
+    content_type = None
+    fileobj.seek(0)
+    while chunk := fileobj.read(CHUNK_SIZE):
+        if content_type is None:
+            content_type = allowed_content_type(chunk)
+        size += len(chunk)
+        if size > UPLOAD_MAX_BYTES:
+            raise HTTPException(status_code=413, detail="Archivo demasiado grande")
+        digest.update(chunk)
+    if size == 0:
+        raise HTTPException(status_code=400, detail="Archivo vacío")
+
+    fileobj.seek(0)
+    return content_type, size, digest.hexdigest()
+
+
+async def _find_and_ref(sha256: str, backend: str):
+    """Si el archivo ya estaba subido suma una referencia y lo devuelve"""
+    async with async_session() as session:
+        stored = (await session.exec(
+            select(StoredFile).where(StoredFile.sha256 == sha256, StoredFile.backend == backend)
+        )).first()
+        if stored:
+            stored.refs += 1
+            session.add(stored)
+            await session.commit()
+            invalidate("stored_file")
+        return stored
+
+
+def _read_all(fileobj) -> bytes:
+    fileobj.seek(0)
+    data = fileobj.read()
+    fileobj.seek(0)
+    return data
+
+
+async def _store_variants(storage: StorageBackend, fileobj, sha256: str) -> dict:
+    """
+    Genera los derivados en el process pool y los sube al mismo storage.
+    Devuelve los campos a guardar en StoredFile (width, height, variants, placeholder).
+    """
+    data = await anyio.to_thread.run_sync(_read_all, fileobj)
+    rendered = await build_variants(data)
+
+    variants = []
+    for fmt, width, payload in rendered["variants"]:
+        url = await anyio.to_thread.run_sync(
+            # El formato va también en el nombre: en Cloudinary el public_id no lleva extensión
+            # y el AVIF y el WebP del mismo ancho serían el mismo asset
+            storage.save, io.BytesIO(payload), f"{sha256}-w{width}-{fmt}.{fmt}", f"image/{fmt}", len(payload),
+            limiter=_provider_limiter,
+        )
+        variants.append({"url": url, "width": width, "format": fmt})
+
+    return {
+        "width": rendered["width"],
+        "height": rendered["height"],
+        "variants": json.dumps(variants),
+        "placeholder": rendered["placeholder"],
+    }
+
+
+def _record_upload(backend: str, size: int, started: float, deduplicated: bool):
+    result = "deduplicated" if deduplicated else "stored"
+    metrics.upload_bytes.inc((backend, result), size)
+    metrics.upload_size.observe((backend,), size)
+    metrics.upload_duration.observe((backend, result), time.perf_counter() - started)
+
+
+def image_info(stored) -> dict:
+    """Dimensiones, derivados responsive y placeholder (de un StoredFile o una fila con esas columnas)"""
+    return {
+        "width": stored.width,
+        "height": stored.height,
+        "variants": json.loads(stored.variants) if stored.variants else [],
+        "placeholder": stored.placeholder,
+    }
+
+
+def _file_response(stored: StoredFile) -> dict:
+    return {
+        "url": stored.url,
+        "content_type": stored.content_type,
+        "size": stored.size,
+        "sha256": stored.sha256,
+        **image_info(stored),
+    }
+
+
+def _upload_response(filename: str, stored: StoredFile, deduplicated: bool) -> dict:
+    return {"filename": filename, **_file_response(stored), "deduplicated": deduplicated}
+
+
+async def load_images(conn, urls: Iterable[str]) -> dict:
+    """
+    URL -> image_info() de las imágenes subidas que tienen derivados, en una sola consulta.
+    Los proyectos y el blog guardan solo la URL: sus respuestas agregan esto como `images`
+    (las respuestas que lo usan dependen también de la versión de stored_file).
+    """
+    urls = {url for url in urls if url}
+    if not urls:
+        return {}
+    table = StoredFile.__table__
+    rows = await conn.execute(
+        select(table.c.url, table.c.width, table.c.height, table.c.variants, table.c.placeholder)
+        .where(table.c.url.in_(urls), table.c.width.is_not(None))
+    )
+    return {row.url: image_info(row) for row in rows}
+
+
+async def attach_images(conn, rows: list, urls_of) -> list:
+    """Agrega a cada fila `images` ({url: image_info}) con las imágenes que referencia `urls_of(row)`"""
+    found = await load_images(conn, (url for row in rows for url in urls_of(row)))
+    for row in rows:
+        row["images"] = {url: found[url] for url in urls_of(row) if url in found}
+    return rows
+
+
+@router.post("", dependencies=[Depends(rate_limit("upload", "30/minute"))])
 async def upload_file(file: UploadFile = File(...)):
     """
-    Sube un archivo a Cloudinary y devuelve la URL segura.
+    Sube un archivo al storage configurado (Cloudinary o disco local) y devuelve la URL.
+    Si el mismo contenido (mismo SHA-256) ya se subió, devuelve la URL existente sin
+    volver a transferirlo.
     """
+    if file.content_type and not file.content_type.startswith(UPLOAD_ALLOWED_TYPES):
+        raise HTTPException(status_code=415, detail=f"Tipo de archivo no permitido: {file.content_type}")
+
+    started = time.perf_counter()
+    content_type, size, sha256 = await anyio.to_thread.run_sync(inspect_upload, file.file)
+    storage = get_storage()
+
+    stored = await _find_and_ref(sha256, storage.name)
+    if stored:
+        _record_upload(storage.name, size, started, deduplicated=True)
+        return _upload_response(file.filename, stored, deduplicated=True)
+
+    saving = time.perf_counter()
     try:
-        # Leer el contenido del archivo
-        file_content = await file.read()
-        
-        # Subir directamente a Cloudinary
-        upload_result = cloudinary.uploader.upload(
-            file_content,
-            public_id=f"portafolio/{uuid.uuid4()}",
-            resource_type="auto"
+        # El archivo ya está en el spool de Starlette (disco si es grande): se le pasa
+        # el file object al storage en un thread en vez de cargarlo entero en memoria
+        url = await anyio.to_thread.run_sync(
+            storage.save, file.file, storage_key(sha256, content_type), content_type, size,
+            limiter=_provider_limiter,
         )
-
-        return {
-            "filename": file.filename,
-            "url": upload_result.get("secure_url")
-        }
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error al subir archivo a Cloudinary: {str(e)}")
+        logger.exception("Error al subir %s a %s", sha256, storage.name)
+        raise HTTPException(status_code=500, detail=f"Error al subir archivo ({storage.name}): {str(e)}")
+    metrics.upload_storage_duration.observe((storage.name,), time.perf_counter() - saving)
+
+    stored = StoredFile(sha256=sha256, backend=storage.name, url=url, content_type=content_type, size=size)
+    if should_process(content_type, size):
+        try:
+            for key, value in (await _store_variants(storage, file.file, sha256)).items():
+                setattr(stored, key, value)
+        except Exception:
+            # Los derivados son una optimización: si fallan, la subida original sigue siendo válida
+            logger.exception("Error generando derivados de %s", sha256)
+
+    try:
+        async with async_session() as session:
+            session.add(stored)
+            await session.commit()
+        invalidate("stored_file")
+    except IntegrityError:
+        # Otra subida concurrente del mismo archivo ganó la carrera: contar la referencia
+        stored = await _find_and_ref(sha256, storage.name) or stored
+
+    _record_upload(storage.name, size, started, deduplicated=False)
+    return _upload_response(file.filename, stored, deduplicated=False)
+
+
+@router.get("/info")
+async def get_file_info(url: Optional[str] = None, sha256: Optional[str] = None):
+    """Datos de un archivo ya subido (por URL o SHA-256), con sus derivados y placeholder"""
+    if not url and not sha256:
+        raise HTTPException(status_code=400, detail="Falta url o sha256")
+    async with async_session() as session:
+        query = select(StoredFile).where(StoredFile.url == url) if url else select(StoredFile).where(StoredFile.sha256 == sha256)
+        stored = (await session.exec(query)).first()
+    if not stored:
+        raise HTTPException(status_code=404, detail="Archivo no encontrado")
+    return _file_response(stored)
 
 
 @router.delete("/delete")
-def delete_file(url: str):
+async def delete_file(url: str):
     """
-    Elimina un archivo de Cloudinary dada su URL.
+    Elimina un archivo del storage dada su URL. Como las subidas se deduplican, el archivo
+    solo se borra de verdad cuando ya no quedan referencias.
     """
     try:
-        # Extraer el public_id de la URL de Cloudinary
-        # Ejemplo: https://res.cloudinary.com/demo/image/upload/v12345/portafolio/public_id.jpg
-        # El public_id sería 'portafolio/public_id'
-        
-        if "cloudinary.com" not in url:
-            return {"message": "La URL no pertenece a Cloudinary o ya es local."}
-
-        # Lógica simplificada para obtener el public_id:
-        # Buscamos la parte después de 'upload/' (o similar) y quitamos la extensión
-        parts = url.split("/")
-        # Buscamos el índice que contiene el public_id (generalmente después de la versión 'v12345')
-        # Para ser más seguros, tomamos los últimos segmentos que coincidan con nuestra estructura 'portafolio/id'
-        public_id_with_ext = "/".join(parts[-2:]) # 'portafolio/uuid.jpg'
-        public_id = public_id_with_ext.split(".")[0]
-
-        cloudinary.uploader.destroy(public_id)
-        return {"message": f"Archivo {public_id} eliminado de Cloudinary"}
+        async with async_session() as session:
+            stored = (await session.exec(select(StoredFile).where(StoredFile.url == url))).first()
+            if stored and stored.refs > 1:
+                stored.refs -= 1
+                session.add(stored)
+                await session.commit()
+                invalidate("stored_file")
+                return {"message": f"Referencia eliminada ({stored.refs} restantes)"}
+            if stored:
+                await session.delete(stored)
+                await session.commit()
+                invalidate("stored_file")
+
+        backend = backend_for_url(url)
+        if backend is None:
+            return {"message": "La URL no pertenece a ningún storage conocido."}
+
+        content_type = stored.content_type if stored else None
+        await anyio.to_thread.run_sync(backend.delete, url, content_type, limiter=_provider_limiter)
+        # Los derivados responsive viven y mueren con el original
+        for variant in json.loads(stored.variants) if stored and stored.variants else []:
+            await anyio.to_thread.run_sync(backend.delete, variant["url"], "image/" + variant["format"], limiter=_provider_limiter)
+        return {"message": f"Archivo eliminado de {backend.name}"}
     except Exception as e:
         # No lanzamos error para no romper el flujo si el borrado falla
-        return {"message": f"Aviso: No se pudo borrar de Cloudinary: {str(e)}"}
+        logger.warning("No se pudo borrar %s", url, exc_info=True)
+        return {"message": f"Aviso: No se pudo borrar el archivo: {str(e)}"}
@@ -0,0 +1,97 @@
+import re
+from typing import Callable, Optional
+from fastapi import HTTPException
+from starlette.responses import JSONResponse
+
+# Bytes del inicio del archivo que recibe check_file_head (alcanzan para los magic bytes)
+FILE_HEAD_SIZE = 32
+# Si el primer archivo no aparece en este tramo del cuerpo, no se revisa (lo valida la ruta)
+MAX_PREAMBLE = 64 * 1024
+
+_BOUNDARY = re.compile(rb'boundary="?([^";]+)"?', re.IGNORECASE)
+
+
+def _file_head(buffer: bytes, boundary: bytes, final: bool) -> Optional[bytes]:
+    """
+    Primeros FILE_HEAD_SIZE bytes de la primera parte con `filename=` del multipart, o None
+    si todavía no llegaron (con final=True devuelve lo que haya).
+    """
+    delimiter = b"--" + boundary
+    start = 0
+    while (index := buffer.find(delimiter, start)) >= 0:
+        headers_end = buffer.find(b"\r\n\r\n", index)
+        if headers_end < 0:
+            return b"" if final else None
+        data_start = headers_end + 4
+        if b"filename=" in buffer[index:headers_end].lower():
+            end = buffer.find(b"\r\n" + delimiter, data_start)
+            if end >= 0:
+                return buffer[data_start:min(end, data_start + FILE_HEAD_SIZE)]
+            if final or len(buffer) - data_start >= FILE_HEAD_SIZE:
+                return buffer[data_start:data_start + FILE_HEAD_SIZE]
+            return None
+        start = data_start
+    return b"" if final else None
+
+
+class BodySizeLimitMiddleware:
+    """
+    Corta la petición con 413 en cuanto el cuerpo supera `max_bytes`, mientras los datos
+    todavía están llegando (no espera a que el multipart termine de parsearse).
+    Solo aplica a las rutas que empiezan con `path_prefix`.
+
+    Con `check_file_head`, le pasa los primeros bytes del primer archivo del multipart
+    apenas llegan (magic bytes); si lanza HTTPException la petición se corta ahí, sin que
+    Starlette guarde el resto del cuerpo en el spool.
+    """
+
+    def __init__(self, app, max_bytes: int, path_prefix: str,
+                 check_file_head: Optional[Callable[[bytes], object]] = None):
+        self.app = app
+        self.max_bytes = max_bytes
+        self.path_prefix = path_prefix
+        self.check_file_head = check_file_head
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not scope["path"].startswith(self.path_prefix):
+            await self.app(scope, receive, send)
+            return
+
+        detail = f"Archivo demasiado grande (máximo {self.max_bytes // (1024 * 1024)} MB)"
+        headers = dict(scope["headers"])
+        content_length = headers.get(b"content-length")
+        if content_length is not None and content_length.isdigit() and int(content_length) > self.max_bytes:
+            response = JSONResponse({"detail": detail}, status_code=413)
+            await response(scope, receive, send)
+            return
+
+        boundary = None
+        content_type = headers.get(b"content-type", b"")
+        if self.check_file_head and content_type.lower().startswith(b"multipart/"):
+            if match := _BOUNDARY.search(content_type):
+                boundary = match.group(1)
+        received = 0
+        preamble = b""
+
+        async def limited_receive():
+            nonlocal received, boundary, preamble
+            message = await receive()
+            if message["type"] == "http.request":
+                body = message.get("body", b"")
+                received += len(body)
+                if received > self.max_bytes:
+                    raise HTTPException(status_code=413, detail=detail)
+                if boundary is not None:
+                    preamble += body
+                    final = not message.get("more_body", False)
+                    head = _file_head(preamble, boundary, final)
+                    if head is None and len(preamble) > MAX_PREAMBLE:
+                        head = b""
+                    if head is not None:
+                        # Revisado (o sin archivo a la vista): el resto del cuerpo pasa directo
+                        boundary, preamble = None, b""
+                        if head:
+                            self.check_file_head(head)
+            return message
+
+        await self.app(scope, limited_receive, send)
@@ -0,0 +1,144 @@
+"""
+Operaciones en lote para los recursos del admin (timeline, certificaciones, educación,
+experiencia y proyectos).
+
+Un solo POST /api/<recurso>/bulk aplica altas, cambios, bajas y el orden de visualización
+en una sola transacción con un solo commit: o se aplica todo o nada. Cuerpo:
+
+    {
+      "create": [{...}, ...],            # mismo esquema que POST /api/<recurso>
+      "update": [{"id": 3, ...}, ...],   # mismo esquema que PUT, más el id
+      "delete": [7, 8],
+      "order": [5, "new:0", 3, ...]      # ids en orden; "new:N" = N-ésimo elemento de create
+    }
+
+Las altas van al final del orden (max(sort_order) + 1). Un "order" parcial pone primero
+los ids listados y renumera detrás al resto, en el orden en que se mostraban.
+"""
+from typing import List, Optional, Type, Union
+from fastapi import HTTPException
+from pydantic import BaseModel, create_model
+from sqlalchemy import delete, func, update
+from sqlmodel import select
+from app.db import async_session
+from app.cache import invalidate
+from app.pagination import display_order
+
+MAX_BULK_ITEMS = 500
+NEW_PREFIX = "new:"
+
+
+def bulk_schema(name: str, create_schema: Type[BaseModel], update_schema: Type[BaseModel]) -> Type[BaseModel]:
+    """Esquema del cuerpo del lote a partir de los esquemas de alta/cambio del recurso"""
+    update_item = create_model(f"{name}BulkUpdate", __base__=update_schema, id=(int, ...))
+    return create_model(
+        f"{name}Bulk",
+        create=(List[create_schema], []),
+        update=(List[update_item], []),
+        delete=(List[int], []),
+        order=(Optional[List[Union[int, str]]], None),
+    )
+
+
+def _resolve_order(order: list, created: list) -> List[int]:
+    ids = []
+    for entry in order:
+        if isinstance(entry, str) and entry.startswith(NEW_PREFIX):
+            index = entry[len(NEW_PREFIX):]
+            if not index.isdigit() or int(index) >= len(created):
+                raise HTTPException(status_code=400, detail=f"Invalid order reference: {entry}")
+            ids.append(created[int(index)].id)
+        elif isinstance(entry, int) or (isinstance(entry, str) and entry.isdigit()):
+            ids.append(int(entry))
+        else:
+            raise HTTPException(status_code=400, detail=f"Invalid order reference: {entry}")
+    if len(set(ids)) != len(ids):
+        raise HTTPException(status_code=400, detail="Duplicate ids in order")
+    return ids
+
+
+async def next_sort_order(session, model) -> int:
+    """sort_order para una fila nueva: al final del orden actual"""
+    current = (await session.exec(select(func.max(model.__table__.c.sort_order)))).one()
+    return 0 if current is None else current + 1
+
+
+async def apply_bulk(model, resource: str, data: BaseModel) -> dict:
+    """
+    Aplica el lote sobre `model` y devuelve lo creado/actualizado. Cualquier error
+    (id inexistente, referencia inválida, fallo de la BD) deshace la transacción completa.
+    """
+    total = len(data.create) + len(data.update) + len(data.delete) + len(data.order or [])
+    if total > MAX_BULK_ITEMS:
+        raise HTTPException(status_code=413, detail=f"Too many items (max {MAX_BULK_ITEMS})")
+
+    update_ids = [item.id for item in data.update]
+    if len(set(update_ids)) != len(update_ids):
+        raise HTTPException(status_code=400, detail="Duplicate ids in update")
+    if set(update_ids) & set(data.delete):
+        raise HTTPException(status_code=400, detail="The same id cannot be updated and deleted")
+
+    table = model.__table__
+    async with async_session() as session:
+        # Cambios: todas las filas en un solo SELECT
+        updated = []
+        if data.update:
+            rows = (await session.exec(select(model).where(table.c.id.in_(update_ids)))).all()
+            by_id = {row.id: row for row in rows}
+            missing = [item_id for item_id in update_ids if item_id not in by_id]
+            if missing:
+                raise HTTPException(status_code=404, detail=f"{resource} not found: {missing}")
+            for item in data.update:
+                row = by_id[item.id]
+                for key, value in item.model_dump(exclude_unset=True, exclude={"id"}).items():
+                    setattr(row, key, value)
+                updated.append(row)
+
+        deleted = 0
+        if data.delete:
+            result = await session.execute(delete(table).where(table.c.id.in_(data.delete)))
+            deleted = result.rowcount
+
+        created = [model(**item.model_dump()) for item in data.create]
+        first = await next_sort_order(session, model)
+        for offset, row in enumerate(created):
+            row.sort_order = first + offset
+        session.add_all(created)
+        # flush: asigna los ids de las altas (para "new:N") sin confirmar la transacción
+        await session.flush()
+
+        order = None
+        if data.order is not None:
+            order = _resolve_order(data.order, created)
+            current = (await session.exec(
+                select(table.c.id, table.c.sort_order).order_by(*display_order(model))
+            )).all()
+            missing = sorted(set(order) - {item_id for item_id, _ in current})
+            if missing:
+                raise HTTPException(status_code=404, detail=f"{resource} not found: {missing}")
+            # Los no listados van detrás, en el orden en que se mostraban (si quedaran en su
+            # sort_order anterior empatarían con los listados)
+            listed = set(order)
+            positions = order + [item_id for item_id, _ in current if item_id not in listed]
+            previous = dict(current)
+            # Las filas ya cargadas se ordenan en memoria (van en el mismo flush); el resto
+            # con un UPDATE por clave primaria en lote (executemany), solo si cambia
+            loaded = {row.id: row for row in created + updated}
+            params = []
+            for index, item_id in enumerate(positions):
+                if item_id in loaded:
+                    loaded[item_id].sort_order = index
+                elif previous[item_id] != index:
+                    params.append({"id": item_id, "sort_order": index})
+            if params:
+                await session.execute(update(model), params)
+
+        await session.commit()
+
+    invalidate(resource)
+    return {
+        "created": [row.model_dump() for row in created],
+        "updated": [row.model_dump() for row in updated],
+        "deleted": deleted,
+        "order": order,
+    }
@@ -0,0 +1,139 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Hashable, Iterable, Optional
+from app import versions
+
+
+class TTLCache:
+    """
+    Cache en memoria (por proceso) con límite LRU y expiración por TTL.
+    Cada entrada guarda un conjunto de tags (nombres de tabla) para poder
+    invalidar todo lo que depende de una tabla cuando el admin la modifica, y la
+    versión compartida de esas tablas (app/versions.py) con la que se cargó: si otro
+    worker escribió, la versión ya no coincide y la entrada cuenta como miss.
+    """
+
+    def __init__(self, maxsize: int = 256, ttl: float = 300.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._generations: dict = {}  # tag -> invalidaciones locales
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, key: Hashable, version: Hashable = None):
+        """Devuelve (hit, value). Las entradas vencidas o de otra versión cuentan como miss."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[0] < time.monotonic() or entry[3] != version:
+                if entry is not None:
+                    del self._data[key]
+                self.misses += 1
+                return False, None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return True, entry[1]
+
+    def set(self, key: Hashable, value: Any, tags: Iterable[str] = (), version: Hashable = None):
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value, frozenset(tags), version)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, *tags: str):
+        """Elimina todas las entradas que dependen de alguna de las tablas indicadas"""
+        with self._lock:
+            stale = [key for key, entry in self._data.items() if entry[2].intersection(tags)]
+            for key in stale:
+                del self._data[key]
+            for tag in tags:
+                self._generations[tag] = self._generations.get(tag, 0) + 1
+            self.invalidations += 1
+
+    def generation(self, tags: Iterable[str]) -> tuple:
+        """Contador de invalidaciones de cada tag (para descartar cargas que se cruzaron con una)"""
+        with self._lock:
+            return tuple(self._generations.get(tag, 0) for tag in tags)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / total, 4) if total else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "disabled": sorted(DISABLED),
+                "enabled": ENABLED,
+            }
+
+
+def _env_list(name: str) -> set:
+    return {item.strip() for item in os.getenv(name, "").split(",") if item.strip()}
+
+
+# CACHE_ENABLED=0 apaga la cache por completo; CACHE_DISABLED=proyecto,blog la apaga por recurso
+ENABLED = os.getenv("CACHE_ENABLED", "1") not in ("0", "false", "False")
+DISABLED = _env_list("CACHE_DISABLED")
+
+cache = TTLCache(
+    maxsize=int(os.getenv("CACHE_MAXSIZE", "256")),
+    ttl=float(os.getenv("CACHE_TTL", "300")),
+)
+
+
+def is_enabled(resource: str) -> bool:
+    return ENABLED and resource not in DISABLED
+
+
+async def read_through(
+    resource: str,
+    loader: Callable[[], Awaitable[Any]],
+    key: Hashable = None,
+    tags: Optional[Iterable[str]] = None,
+):
+    """
+    Devuelve el valor cacheado para (resource, key) o lo carga con `loader`.
+    `tags` son las tablas de las que depende el valor (por defecto solo `resource`).
+
+    Si mientras corre `loader` hay un invalidate() de alguno de los tags, el valor puede
+    ser anterior a esa escritura: se devuelve pero no se guarda.
+    """
+    if not is_enabled(resource):
+        return await loader()
+    tags = tuple(tags or (resource,))
+    cache_key = (resource, key)
+    version = await versions.current(tags)
+    hit, value = cache.get(cache_key, version)
+    if hit:
+        return value
+    generation = cache.generation(tags)
+    value = await loader()
+    if cache.generation(tags) == generation:
+        cache.set(cache_key, value, tags=tags, version=version)
+    return value
+
+
+def invalidate(*resources: str):
+    """
+    Llamar desde cada handler de escritura después del commit. La versión compartida ya
+    se incrementó en la transacción; acá se limpia la cache de este worker y se fuerza a
+    releer las versiones (los demás workers las ven en menos de VERSION_TTL).
+    """
+    versions.mark_stale()
+    cache.invalidate(*resources)
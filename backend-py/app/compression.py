@@ -0,0 +1,144 @@
+"""
+Compresión brotli/gzip de las respuestas (JSON de los listados, sobre todo /api/proyectos).
+
+- Negociación por Accept-Encoding (br > gzip, respetando q=0). brotli es opcional: sin el
+  paquete instalado solo se ofrece gzip.
+- Solo cuerpos completos (no streaming), con tipo comprimible y de al menos
+  COMPRESSION_MIN_BYTES. /uploads queda fuera (allí se sirven los .br/.gz precomprimidos).
+- Los GET con ETag (los listados con `conditional(...)`) guardan los bytes comprimidos en
+  una TTLCache con clave (ETag, encoding): el ETag ya identifica ruta + query + versión de
+  las tablas, así que el mismo payload no se vuelve a comprimir en cada petición y una
+  escritura lo invalida sola al cambiar el ETag.
+- La respuesta comprimida lleva su propio ETag ("<etag>-br" / "<etag>-gzip", ver
+  app/versions.py): los bytes no son los de la identidad, así que el ETag fuerte tampoco.
+"""
+import gzip
+import os
+import anyio
+from starlette.datastructures import Headers, MutableHeaders
+from app.cache import TTLCache
+from app.versions import encoded_etag
+
+try:
+    import brotli
+except ImportError:  # dependencia opcional
+    brotli = None
+
+COMPRESSION_ENABLED = os.getenv("COMPRESSION_ENABLED", "1") not in ("0", "false", "False")
+COMPRESSION_MIN_BYTES = int(os.getenv("COMPRESSION_MIN_BYTES", "1024"))
+GZIP_LEVEL = int(os.getenv("COMPRESSION_GZIP_LEVEL", "6"))
+BROTLI_QUALITY = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "5"))
+# Cuerpos más grandes que esto se comprimen en un thread para no frenar el event loop
+THREAD_THRESHOLD = 128 * 1024
+
+COMPRESSIBLE_TYPES = ("application/json", "text/", "application/javascript", "application/xml", "image/svg+xml")
+
+compressed_cache = TTLCache(
+    maxsize=int(os.getenv("COMPRESSION_CACHE_MAXSIZE", "256")),
+    ttl=float(os.getenv("CACHE_TTL", "300")),
+)
+
+
+def available_encodings() -> tuple:
+    return ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def negotiate(accept_encoding: str):
+    """Mejor encoding soportado según Accept-Encoding, o None para enviar sin comprimir"""
+    weights = {}
+    for part in accept_encoding.split(","):
+        coding, *params = [item.strip() for item in part.split(";")]
+        if not coding:
+            continue
+        weight = 1.0
+        for param in params:
+            if param.startswith("q="):
+                try:
+                    weight = float(param[2:])
+                except ValueError:
+                    weight = 0.0
+        weights[coding.lower()] = weight
+
+    best, best_weight = None, 0.0
+    for coding in available_encodings():
+        weight = weights.get(coding, weights.get("*", 0.0))
+        if weight > best_weight:
+            best, best_weight = coding, weight
+    return best
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+
+
+def _is_compressible(headers: Headers) -> bool:
+    content_type = headers.get("content-type", "")
+    return "content-encoding" not in headers and content_type.startswith(COMPRESSIBLE_TYPES)
+
+
+class CompressionMiddleware:
+    def __init__(self, app, minimum_size: int = COMPRESSION_MIN_BYTES, exclude_prefixes: tuple = ("/uploads",)):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.exclude_prefixes = exclude_prefixes
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"].startswith(self.exclude_prefixes):
+            await self.app(scope, receive, send)
+            return
+
+        request_headers = Headers(scope=scope)
+        encoding = negotiate(request_headers.get("accept-encoding", ""))
+        method = scope["method"]
+        start_message = None
+        passthrough = False
+
+        async def compressing_send(message):
+            nonlocal start_message, passthrough
+            if passthrough:
+                await send(message)
+                return
+            if message["type"] == "http.response.start":
+                start_message = message
+                return
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            headers = MutableHeaders(raw=start_message["headers"])
+            body = message.get("body", b"")
+            if not _is_compressible(headers):
+                passthrough = True
+                await send(start_message)
+                await send(message)
+                return
+
+            headers.add_vary_header("Accept-Encoding")
+            if message.get("more_body", False) or method == "HEAD" or encoding is None \
+                    or start_message["status"] != 200 or len(body) < self.minimum_size:
+                # Streaming, HEAD o cuerpo chico: se envía tal cual
+                passthrough = True
+                await send(start_message)
+                await send(message)
+                return
+
+            etag = headers.get("etag") if method == "GET" else None
+            hit, compressed = compressed_cache.get((etag, encoding)) if etag else (False, None)
+            if not hit:
+                if len(body) > THREAD_THRESHOLD:
+                    compressed = await anyio.to_thread.run_sync(compress, body, encoding)
+                else:
+                    compressed = compress(body, encoding)
+                if etag:
+                    compressed_cache.set((etag, encoding), compressed)
+
+            headers["Content-Encoding"] = encoding
+            headers["Content-Length"] = str(len(compressed))
+            if headers.get("etag"):
+                headers["ETag"] = encoded_etag(headers["etag"], encoding)
+            await send(start_message)
+            await send({"type": "http.response.body", "body": compressed})
+
+        await self.app(scope, receive, compressing_send if COMPRESSION_ENABLED else send)
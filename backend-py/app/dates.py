@@ -0,0 +1,151 @@
+"""
+Fechas tipadas a partir de los textos libres que carga el admin.
+
+Los textos originales (`deployment_date`, `period`, `year`, ...) se siguen guardando tal
+cual para mostrarlos; al lado hay columnas DATE / TIMESTAMP indexadas que se derivan de
+ellos al escribir (eventos before_insert/before_update en app/models.py) y que usan los
+listados para `?from=&to=&order=`.
+
+Formatos aceptados: "2024-05-12", "2024-05", "2024", "12/05/2024", "05/2024",
+"Enero 2020", "ene. de 2020", "Jan 2020", y períodos "2019 - 2021", "Mar 2020 – Presente",
+"2018 a 2020". Lo que no se puede interpretar queda en NULL.
+"""
+import calendar
+import re
+import unicodedata
+from datetime import date, datetime, timezone
+from typing import Optional, Tuple
+
+MONTHS = {
+    "ene": 1, "enero": 1, "jan": 1, "january": 1,
+    "feb": 2, "febrero": 2, "february": 2,
+    "mar": 3, "marzo": 3, "march": 3,
+    "abr": 4, "abril": 4, "apr": 4, "april": 4,
+    "may": 5, "mayo": 5,
+    "jun": 6, "junio": 6, "june": 6,
+    "jul": 7, "julio": 7, "july": 7,
+    "ago": 8, "agosto": 8, "aug": 8, "august": 8,
+    "sep": 9, "sept": 9, "septiembre": 9, "setiembre": 9, "september": 9,
+    "oct": 10, "octubre": 10, "october": 10,
+    "nov": 11, "noviembre": 11, "november": 11,
+    "dic": 12, "diciembre": 12, "dec": 12, "december": 12,
+}
+ONGOING = {"presente", "actualidad", "actual", "hoy", "en curso", "present", "current", "now", "today"}
+
+_ISO = re.compile(r"^(\d{4})-(\d{1,2})(?:-(\d{1,2}))?")
+_DMY = re.compile(r"^(\d{1,2})[/.-](\d{1,2})[/.-](\d{4})$")
+_MY = re.compile(r"^(\d{1,2})[/.-](\d{4})$")
+_YEAR = re.compile(r"^(\d{4})$")
+_MONTH_YEAR = re.compile(r"^([a-z]+)\.?\s+(?:de\s+|del\s+)?(\d{4})$")
+_ANY_YEAR = re.compile(r"\b((?:19|20)\d{2})\b")
+_PERIOD_SEPARATOR = re.compile(r"\s+[-–—]\s+|\s*[–—]\s*|\s+(?:a|al|to|hasta)\s+")
+_YEAR_RANGE = re.compile(r"^(\d{4})\s*-\s*(\d{4}|[^\d].*)$")
+
+
+def _normalize(text: str) -> str:
+    # minúsculas y sin tildes ("Diciembre", "diciémbre" -> "diciembre")
+    text = unicodedata.normalize("NFKD", text.strip().lower())
+    return "".join(char for char in text if not unicodedata.combining(char))
+
+
+def _build(year: int, month: Optional[int], day: Optional[int], end: bool) -> Optional[date]:
+    """Fecha completa; si es parcial, primer día del período (o último con end=True)"""
+    try:
+        if month is None:
+            return date(year, 12, 31) if end else date(year, 1, 1)
+        if day is None:
+            return date(year, month, calendar.monthrange(year, month)[1] if end else 1)
+        return date(year, month, day)
+    except ValueError:
+        return None
+
+
+def parse_date(text: Optional[str], end: bool = False) -> Optional[date]:
+    if not text or not text.strip():
+        return None
+    value = _normalize(text)
+    if match := _ISO.match(value):
+        year, month, day = match.groups()
+        return _build(int(year), int(month), int(day) if day else None, end)
+    if match := _DMY.match(value):
+        day, month, year = match.groups()
+        return _build(int(year), int(month), int(day), end)
+    if match := _MY.match(value):
+        month, year = match.groups()
+        return _build(int(year), int(month), None, end)
+    if match := _YEAR.match(value):
+        return _build(int(match.group(1)), None, None, end)
+    if (match := _MONTH_YEAR.match(value)) and match.group(1) in MONTHS:
+        return _build(int(match.group(2)), MONTHS[match.group(1)], None, end)
+    # Último recurso: el primer año que aparezca ("Verano 2019", "2020 (online)")
+    if match := _ANY_YEAR.search(value):
+        return _build(int(match.group(1)), None, None, end)
+    return None
+
+
+def parse_end_date(text: Optional[str]) -> Optional[date]:
+    """Fin de un período: "2021" -> 2021-12-31; "Presente" -> None"""
+    if text and _normalize(text) in ONGOING:
+        return None
+    return parse_date(text, end=True)
+
+
+def parse_period(text: Optional[str]) -> Tuple[Optional[date], Optional[date]]:
+    """ "Mar 2020 - Presente" -> (2020-03-01, None); "2019 - 2021" -> (2019-01-01, 2021-12-31)"""
+    if not text or not text.strip():
+        return None, None
+    parts = _PERIOD_SEPARATOR.split(text.strip(), maxsplit=1)
+    if len(parts) == 1 and (match := _YEAR_RANGE.match(_normalize(text))):
+        parts = list(match.groups())
+    start = parse_date(parts[0])
+    end = parse_end_date(parts[1]) if len(parts) > 1 else None
+    return start, end
+
+
+def period_start(text: Optional[str]) -> Optional[date]:
+    return parse_period(text)[0]
+
+
+def period_end(text: Optional[str]) -> Optional[date]:
+    return parse_period(text)[1]
+
+
+def parse_timestamp(text: Optional[str]) -> Optional[datetime]:
+    """ISO 8601 (lo que guarda enviar_cotizacion); sin zona horaria se asume UTC"""
+    if not text:
+        return None
+    try:
+        value = datetime.fromisoformat(text.strip())
+    except ValueError:
+        parsed = parse_date(text)
+        return datetime(parsed.year, parsed.month, parsed.day, tzinfo=timezone.utc) if parsed else None
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+# tabla -> {columna tipada: (columna de texto de origen, parser)}
+DERIVED = {
+    "proyecto": {"deployed_on": ("deployment_date", parse_date)},
+    "cotizacion": {"received_at": ("created_at", parse_timestamp)},
+    "certification": {"issued_on": ("date", parse_date)},
+    "education": {"start_on": ("start_year", parse_date), "end_on": ("end_year", parse_end_date)},
+    "timeline": {"event_on": ("year", period_start)},
+    "experience": {"start_on": ("period", period_start), "end_on": ("period", period_end)},
+}
+
+# Columna cronológica de cada listado (?from=&to=&order=date)
+DATE_COLUMN = {
+    "proyecto": "deployed_on",
+    "certification": "issued_on",
+    "education": "start_on",
+    "timeline": "event_on",
+    "experience": "start_on",
+}
+
+
+def derive(table: str, values: dict) -> dict:
+    """Columnas tipadas calculadas desde los textos presentes en `values`"""
+    return {
+        column: parser(values[source])
+        for column, (source, parser) in DERIVED.get(table, {}).items()
+        if source in values
+    }
@@ -0,0 +1,91 @@
+"""
+Derivados responsive de las imágenes subidas.
+
+Al terminar una subida de imagen se generan versiones WebP/AVIF a varios anchos y un
+placeholder diminuto (data URI) en un ProcessPoolExecutor, para que el redimensionado
+(CPU pura) no bloquee a los workers de la API.
+"""
+import asyncio
+import base64
+import io
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+IMAGE_VARIANTS = os.getenv("IMAGE_VARIANTS", "1") not in ("0", "false", "False")
+WIDTHS = tuple(int(w) for w in os.getenv("IMAGE_WIDTHS", "320,640,1024,1600").split(","))
+FORMATS = ("avif", "webp")
+# Solo formatos que Pillow decodifica bien; GIF animado / HEIC se dejan como están
+SOURCE_TYPES = ("image/jpeg", "image/png", "image/webp")
+MAX_SOURCE_BYTES = int(os.getenv("IMAGE_VARIANTS_MAX_MB", "25")) * 1024 * 1024
+PLACEHOLDER_WIDTH = 16
+QUALITY = {"webp": 80, "avif": 55}
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+
+def _supported_formats() -> list:
+    from PIL import Image
+
+    Image.init()
+    return [fmt for fmt in FORMATS if fmt.upper() in Image.SAVE]
+
+
+def render_variants(data: bytes, widths=WIDTHS) -> dict:
+    """
+    Se ejecuta en el proceso hijo. Devuelve:
+      {"width": ..., "height": ..., "variants": [(format, width, bytes)], "placeholder": "data:..."}
+    Nunca agranda la imagen: solo se generan anchos menores al original.
+    """
+    from PIL import Image, ImageOps
+
+    with Image.open(io.BytesIO(data)) as source:
+        image = ImageOps.exif_transpose(source)
+        image = image.convert("RGBA" if image.mode in ("RGBA", "LA", "P") else "RGB")
+        original_width, original_height = image.size
+
+        variants = []
+        for width in sorted(w for w in widths if w < original_width):
+            height = max(1, round(original_height * width / original_width))
+            resized = image.resize((width, height), Image.Resampling.LANCZOS)
+            for fmt in _supported_formats():
+                out = io.BytesIO()
+                resized.save(out, format=fmt.upper(), quality=QUALITY[fmt])
+                variants.append((fmt, width, out.getvalue()))
+
+        height = max(1, round(original_height * PLACEHOLDER_WIDTH / original_width))
+        tiny = image.resize((PLACEHOLDER_WIDTH, height), Image.Resampling.BILINEAR)
+        out = io.BytesIO()
+        tiny.save(out, format="WEBP", quality=30)
+        placeholder = "data:image/webp;base64," + base64.b64encode(out.getvalue()).decode()
+
+    return {
+        "width": original_width,
+        "height": original_height,
+        "variants": variants,
+        "placeholder": placeholder,
+    }
+
+
+def get_pool() -> ProcessPoolExecutor:
+    """Pool creado de forma perezosa en la primera imagen (no en el arranque)"""
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=int(os.getenv("IMAGE_WORKERS", "2")))
+    return _pool
+
+
+def shutdown_pool():
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+def should_process(content_type: str, size: int) -> bool:
+    return IMAGE_VARIANTS and content_type in SOURCE_TYPES and size <= MAX_SOURCE_BYTES
+
+
+async def build_variants(data: bytes) -> dict:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_pool(), render_variants, data)
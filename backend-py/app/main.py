@@ -1,18 +1,39 @@
 from dotenv import load_dotenv
 load_dotenv()
 import os
-print(f"--- DIAGNÓSTICO DE INICIO ---")
-print(f"CLOUDINARY_CLOUD_NAME: {'CONFIGURADO' if os.getenv('CLOUDINARY_CLOUD_NAME') else 'NO ENCONTRADO'}")
-print(f"-----------------------------")
+from contextlib import asynccontextmanager
 
-from fastapi import FastAPI
+from fastapi import Depends, FastAPI, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
-from app.api import blog, proyectos, enviar_cotizacion, profile, experience, education, timeline, certifications, contact, upload
-from app.db import init_db
+from app.api import blog, proyectos, enviar_cotizacion, profile, experience, education, timeline, certifications, contact, upload, portfolio, internal, search
+from app.api.internal import require_internal_token
+from app.db import async_engine
+from app.migrations import check_schema_version
+from app.versions import NotModified
+from app.body_limit import BodySizeLimitMiddleware
+from app.compression import CompressionMiddleware
+from app import metrics
+from app.sqltrace import QueryTraceMiddleware
+from app.profiling import ProfilingMiddleware
+from app.responses import ORJSONResponse
+from app.storage import UPLOADS_DIR
+from app.static import UploadsStaticFiles
+from app.images import shutdown_pool
 from pathlib import Path
 
-app = FastAPI(title="PORTAFOLIO API")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Sin DDL al arrancar: el esquema lo aplica `alembic upgrade head` en el deploy, aquí
+    # solo se compara la versión (una consulta). Cloudinary, el process pool de imágenes y
+    # demás clientes se inicializan recién en su primer uso.
+    await check_schema_version(async_engine)
+    yield
+    # Cerrar el process pool de derivados de imágenes (si llegó a crearse) y las conexiones
+    shutdown_pool()
+    await async_engine.dispose()
+
+
+app = FastAPI(title="PORTAFOLIO API", default_response_class=ORJSONResponse, lifespan=lifespan)
 
 # CORS: permitir el frontend Next.js en desarrollo y producción
 origins = [
@@ -21,14 +42,43 @@ origins = [
     os.getenv("FRONTEND_URL", "*"), # Permitir URL de producción desde variables de entorno
 ]
 
+# Cortar subidas demasiado grandes o de un tipo no permitido (magic bytes del primer
+# bloque) mientras llegan, antes de parsear el multipart
+app.add_middleware(
+    BodySizeLimitMiddleware, max_bytes=upload.UPLOAD_MAX_BYTES, path_prefix="/api/upload",
+    check_file_head=upload.allowed_content_type,
+)
+
+# Compresión brotli/gzip de las respuestas (bytes comprimidos cacheados por ETag)
+app.add_middleware(CompressionMiddleware)
+
+# Perfilado opt-in de peticiones (X-Profile + token interno, o muestreo)
+app.add_middleware(ProfilingMiddleware)
+
+# Métricas por ruta para /metrics (mide también la compresión)
+app.add_middleware(metrics.MetricsMiddleware)
+
+# Consultas por petición: Server-Timing, aviso de N+1. Por fuera de las métricas, para
+# que lean las mismas estadísticas de BD.
+app.add_middleware(QueryTraceMiddleware)
+
+# CORS: el último en registrarse es el más externo, así también llevan los headers CORS
+# las respuestas que cortan antes los otros middlewares (413/415 de las subidas)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=origins,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "Link", "Retry-After", "Server-Timing"],  # cursores, 429 y tiempos
 )
 
+# GET condicional: If-None-Match / If-Modified-Since sin cambios -> 304 sin cuerpo
+@app.exception_handler(NotModified)
+def not_modified_handler(request: Request, exc: NotModified):
+    return Response(status_code=304, headers=exc.headers)
+
+
 # Routers existentes
 app.include_router(blog.router, prefix="/api/blog", tags=["blog"])
 app.include_router(proyectos.router, prefix="/api/proyectos", tags=["proyectos"])
@@ -43,19 +93,27 @@ app.include_router(certifications.router, prefix="/api/certifications", tags=["c
 app.include_router(contact.router, prefix="/api/contact", tags=["contact"])
 app.include_router(upload.router, prefix="/api/upload", tags=["upload"])
 
-# Asegurar que el directorio de uploads exista
-uploads_path = Path("uploads")
-uploads_path.mkdir(parents=True, exist_ok=True)
+# Snapshot agregado para la home (una sola petición)
+app.include_router(portfolio.router, prefix="/api/portfolio", tags=["portfolio"])
+app.include_router(search.router, prefix="/api/search", tags=["search"])
 
-# Servir archivos estáticos
-app.mount("/uploads", StaticFiles(directory="uploads"), name="uploads")
+# Endpoints internos (estadísticas de cache, etc.)
+app.include_router(internal.router, prefix="/internal", tags=["internal"])
 
+# Asegurar que el directorio de uploads exista (lo usa el storage local)
+uploads_path = Path(UPLOADS_DIR)
+uploads_path.mkdir(parents=True, exist_ok=True)
 
-@app.on_event("startup")
-def on_startup():
-    init_db()
+# Servir archivos estáticos (cache inmutable para nombres con hash, Range, .br/.gz, X-Accel-Redirect)
+app.mount("/uploads", UploadsStaticFiles(directory=uploads_path), name="uploads")
 
 
 @app.get("/health")
 def health():
     return {"status": "ok"}
+
+
+@app.get("/metrics", include_in_schema=False, dependencies=[Depends(require_internal_token)])
+async def metrics_endpoint():
+    """Métricas de este worker en formato Prometheus"""
+    return Response(metrics.render(), media_type=metrics.CONTENT_TYPE)
@@ -0,0 +1,212 @@
+"""
+Métricas en formato de exposición de Prometheus (texto), sin dependencias externas.
+
+- MetricsMiddleware (ASGI puro): por petición cuenta status y latencia por ruta, usando la
+  plantilla (`/api/proyectos/{item_id}`) y no la URL para acotar la cardinalidad. También
+  registra el tiempo y la cantidad de consultas a la BD de cada petición.
+  El tiempo de BD sale de las estadísticas de la petición que arma app/sqltrace.py
+  (QueryTraceMiddleware, que va por fuera de este middleware).
+- GET /metrics: además de lo anterior, el threadpool de Starlette (ocupados / esperando)
+  y el pool de conexiones, leídos al momento del scrape.
+
+Costo en el camino caliente: dos perf_counter y un lock corto por petición.
+
+Las métricas son por proceso: con varios workers de uvicorn detrás de un mismo puerto
+cada scrape ve un worker distinto, así que conviene un worker por contenedor.
+"""
+import os
+import threading
+import time
+from bisect import bisect_left
+from app.sqltrace import current_request
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "1") not in ("0", "false", "False")
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+SIZE_BUCKETS = (16 * 1024, 128 * 1024, 1024 ** 2, 5 * 1024 ** 2, 20 * 1024 ** 2, 100 * 1024 ** 2)
+
+_lock = threading.Lock()
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: tuple, values: tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_number(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class Counter:
+    def __init__(self, name: str, description: str, labels: tuple = ()):
+        self.name, self.description, self.labels = name, description, labels
+        self.values = {}
+
+    def inc(self, labels: tuple = (), amount: float = 1.0):
+        with _lock:
+            self.values[labels] = self.values.get(labels, 0.0) + amount
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} counter"]
+        for labels, value in sorted(self.values.items()):
+            lines.append(f"{self.name}{_format_labels(self.labels, labels)} {_format_number(value)}")
+        return lines
+
+
+class Gauge(Counter):
+    def set(self, labels: tuple = (), value: float = 0.0):
+        with _lock:
+            self.values[labels] = value
+
+    def render(self) -> list:
+        lines = super().render()
+        lines[1] = f"# TYPE {self.name} gauge"
+        return lines
+
+
+class Histogram:
+    """Buckets fijos; se guardan conteos por bucket y se acumulan recién al exponer"""
+
+    def __init__(self, name: str, description: str, labels: tuple = (), buckets: tuple = LATENCY_BUCKETS):
+        self.name, self.description, self.labels, self.buckets = name, description, labels, buckets
+        self.values = {}  # labels -> [conteos por bucket (+Inf al final), suma]
+
+    def observe(self, labels: tuple, value: float):
+        index = bisect_left(self.buckets, value)
+        with _lock:
+            state = self.values.get(labels)
+            if state is None:
+                state = self.values[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            state[0][index] += 1
+            state[1] += value
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} histogram"]
+        for labels, (counts, total) in sorted(self.values.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else _format_number(bound)
+                bucket_labels = _format_labels(self.labels, labels, f'le="{le}"')
+                lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labels, labels)} {_format_number(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.labels, labels)} {cumulative}")
+        return lines
+
+
+# ---------- Métricas ----------
+
+http_requests = Counter("http_requests_total", "Peticiones HTTP por ruta, método y status", ("method", "route", "status"))
+http_duration = Histogram("http_request_duration_seconds", "Latencia de las peticiones HTTP", ("method", "route"))
+http_in_progress = Gauge("http_requests_in_progress", "Peticiones HTTP en curso")
+db_duration = Histogram("http_request_db_seconds", "Tiempo en la BD por petición", ("method", "route"))
+db_queries = Histogram(
+    "http_request_db_queries", "Consultas a la BD por petición", ("method", "route"), buckets=QUERY_COUNT_BUCKETS
+)
+upload_bytes = Counter("upload_bytes_total", "Bytes recibidos en /api/upload", ("backend", "result"))
+upload_size = Histogram("upload_size_bytes", "Tamaño de los archivos subidos", ("backend",), buckets=SIZE_BUCKETS)
+upload_duration = Histogram(
+    "upload_duration_seconds", "Procesamiento de una subida (hash, storage, derivados)", ("backend", "result")
+)
+upload_storage_duration = Histogram("upload_storage_seconds", "Escritura del archivo original en el storage", ("backend",))
+
+REGISTRY = [http_requests, http_duration, http_in_progress, db_duration, db_queries,
+            upload_bytes, upload_size, upload_duration, upload_storage_duration]
+
+
+# ---------- Middleware ----------
+
+def route_template(scope) -> str:
+    """
+    Plantilla de la ruta atendida (`/api/proyectos/{item_id}`). Los routers incluidos dejan
+    en scope["route"] solo la ruta relativa al prefijo, así que el prefijo se recupera de
+    la URL quitándole la parte relativa renderizada con los path params.
+    """
+    route = scope.get("route")
+    path_format = getattr(route, "path_format", None)
+    if path_format is None:
+        # Mounts (/uploads) no dejan la ruta interna, pero sí su root_path
+        root_path = scope.get("root_path", "")[len(scope.get("app_root_path", "")):]
+        return root_path or "unmatched"
+    try:
+        rendered = path_format.format(**scope.get("path_params", {}))
+    except (KeyError, IndexError, ValueError):
+        return path_format
+    path = scope["path"]
+    if not path.endswith(rendered):
+        return path_format
+    return path[:len(path) - len(rendered)] + path_format
+
+
+class MetricsMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not METRICS_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        stats = current_request.get()
+        status = 500
+
+        async def recording_send(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        http_in_progress.inc(amount=1)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, recording_send)
+        finally:
+            elapsed = time.perf_counter() - start
+            http_in_progress.inc(amount=-1)
+            labels = (scope["method"], route_template(scope))
+            http_requests.inc(labels + (str(status),))
+            http_duration.observe(labels, elapsed)
+            if stats is not None:
+                db_duration.observe(labels, stats.db_time)
+                db_queries.observe(labels, stats.db_queries)
+
+
+# ---------- Exposición ----------
+
+def _runtime_gauges() -> list:
+    """Threadpool de Starlette y pools de conexiones, leídos al momento del scrape"""
+    from anyio.to_thread import current_default_thread_limiter
+    from app.db import pool_stats
+
+    limiter = current_default_thread_limiter()
+    threadpool = Gauge("threadpool_threads", "Threadpool de Starlette (rutas sync, to_thread)", ("state",))
+    threadpool.set(("busy",), limiter.borrowed_tokens)
+    threadpool.set(("max",), limiter.total_tokens)
+    threadpool.set(("waiting",), limiter.statistics().tasks_waiting)
+
+    pool = Gauge("db_pool_connections", "Conexiones del pool por engine", ("engine", "state"))
+    wait = Counter("db_pool_wait_seconds_total", "Espera acumulada para obtener una conexión", ("engine",))
+    timeouts = Counter("db_pool_timeouts_total", "Timeouts esperando una conexión", ("engine",))
+    for snapshot in pool_stats()["engines"]:
+        for state in ("checkedout", "checkedin", "overflow"):
+            if snapshot.get(state) is not None:
+                pool.set((snapshot["name"], state), snapshot[state])
+        wait.inc((snapshot["name"],), snapshot["wait_total_ms"] / 1000)
+        timeouts.inc((snapshot["name"],), snapshot["timeouts"])
+    return [threadpool, pool, wait, timeouts]
+
+
+def render() -> str:
+    """Texto para GET /metrics (llamar desde una ruta async: lee el limiter de anyio)"""
+    metrics = REGISTRY + _runtime_gauges()
+    with _lock:
+        lines = [line for metric in metrics for line in metric.render()]
+    return "\n".join(lines) + "\n"
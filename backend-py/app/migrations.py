@@ -0,0 +1,245 @@
+"""
+Utilidades de esquema compartidas por las revisiones de Alembic (alembic/versions) y el
+chequeo de versión que hace la API al arrancar.
+
+Las revisiones son idempotentes (crean tablas / columnas / índices solo si faltan) para
+poder aplicarlas tanto sobre una base nueva como sobre una creada con los scripts viejos
+o con `create_all`.
+"""
+import ast
+import os
+from pathlib import Path
+from typing import Callable, Optional
+from sqlalchemy import bindparam, inspect, text
+
+ALEMBIC_INI = Path(__file__).resolve().parent.parent / "alembic.ini"
+
+
+def has_table(bind, table: str) -> bool:
+    return inspect(bind).has_table(table)
+
+
+def has_column(bind, table: str, column: str) -> bool:
+    return column in {col["name"] for col in inspect(bind).get_columns(table)}
+
+
+def has_index(bind, table: str, index: str) -> bool:
+    return index in {ix["name"] for ix in inspect(bind).get_indexes(table)}
+
+
+def add_column_if_missing(op, table: str, column):
+    """ADD COLUMN sin default volátil: en PostgreSQL 11+ es solo un cambio de catálogo (sin reescribir)"""
+    if not has_column(op.get_bind(), table, column.name):
+        op.add_column(table, column)
+
+
+def _postgres_index_valid(bind, name: str) -> Optional[bool]:
+    """None si el índice no existe; False si quedó inválido (CREATE INDEX CONCURRENTLY cortado)"""
+    return bind.execute(text(
+        "SELECT i.indisvalid FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid WHERE c.relname = :name"
+    ), {"name": name}).scalar()
+
+
+def create_index_if_missing(op, name: str, table: str, columns: list, **kwargs):
+    """
+    En PostgreSQL el índice se construye con CREATE INDEX CONCURRENTLY (sin bloquear las
+    escrituras de la tabla), que no puede correr dentro de una transacción: primero se
+    confirma lo que la revisión hizo hasta ahora (autocommit_block). Si un intento
+    anterior se cortó, el índice inválido que dejó se borra y se vuelve a crear.
+    """
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql":
+        if not has_index(bind, table, name):
+            op.create_index(name, table, columns, **kwargs)
+        return
+    valid = _postgres_index_valid(bind, name)
+    if valid:
+        return
+    with op.get_context().autocommit_block():
+        if valid is False:
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
+        op.create_index(name, table, columns, postgresql_concurrently=True, **kwargs)
+
+
+def drop_index_if_exists(op, name: str, table: str):
+    """DROP INDEX (CONCURRENTLY en PostgreSQL, fuera de la transacción)"""
+    bind = op.get_bind()
+    if not has_index(bind, table, name):
+        return
+    if bind.dialect.name != "postgresql":
+        op.drop_index(name, table_name=table)
+        return
+    with op.get_context().autocommit_block():
+        op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
+
+
+def create_table_if_missing(op, table: str, *columns, **kwargs):
+    if not has_table(op.get_bind(), table):
+        op.create_table(table, *columns, **kwargs)
+
+
+# ---------- Backfill en lotes ----------
+
+BACKFILL_BATCH_SIZE = int(os.getenv("BACKFILL_BATCH_SIZE", "500"))
+
+
+def backfill(op, table: str, columns: list, compute: Callable[[dict], Optional[dict]],
+             pending: str = "1 = 1", batch_size: Optional[int] = None, types: Optional[dict] = None) -> int:
+    """
+    Rellena `table` de a `batch_size` filas, cada lote en su propia transacción, para no
+    tener la tabla bloqueada durante todo el backfill ni perder el avance si se corta.
+
+    - columns: columnas que recibe `compute` (además de id)
+    - compute(row) -> {columna: valor} a escribir, o None para dejar la fila como está
+    - pending: condición SQL de las filas que faltan. Si la migración se interrumpe, volver
+      a correr `alembic upgrade head` sigue solo con esas filas.
+    - types: {columna: tipo de SQLAlchemy} de los valores escritos que lo necesiten (fechas:
+      sin el tipo, SQLite las guardaría en un formato distinto al de la columna)
+
+    Primero confirma el DDL que la revisión haya hecho hasta ahora (autocommit_block de
+    Alembic); los lotes usan otra conexión del mismo engine. Devuelve las filas escritas.
+    """
+    context = op.get_context()
+    if context.as_sql:
+        print(f"⚠️ Backfill de {table} omitido en modo --sql: correr la migración contra la BD")
+        return 0
+    batch_size = batch_size or BACKFILL_BATCH_SIZE
+    select = text(
+        f"SELECT id, {', '.join(columns)} FROM {table} "
+        f"WHERE id > :last_id AND ({pending}) ORDER BY id LIMIT :limit"
+    )
+    written = 0
+    with context.autocommit_block():
+        engine = op.get_bind().engine
+        with engine.connect() as conn:
+            total = conn.execute(text(f"SELECT COUNT(*) FROM {table} WHERE {pending}")).scalar()
+        if not total:
+            return 0
+        print(f"Backfill {table} ({total} filas, lotes de {batch_size})")
+        last_id, seen = 0, 0
+        while True:
+            with engine.begin() as conn:
+                rows = conn.execute(select, {"last_id": last_id, "limit": batch_size}).mappings().all()
+                if not rows:
+                    break
+                changes = [(row["id"], values) for row in rows if (values := compute(dict(row)))]
+                # executemany por conjunto de columnas (cada UPDATE necesita las mismas claves)
+                by_keys = {}
+                for row_id, values in changes:
+                    by_keys.setdefault(tuple(sorted(values)), []).append({**values, "_id": row_id})
+                for keys, params in by_keys.items():
+                    assignments = ", ".join(f"{key} = :{key}" for key in keys)
+                    update = text(f"UPDATE {table} SET {assignments} WHERE id = :_id").bindparams(
+                        *[bindparam(key, type_=types[key]) for key in keys if types and key in types]
+                    )
+                    conn.execute(update, params)
+            last_id = rows[-1]["id"]
+            seen += len(rows)
+            written += len(changes)
+            print(f"  {table}: {seen}/{total} ({seen * 100 // total}%)")
+    print(f"✅ Backfill {table}: {written} filas actualizadas")
+    return written
+
+
+def backfill_sql(op, table: str, assignments: str, pending: str, batch_size: Optional[int] = None) -> int:
+    """
+    Como backfill, pero el valor nuevo se calcula en SQL: `UPDATE table SET assignments`
+    sobre rangos de a `batch_size` ids que cumplen `pending`, cada uno en su transacción.
+    """
+    context = op.get_context()
+    if context.as_sql:
+        print(f"⚠️ Backfill de {table} omitido en modo --sql: correr la migración contra la BD")
+        return 0
+    batch_size = batch_size or BACKFILL_BATCH_SIZE
+    upper = text(
+        f"SELECT max(id) FROM (SELECT id FROM {table} WHERE id > :last_id AND ({pending}) "
+        f"ORDER BY id LIMIT :limit) AS batch"
+    )
+    update = text(f"UPDATE {table} SET {assignments} WHERE id > :last_id AND id <= :upto AND ({pending})")
+    written = 0
+    with context.autocommit_block():
+        engine = op.get_bind().engine
+        last_id = 0
+        while True:
+            with engine.begin() as conn:
+                upto = conn.execute(upper, {"last_id": last_id, "limit": batch_size}).scalar()
+                if upto is None:
+                    break
+                written += conn.execute(update, {"last_id": last_id, "upto": upto}).rowcount
+            last_id = upto
+            print(f"  {table}: {written} filas (hasta id {upto})")
+    print(f"✅ Backfill {table}: {written} filas actualizadas")
+    return written
+
+
+# ---------- Chequeo al arrancar ----------
+
+def head_revision() -> Optional[str]:
+    """
+    Revisión head según los archivos de alembic/versions, sin tocar la BD. Lee solo las
+    asignaciones `revision` / `down_revision` con ast en vez de cargar ScriptDirectory de
+    Alembic (que importa cada revisión y cuesta cientos de ms en el arranque).
+    """
+    revisions, parents = set(), set()
+    for path in (ALEMBIC_INI.parent / "alembic" / "versions").glob("*.py"):
+        values = {}
+        for node in ast.parse(path.read_text(encoding="utf-8")).body:
+            if isinstance(node, ast.Assign) and len(node.targets) == 1 and isinstance(node.targets[0], ast.Name):
+                if node.targets[0].id in ("revision", "down_revision"):
+                    values[node.targets[0].id] = ast.literal_eval(node.value)
+        if "revision" not in values:
+            continue
+        revisions.add(values["revision"])
+        down = values.get("down_revision")
+        parents.update(down if isinstance(down, (tuple, list)) else [down])
+    heads = revisions - parents
+    if len(heads) > 1:
+        raise RuntimeError(f"Multiple Alembic heads: {sorted(heads)}")
+    return heads.pop() if heads else None
+
+
+async def current_revision(async_engine) -> Optional[str]:
+    """Revisión aplicada en la BD (una sola consulta a alembic_version)"""
+    async with async_engine.connect() as conn:
+        try:
+            return (await conn.execute(text("SELECT version_num FROM alembic_version"))).scalar()
+        except Exception:
+            # Tabla inexistente: la BD nunca pasó por Alembic
+            return None
+
+
+async def check_schema_version(async_engine) -> bool:
+    """
+    Compara la BD con el head de Alembic (una consulta, sin DDL). SCHEMA_CHECK=warn (por
+    defecto) solo avisa, strict impide arrancar el worker y off no consulta nada.
+    """
+    mode = os.getenv("SCHEMA_CHECK", "warn")
+    if mode == "off":
+        return True
+    expected = head_revision()
+    try:
+        current = await current_revision(async_engine)
+    except Exception as e:
+        # BD caída al arrancar: en modo warn el pool reintentará con la primera petición
+        if mode == "strict":
+            raise
+        print(f"⚠️ No se pudo verificar la versión del esquema: {str(e)}")
+        return False
+    if current == expected:
+        return True
+    message = f"Esquema desactualizado: BD en {current or 'sin versión'}, código en {expected}. Ejecutar `alembic upgrade head`."
+    if mode == "strict":
+        raise RuntimeError(message)
+    print(f"⚠️ {message}")
+    return False
+
+
+def upgrade_head():
+    """`alembic upgrade head` desde Python (scripts de inicialización y desarrollo)"""
+    from alembic import command
+    from alembic.config import Config
+
+    config = Config(str(ALEMBIC_INI))
+    config.set_main_option("script_location", str(ALEMBIC_INI.parent / "alembic"))
+    config.attributes["configure_logger"] = False
+    command.upgrade(config, "head")
@@ -1,5 +1,13 @@
+from datetime import date, datetime, timezone
 from typing import Optional
+from sqlalchemy import Column, DateTime, Index, UniqueConstraint, event, text
 from sqlmodel import SQLModel, Field
+from app.dates import DERIVED, derive
+from app.sqltypes import JSONText
+
+
+def utcnow() -> datetime:
+    return datetime.now(timezone.utc)
 
 
 class Blog(SQLModel, table=True):
@@ -9,20 +17,31 @@ class Blog(SQLModel, table=True):
 
 
 class Proyecto(SQLModel, table=True):
+    __table_args__ = (
+        Index("ix_proyecto_sort_order", "sort_order", "id"),
+        Index("ix_proyecto_stack", "stack", postgresql_using="gin"),
+        Index("ix_proyecto_status", "status"),
+        Index("ix_proyecto_deployed_on", "deployed_on", "id"),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
     title: str
-    category: str
+    category: str = Field(index=True)
     status: str
     version: str
     description: str
     image_url: str
     video_url: Optional[str] = None
-    media: Optional[str] = Field(default="[]")  # JSON string: Array<{type: 'image'|'video', url: string}>
+    # JSONB en la BD, texto JSON en la API: Array<{type: 'image'|'video', url: string}>
+    media: Optional[str] = Field(default="[]", sa_column=Column(JSONText))
     demo_url: str
     repo_url: str
-    stack: str  # JSON string del array de tecnologías
-    deployment_date: Optional[str] = None
+    stack: str = Field(sa_column=Column(JSONText, nullable=False))  # array de tecnologías (JSONB)
+    deployment_date: Optional[str] = None  # texto para mostrar ("Marzo 2024")
+    deployed_on: Optional[date] = None  # derivada de deployment_date (app/dates.py)
     client_name: Optional[str] = None
+    # Orden de visualización definido desde el admin (POST /bulk con "order")
+    sort_order: int = Field(default=0, sa_column_kwargs={"server_default": "0"})
 
 
 class Cliente(SQLModel, table=True):
@@ -37,6 +56,11 @@ class Cliente(SQLModel, table=True):
 
 
 class Cotizacion(SQLModel, table=True):
+    __table_args__ = (
+        Index("ix_cotizacion_status", "status"),
+        Index("ix_cotizacion_received_at", "received_at"),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
     nombre: str
     email: str
@@ -45,6 +69,7 @@ class Cotizacion(SQLModel, table=True):
     mensaje: Optional[str] = None
     status: Optional[str] = Field(default="pending")
     created_at: Optional[str] = None
+    received_at: Optional[datetime] = Field(default=None, sa_column=Column(DateTime(timezone=True)))  # derivada de created_at
 
 
 class Service(SQLModel, table=True):
@@ -63,18 +88,52 @@ class Profile(SQLModel, table=True):
     profile_video: Optional[str] = None
 
 
+# Filas únicas de profile / contact: las crea la migración 0011; los GET devuelven estos
+# valores (sin guardarlos) si alguien borró la fila
+DEFAULT_PROFILE = {
+    "full_name": "Favio Jiménez",
+    "title": "Ingeniero de Software Full Stack",
+    "profile_image": "",
+    "profile_video": "",
+}
+DEFAULT_CONTACT = {
+    "email": "contact@example.com",
+    "phone": "",
+    "linkedin": "",
+    "github": "",
+    "location": "Chile",
+}
+
+
 class Experience(SQLModel, table=True):
+    __table_args__ = (
+        # Orden del feed (app/pagination.py order_keys): más reciente primero, sin fecha al final
+        Index("ix_experience_feed", "sort_order", text("start_on DESC NULLS LAST"), "id"),
+        Index("ix_experience_year_feed", text("start_on DESC NULLS LAST"), "sort_order", "id"),
+        Index("ix_experience_technologies", "technologies", postgresql_using="gin"),
+        Index("ix_experience_start_on", "start_on", "id"),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
     company: str
     position: str
     period: str  # Seguiremos guardando el string para compatibilidad, o mapearemos
+    start_on: Optional[date] = None  # derivadas de period
+    end_on: Optional[date] = None  # NULL = en curso ("Presente") o sin fecha de fin
     location: Optional[str] = None
     employment_type: Optional[str] = None  # Full-time, Remote, etc.
     description: Optional[str] = None
-    technologies: Optional[str] = None  # JSON string de array
+    technologies: Optional[str] = Field(default=None, sa_column=Column(JSONText))  # array de tecnologías (JSONB)
+    # Orden de visualización definido desde el admin (POST /bulk con "order")
+    sort_order: int = Field(default=0, sa_column_kwargs={"server_default": "0"})
 
 
 class Education(SQLModel, table=True):
+    __table_args__ = (
+        Index("ix_education_sort_order", "sort_order", "id"),
+        Index("ix_education_start_on", "start_on", "id"),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
     degree: str
     institution: str
@@ -82,30 +141,66 @@ class Education(SQLModel, table=True):
     location: str
     start_year: str  # Cambiaremos a formato fecha en el front
     end_year: str
+    start_on: Optional[date] = None  # derivadas de start_year / end_year
+    end_on: Optional[date] = None
     description: Optional[str] = None
     certificate_url: Optional[str] = None
+    # Orden de visualización definido desde el admin (POST /bulk con "order")
+    sort_order: int = Field(default=0, sa_column_kwargs={"server_default": "0"})
 
 
 class Timeline(SQLModel, table=True):
+    __table_args__ = (
+        # Orden del feed (app/pagination.py order_keys), también agrupado por año o categoría
+        Index("ix_timeline_feed", "sort_order", "event_on", "id"),
+        Index("ix_timeline_year_feed", "event_on", "sort_order", "id"),
+        Index("ix_timeline_category_feed", "category", "sort_order", "event_on", "id"),
+        Index("ix_timeline_event_on", "event_on", "id"),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
     year: str
+    event_on: Optional[date] = None  # derivada de year (inicio del período)
     title: str
     description: str
     category: Optional[str] = None
     icon: Optional[str] = None
+    # Orden de visualización definido desde el admin (POST /bulk con "order")
+    sort_order: int = Field(default=0, sa_column_kwargs={"server_default": "0"})
 
 
 class Certification(SQLModel, table=True):
+    __table_args__ = (
+        Index("ix_certification_sort_order", "sort_order", "id"),
+        Index("ix_certification_issued_on", "issued_on", "id"),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
     title: str
     issuer: str
     date: str
+    issued_on: Optional[date] = None  # derivada de date
     description: Optional[str] = None
     icon: Optional[str] = None
     level: Optional[str] = None
     color: Optional[str] = None
     badge: Optional[str] = None
     credential_url: Optional[str] = None
+    # Orden de visualización definido desde el admin (POST /bulk con "order")
+    sort_order: int = Field(default=0, sa_column_kwargs={"server_default": "0"})
+
+
+def _derive_dates(mapper, connection, target):
+    """Completa las columnas de fecha tipadas desde los textos antes de cada INSERT/UPDATE"""
+    table = mapper.local_table.name
+    values = {source: getattr(target, source) for source, _ in DERIVED[table].values()}
+    for column, value in derive(table, values).items():
+        setattr(target, column, value)
+
+
+for _model in (Proyecto, Cotizacion, Experience, Education, Timeline, Certification):
+    event.listen(_model, "before_insert", _derive_dates)
+    event.listen(_model, "before_update", _derive_dates)
 
 
 class Contact(SQLModel, table=True):
@@ -115,3 +210,68 @@ class Contact(SQLModel, table=True):
     linkedin: Optional[str] = None
     github: Optional[str] = None
     location: Optional[str] = None
+
+
+class StoredFile(SQLModel, table=True):
+    """Archivo subido, indexado por su SHA-256 para no volver a subir duplicados"""
+    __tablename__ = "stored_file"
+    __table_args__ = (
+        UniqueConstraint("sha256", "backend", name="uq_stored_file_sha256_backend"),
+    )
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    sha256: str = Field(index=True)
+    backend: str  # local | cloudinary
+    url: str = Field(index=True)
+    content_type: str
+    size: int
+    refs: int = Field(default=1)  # cuántas subidas apuntan a este archivo
+    width: Optional[int] = None
+    height: Optional[int] = None
+    # Derivados responsive: [{"url", "width", "format"}] (JSONB) y placeholder en data URI
+    variants: Optional[str] = Field(default=None, sa_column=Column(JSONText))
+    placeholder: Optional[str] = None
+    created_at: datetime = Field(default_factory=utcnow, sa_column=Column(DateTime(timezone=True), nullable=False))
+
+
+class EmailOutbox(SQLModel, table=True):
+    """
+    Correos pendientes (patrón outbox): se insertan en la misma transacción que el dato
+    que los origina y los envía app/workers/outbox.py, fuera de los workers de la API.
+    """
+    __tablename__ = "email_outbox"
+    __table_args__ = (
+        Index("ix_email_outbox_due", "status", "next_attempt_at"),
+    )
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    cotizacion_id: Optional[int] = Field(default=None, foreign_key="cotizacion.id")
+    to_address: str
+    reply_to: Optional[str] = None
+    subject: str
+    body: str
+    status: str = Field(default="pending")  # pending | sending | sent | failed
+    attempts: int = Field(default=0)
+    next_attempt_at: datetime = Field(default_factory=utcnow, sa_column=Column(DateTime(timezone=True), nullable=False))
+    last_error: Optional[str] = None
+    created_at: datetime = Field(default_factory=utcnow, sa_column=Column(DateTime(timezone=True), nullable=False))
+    sent_at: Optional[datetime] = Field(default=None, sa_column=Column(DateTime(timezone=True)))
+
+
+class RateLimitBucket(SQLModel, table=True):
+    """Token bucket compartido entre workers (RATE_LIMIT_BACKEND=postgres, ver app/ratelimit.py)"""
+    __tablename__ = "rate_limit_bucket"
+
+    key: str = Field(primary_key=True)  # "<ruta>:<ip>"
+    tokens: float
+    allowed: bool = True
+    updated_at: datetime = Field(default_factory=utcnow, sa_column=Column(DateTime(timezone=True), nullable=False))
+
+
+class TableVersion(SQLModel, table=True):
+    """Versión de cada tabla pública, compartida por todos los workers (ver app/versions.py)"""
+    __tablename__ = "table_version"
+
+    name: str = Field(primary_key=True)
+    version: int = Field(default=0)
+    modified_at: datetime = Field(default_factory=utcnow, sa_column=Column(DateTime(timezone=True), nullable=False))
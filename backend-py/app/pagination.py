@@ -0,0 +1,295 @@
+import base64
+import json
+from datetime import date, datetime
+from typing import Any, List, Optional, Sequence
+from fastapi import HTTPException, Query, Request, Response
+from sqlalchemy import and_, false, or_, tuple_
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.dates import DATE_COLUMN, parse_date, parse_timestamp
+from app.responses import json_response
+
+MAX_LIMIT = 100
+ORDERS = ("display", "date", "-date")
+
+
+class ListParams:
+    """
+    Parámetros comunes de los listados: `limit`, `after` (cursor) y `fields`; en los que
+    tienen fecha (app/dates.py DATE_COLUMN) también `order` y el rango `from` / `to`
+    """
+
+    def __init__(self, limit: Optional[int], after: Optional[list], fields: Optional[List[str]], url=None,
+                 order: str = "display", date_from: Optional[date] = None, date_to: Optional[date] = None):
+        self.limit = limit
+        self.after = after
+        self.fields = fields
+        self.url = url
+        self.order = order
+        self.date_from = date_from
+        self.date_to = date_to
+
+    @property
+    def key(self) -> tuple:
+        """Clave de cache para esta página"""
+        return (
+            self.limit,
+            json.dumps(self.after) if self.after is not None else None,
+            tuple(self.fields) if self.fields else None,
+            self.order,
+            self.date_from,
+            self.date_to,
+        )
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    raw = json.dumps(list(values), separators=(",", ":"), default=str)
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> list:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if not isinstance(values, list):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return values
+
+
+def parse_fields(model, fields: Optional[str]) -> Optional[List[str]]:
+    """`fields=id,title,image_url` -> columnas válidas del modelo (siempre incluye id)"""
+    if not fields:
+        return None
+    columns = model.__table__.columns
+    names = [name.strip() for name in fields.split(",") if name.strip()]
+    unknown = [name for name in names if name not in columns]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+    if "id" not in names:
+        names.insert(0, "id")
+    return list(dict.fromkeys(names))
+
+
+def parse_range_bound(name: str, value: Optional[str], end: bool = False) -> Optional[date]:
+    """`from=2020` -> 2020-01-01; `to=2020` -> 2020-12-31 (incluye todo el período)"""
+    if not value:
+        return None
+    parsed = parse_date(value, end=end)
+    if parsed is None:
+        raise HTTPException(status_code=400, detail=f"Invalid date for '{name}': {value}")
+    return parsed
+
+
+def list_params(model):
+    """Dependencia para un listado: `page: ListParams = Depends(list_params(Proyecto))`"""
+
+    def dependency(
+        request: Request,
+        limit: Optional[int] = Query(default=None, ge=1, le=MAX_LIMIT),
+        after: Optional[str] = Query(default=None, description="Cursor devuelto en X-Next-Cursor"),
+        fields: Optional[str] = Query(default=None, description="Columnas separadas por coma"),
+    ) -> ListParams:
+        return ListParams(
+            limit=limit,
+            after=decode_cursor(after) if after else None,
+            fields=parse_fields(model, fields),
+            url=request.url,
+        )
+
+    def dated_dependency(
+        request: Request,
+        limit: Optional[int] = Query(default=None, ge=1, le=MAX_LIMIT),
+        after: Optional[str] = Query(default=None, description="Cursor devuelto en X-Next-Cursor"),
+        fields: Optional[str] = Query(default=None, description="Columnas separadas por coma"),
+        order: str = Query(default="display", pattern="^(display|date|-date)$",
+                           description="display (orden del admin), date o -date (cronológico)"),
+        date_from: Optional[str] = Query(default=None, alias="from", description="Desde (2020, 2020-05, 2020-05-12)"),
+        date_to: Optional[str] = Query(default=None, alias="to", description="Hasta, inclusive (2021 = hasta fin de 2021)"),
+    ) -> ListParams:
+        return ListParams(
+            limit=limit,
+            after=decode_cursor(after) if after else None,
+            fields=parse_fields(model, fields),
+            url=request.url,
+            order=order,
+            date_from=parse_range_bound("from", date_from),
+            date_to=parse_range_bound("to", date_to, end=True),
+        )
+
+    return dated_dependency if model.__table__.name in DATE_COLUMN else dependency
+
+
+# Listados con desempate cronológico después del orden del admin: tabla -> fecha descendente
+# (timeline se lee de lo más antiguo a lo más nuevo; experience, como un CV, al revés)
+CHRONOLOGICAL = {"timeline": False, "experience": True}
+
+
+def date_column(model):
+    table = model.__table__
+    return table.c[DATE_COLUMN[table.name]] if table.name in DATE_COLUMN else None
+
+
+def order_keys(model, order: str = "display", group: Optional[str] = None) -> list:
+    """
+    Clave de orden del listado como [(columna, descendente, nulls_last)]:
+      - display: (sort_order, [fecha,] id); la fecha solo en CHRONOLOGICAL, para que lo que
+        el admin no ordenó (sort_order empatado) salga en orden cronológico y no por id
+      - date / -date: (fecha, id), sin las filas sin fecha (se filtran en fetch_page)
+      - group=year: la fecha pasa adelante (fecha, sort_order, id) y group=category
+        antepone category, así cada grupo llega contiguo
+    Los índices de app/models.py tienen estas mismas columnas y sentidos.
+    """
+    table = model.__table__
+    column = date_column(model)
+    if order != "display" and column is not None:
+        descending = order == "-date"
+        keys = [(column, descending, False), (table.c.id, descending, False)]
+    else:
+        keys = [(table.c.sort_order, False, False)] if "sort_order" in table.c else []
+        if table.name in CHRONOLOGICAL:
+            keys.append((column, CHRONOLOGICAL[table.name], True))
+        keys.append((table.c.id, False, False))
+        if group == "year" and column is not None:
+            chronological = (column, CHRONOLOGICAL.get(table.name, False), True)
+            keys = [chronological] + [key for key in keys if key[0] is not column]
+    if group == "category":
+        keys = [(table.c.category, False, True)] + keys
+    return keys
+
+
+def order_by(keys: list) -> list:
+    clauses = []
+    for column, descending, nulls_last in keys:
+        clause = column.desc() if descending else column.asc()
+        clauses.append(clause.nulls_last() if nulls_last else clause)
+    return clauses
+
+
+def display_order(model) -> list:
+    """ORDER BY de los listados sin parámetros (también lo usa /api/portfolio)"""
+    return order_by(order_keys(model))
+
+
+def _cursor_value(column, value):
+    """Los cursores guardan las fechas como texto: se vuelven a tipar para comparar en SQL"""
+    if not isinstance(value, str):
+        return value
+    python_type = column.type.python_type
+    if python_type is datetime:
+        return parse_timestamp(value)
+    if python_type is date:
+        try:
+            return date.fromisoformat(value)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+    return value
+
+
+def _after_key(column, descending: bool, nulls_last: bool, value):
+    """Filas que van después de `value` en esta columna (con NULLs al final)"""
+    if value is None:
+        return false()
+    beyond = column < value if descending else column > value
+    return or_(beyond, column.is_(None)) if nulls_last else beyond
+
+
+def keyset_after(keys: list, values: list):
+    """
+    WHERE de la página siguiente. Con todas las columnas ascendentes y sin NULLs (o todas
+    descendentes) es una comparación de tuplas; si no, la expansión
+    (a > x) OR (a = x AND b > y) OR ..., que respeta sentido y NULLs de cada columna.
+    """
+    columns = [column for column, _, _ in keys]
+    if not any(nulls_last for _, _, nulls_last in keys):
+        directions = {descending for _, descending, _ in keys}
+        if directions == {False}:
+            return tuple_(*columns) > tuple_(*values)
+        if directions == {True}:
+            return tuple_(*columns) < tuple_(*values)
+    clauses = []
+    for index, (column, descending, nulls_last) in enumerate(keys):
+        equal = [previous.is_(None) if value is None else previous == value
+                 for previous, value in zip(columns[:index], values[:index])]
+        clauses.append(and_(*equal, _after_key(column, descending, nulls_last, values[index])))
+    return or_(*clauses)
+
+
+def _group_key(row: dict, column, group: str):
+    value = row[column.name]
+    return value.year if group == "year" and value is not None else value
+
+
+async def fetch_page(session: AsyncSession, model, page: ListParams, where: Sequence = (),
+                     group: Optional[str] = None):
+    """
+    Keyset pagination: ordena según order_keys (por defecto sort_order, id) y continúa
+    desde la última clave vista, así cada página es un index scan sin OFFSET. Con
+    `order=date` / `-date` la clave es (fecha, id), y las filas sin fecha quedan fuera, así
+    el listado y el rango `from` / `to` recorren el índice (fecha, id) en uno u otro
+    sentido. Solo se seleccionan en SQL las columnas pedidas en `fields` (más las de la
+    clave de orden, que se quitan de la respuesta).
+
+    Con `group` ("year" o "category") las filas ya llegan ordenadas por esa clave y se
+    devuelven como [{"key": ..., "items": [...]}]; un grupo puede seguir en la página
+    siguiente (mismo key al principio).
+    Devuelve (filas como dicts o grupos, cursor siguiente o None).
+    """
+    table = model.__table__
+    names = page.fields or [column.name for column in table.columns]
+    keys = order_keys(model, page.order, group)
+    columns = [column for column, _, _ in keys]
+    selected = list(dict.fromkeys(names + [column.name for column in columns]))
+
+    where = list(where)
+    column = date_column(model)
+    if column is not None:
+        if page.order != "display":
+            where.append(column.is_not(None))
+        if page.date_from is not None:
+            where.append(column >= page.date_from)
+        if page.date_to is not None:
+            where.append(column <= page.date_to)
+
+    stmt = select(*[table.c[name] for name in selected]).where(*where).order_by(*order_by(keys))
+    if page.after is not None:
+        if len(page.after) != len(keys):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        values = [_cursor_value(col, value) for col, value in zip(columns, page.after)]
+        stmt = stmt.where(keyset_after(keys, values))
+    if page.limit is not None:
+        stmt = stmt.limit(page.limit + 1)
+
+    rows = [dict(row._mapping) for row in (await session.exec(stmt)).all()]
+
+    next_cursor = None
+    if page.limit is not None and len(rows) > page.limit:
+        rows = rows[:page.limit]
+        last = rows[-1]
+        next_cursor = encode_cursor([last[column.name] for column in columns])
+    if group:
+        groups = []
+        for row in rows:
+            key = _group_key(row, columns[0], group)
+            if not groups or groups[-1]["key"] != key:
+                groups.append({"key": key, "items": []})
+            groups[-1]["items"].append({name: row[name] for name in names})
+        return groups, next_cursor
+    if len(selected) > len(names):
+        rows = [{name: row[name] for name in names} for row in rows]
+    return rows, next_cursor
+
+
+def page_response(response: Response, page: ListParams, rows: list, next_cursor: Optional[str]):
+    """
+    Deja el cursor siguiente en los headers (`X-Next-Cursor` y `Link: rel="next"`) para no
+    cambiar la forma del body (sigue siendo una lista). Las filas ya son dicts leídos de SQL:
+    se serializan directo con orjson, sin pasar otra vez por el response_model (ni con
+    `fields`, donde la respuesta es parcial).
+    """
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+        if page.url is not None:
+            response.headers["Link"] = f'<{page.url.include_query_params(after=next_cursor)}>; rel="next"'
+    return json_response(rows, response)
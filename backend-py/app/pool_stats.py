@@ -0,0 +1,83 @@
+import threading
+import time
+from sqlalchemy import event, exc
+
+
+class PoolStats:
+    """
+    Contadores del pool de conexiones de un engine: conexiones prestadas, overflow,
+    tiempo de espera al pedir una conexión y churn (conexiones abiertas/cerradas).
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.pool = None
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.checkins = 0
+        self.connects = 0
+        self.closes = 0
+        self.invalidations = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def record_wait(self, seconds: float):
+        with self._lock:
+            self.wait_total += seconds
+            if seconds > self.wait_max:
+                self.wait_max = seconds
+
+    def _incr(self, attr: str):
+        with self._lock:
+            setattr(self, attr, getattr(self, attr) + 1)
+
+    def attach(self, engine):
+        """Registra los listeners de pool sobre un engine sync (o `async_engine.sync_engine`)"""
+        event.listen(engine, "connect", lambda *args: self._incr("connects"))
+        event.listen(engine, "close", lambda *args: self._incr("closes"))
+        event.listen(engine, "close_detached", lambda *args: self._incr("closes"))
+        event.listen(engine, "invalidate", lambda *args: self._incr("invalidations"))
+        event.listen(engine, "checkout", lambda *args: self._incr("checkouts"))
+        event.listen(engine, "checkin", lambda *args: self._incr("checkins"))
+        self.pool = engine.pool
+
+    def snapshot(self) -> dict:
+        pool = self.pool
+        with self._lock:
+            data = {
+                "name": self.name,
+                "pool_class": type(pool).__name__ if pool is not None else None,
+                "checkouts": self.checkouts,
+                "checkins": self.checkins,
+                "connects": self.connects,
+                "closes": self.closes,
+                "invalidations": self.invalidations,
+                "timeouts": self.timeouts,
+                "wait_total_ms": round(self.wait_total * 1000, 3),
+                "wait_max_ms": round(self.wait_max * 1000, 3),
+                "wait_avg_ms": round(self.wait_total * 1000 / self.checkouts, 3) if self.checkouts else 0.0,
+            }
+        # Solo QueuePool (y su variante async) exponen tamaño/overflow
+        for attr in ("size", "checkedin", "checkedout", "overflow"):
+            method = getattr(pool, attr, None)
+            data[attr] = method() if callable(method) else None
+        return data
+
+
+def timed_pool_class(base, stats: PoolStats):
+    """Subclase del pool que mide cuánto tarda cada checkout (incluye la espera en cola)"""
+
+    class TimedPool(base):
+        def connect(self):
+            start = time.perf_counter()
+            try:
+                return super().connect()
+            except exc.TimeoutError:
+                stats._incr("timeouts")
+                raise
+            finally:
+                stats.record_wait(time.perf_counter() - start)
+
+    TimedPool.__name__ = f"Timed{base.__name__}"
+    return TimedPool
@@ -0,0 +1,181 @@
+"""
+Perfilado bajo demanda de peticiones en producción (opt-in, PROFILING_ENABLED=1).
+
+Una petición se perfila si su path empieza con alguno de PROFILE_PATHS (vacío = todas) y:
+  - trae `X-Profile: 1` junto con un X-Internal-Token válido (INTERNAL_TOKEN tiene que
+    estar definido: sin token no se puede pedir un perfil por header), o
+  - cae en el muestreo aleatorio PROFILE_SAMPLE_RATE (0.01 = 1 de cada 100).
+
+Perfiladores (PROFILER):
+  - cprofile:     determinista, de la stdlib. Genera .pstats (snakeviz, `python -m pstats`,
+                  gprof2dot para flame graphs). Como corre en el thread del event loop,
+                  incluye lo que otras peticiones ejecutaron en paralelo en ese thread.
+  - pyinstrument: por muestreo, con async_mode (solo la petición perfilada). Genera un
+                  .html navegable. Dependencia opcional: sin el paquete se usa cprofile.
+
+Lo que corre en threads (rutas sync, to_thread) no queda en el perfil. Un solo perfil a la
+vez por proceso; los archivos van a PROFILE_DIR, que se recorta a los PROFILE_MAX_FILES
+más recientes. La respuesta perfilada lleva `X-Profile-Id`, y GET /internal/profiles
+lista y descarga los archivos.
+"""
+import cProfile
+import os
+import random
+import re
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Optional
+import anyio
+from starlette.datastructures import Headers, MutableHeaders
+
+try:
+    import pyinstrument
+except ImportError:  # dependencia opcional
+    pyinstrument = None
+
+PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "0") in ("1", "true", "True")
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+PROFILE_PATHS = tuple(path.strip() for path in os.getenv("PROFILE_PATHS", "").split(",") if path.strip())
+PROFILE_DIR = Path(os.getenv("PROFILE_DIR", "profiles"))
+PROFILE_MAX_FILES = int(os.getenv("PROFILE_MAX_FILES", "50"))
+PROFILER = os.getenv("PROFILER", "cprofile")
+
+PROFILE_NAME = re.compile(r"^[\w.-]+\.(pstats|html)$")
+
+_busy = threading.Lock()
+
+
+def wants_profile(scope) -> bool:
+    if not PROFILING_ENABLED:
+        return False
+    if PROFILE_PATHS and not scope["path"].startswith(PROFILE_PATHS):
+        return False
+    headers = Headers(scope=scope)
+    if headers.get("x-profile") not in (None, "", "0"):
+        # Misma regla que los endpoints /internal: sin INTERNAL_TOKEN nadie pide perfiles
+        from app.api.internal import valid_internal_headers
+
+        return valid_internal_headers(headers.get("x-internal-token"), headers.get("authorization"))
+    return PROFILE_SAMPLE_RATE > 0 and random.random() < PROFILE_SAMPLE_RATE
+
+
+class _CProfiler:
+    extension = "pstats"
+
+    def __init__(self):
+        self.profiler = cProfile.Profile()
+
+    def start(self):
+        self.profiler.enable()
+
+    def stop(self):
+        self.profiler.disable()
+
+    def save(self, path: Path):
+        self.profiler.dump_stats(str(path))
+
+
+class _PyInstrumentProfiler:
+    extension = "html"
+
+    def __init__(self):
+        self.profiler = pyinstrument.Profiler(async_mode="enabled")
+
+    def start(self):
+        self.profiler.start()
+
+    def stop(self):
+        self.profiler.stop()
+
+    def save(self, path: Path):
+        path.write_text(self.profiler.output_html(), encoding="utf-8")
+
+
+def make_profiler():
+    if PROFILER == "pyinstrument" and pyinstrument is not None:
+        return _PyInstrumentProfiler()
+    return _CProfiler()
+
+
+def _profile_files(directory: Path = PROFILE_DIR) -> list:
+    """Perfiles guardados, más recientes primero"""
+    if not directory.is_dir():
+        return []
+    return sorted((path for path in directory.iterdir() if PROFILE_NAME.match(path.name)),
+                  key=lambda path: path.stat().st_mtime, reverse=True)
+
+
+def prune(directory: Path = PROFILE_DIR, keep: int = PROFILE_MAX_FILES):
+    """Deja solo los `keep` perfiles más recientes"""
+    for path in _profile_files(directory)[keep:]:
+        path.unlink(missing_ok=True)
+
+
+def _save(profiler, name: str):
+    PROFILE_DIR.mkdir(parents=True, exist_ok=True)
+    profiler.save(PROFILE_DIR / name)
+    prune()
+
+
+def _slug(text: str) -> str:
+    return re.sub(r"[^A-Za-z0-9]+", "_", text).strip("_") or "root"
+
+
+class ProfilingMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not wants_profile(scope) or not _busy.acquire(blocking=False):
+            await self.app(scope, receive, send)
+            return
+
+        profile_id = f"{datetime.now(timezone.utc):%Y%m%dT%H%M%S}-{uuid.uuid4().hex[:8]}"
+
+        async def tagging_send(message):
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message).append("X-Profile-Id", profile_id)
+            await send(message)
+
+        profiler = make_profiler()
+        start = time.perf_counter()
+        profiler.start()
+        try:
+            await self.app(scope, receive, tagging_send)
+        finally:
+            profiler.stop()
+            _busy.release()
+            from app.metrics import route_template
+
+            elapsed_ms = int((time.perf_counter() - start) * 1000)
+            name = f"{profile_id}-{scope['method']}-{_slug(route_template(scope))}-{elapsed_ms}ms.{profiler.extension}"
+            try:
+                await anyio.to_thread.run_sync(_save, profiler, name)
+            except OSError as e:
+                print(f"⚠️ No se pudo guardar el perfil {name}: {str(e)}")
+
+
+# ---------- Listado (GET /internal/profiles) ----------
+
+def list_profiles() -> list:
+    profiles = []
+    for path in _profile_files():
+        stat = path.stat()
+        profiles.append({
+            "name": path.name,
+            "id": path.name[:24],
+            "size": stat.st_size,
+            "created_at": datetime.fromtimestamp(stat.st_mtime, timezone.utc).isoformat(timespec="seconds"),
+        })
+    return profiles
+
+
+def profile_path(name: str) -> Optional[Path]:
+    """Ruta del perfil si el nombre es válido y existe (sin salir de PROFILE_DIR)"""
+    if not PROFILE_NAME.match(name):
+        return None
+    path = PROFILE_DIR / name
+    return path if path.is_file() else None
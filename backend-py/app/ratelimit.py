@@ -0,0 +1,140 @@
+"""
+Rate limiting con token bucket por IP del cliente y por ruta.
+
+Cada (ruta, IP) tiene un balde de `burst` fichas que se rellena a `rate` fichas por
+segundo; cada petición consume una. Sin fichas -> 429 con Retry-After (segundos hasta
+la próxima ficha).
+
+Backends (RATE_LIMIT_BACKEND):
+  - memory:   dict en memoria, por proceso (un solo worker / desarrollo)
+  - postgres: tabla rate_limit_bucket compartida por todos los workers; la recarga y el
+              consumo se resuelven en un único INSERT ... ON CONFLICT DO UPDATE atómico
+
+Límites configurables por ruta con variables RATE_LIMIT_<NOMBRE>=<fichas>/<periodo>,
+por ejemplo RATE_LIMIT_COTIZACION=5/minute.
+"""
+import math
+import os
+import random
+import threading
+import time
+from collections import OrderedDict
+from typing import Tuple
+from fastapi import HTTPException, Request
+from sqlalchemy import text
+
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "1") not in ("0", "false", "False")
+RATE_LIMIT_BACKEND = os.getenv("RATE_LIMIT_BACKEND", "memory")
+# Cantidad de proxies propios delante de la API (nginx, load balancer): la IP real es la
+# que agregó el último de ellos en X-Forwarded-For. 0 = usar la IP de la conexión.
+TRUSTED_PROXY_HOPS = int(os.getenv("TRUSTED_PROXY_HOPS", "0"))
+
+PERIODS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+
+
+def parse_limit(spec: str) -> Tuple[float, float]:
+    """'5/minute' -> (burst=5, rate=5/60 fichas por segundo)"""
+    try:
+        count, period = spec.strip().split("/")
+        burst = float(count)
+        seconds = PERIODS[period.strip().rstrip("s")]
+    except (ValueError, KeyError):
+        raise ValueError(f"Invalid rate limit: {spec!r} (expected e.g. '5/minute')")
+    return burst, burst / seconds
+
+
+def client_ip(request: Request) -> str:
+    if TRUSTED_PROXY_HOPS:
+        forwarded = [ip.strip() for ip in request.headers.get("x-forwarded-for", "").split(",") if ip.strip()]
+        if len(forwarded) >= TRUSTED_PROXY_HOPS:
+            return forwarded[-TRUSTED_PROXY_HOPS]
+    return request.client.host if request.client else "unknown"
+
+
+class MemoryBackend:
+    """Baldes en memoria con límite LRU (una IP nueva por petición no hace crecer el dict sin fin)"""
+
+    def __init__(self, maxsize: int = 10000):
+        self.maxsize = maxsize
+        self._buckets: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    async def take(self, key: str, burst: float, rate: float) -> Tuple[bool, float]:
+        """Consume una ficha. Devuelve (permitido, segundos hasta la próxima ficha)"""
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.get(key, (burst, now))
+            tokens = min(burst, tokens + (now - updated) * rate)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            self._buckets[key] = (tokens, now)
+            self._buckets.move_to_end(key)
+            while len(self._buckets) > self.maxsize:
+                self._buckets.popitem(last=False)
+        return allowed, 0.0 if allowed else (1 - tokens) / rate
+
+
+class PostgresBackend:
+    """Baldes en la tabla rate_limit_bucket, compartidos entre workers"""
+
+    # La recarga se calcula con el reloj de la BD, el mismo para todos los workers
+    # (CAST explícito: asyncpg necesita conocer el tipo de cada parámetro)
+    _REFILL = (
+        "LEAST(CAST(:burst AS float8), "
+        "b.tokens + EXTRACT(EPOCH FROM (now() - b.updated_at)) * CAST(:rate AS float8))"
+    )
+    TAKE = text(
+        "INSERT INTO rate_limit_bucket AS b (key, tokens, updated_at, allowed) "
+        "VALUES (:key, CAST(:burst AS float8) - 1, now(), true) "
+        "ON CONFLICT (key) DO UPDATE SET "
+        f"tokens = CASE WHEN {_REFILL} >= 1 THEN {_REFILL} - 1 ELSE {_REFILL} END, "
+        f"allowed = {_REFILL} >= 1, "
+        "updated_at = now() "
+        "RETURNING tokens, allowed"
+    )
+    # Baldes sin uso hace más de un día ya estarían llenos: se pueden borrar
+    CLEANUP = text("DELETE FROM rate_limit_bucket WHERE updated_at < now() - interval '1 day'")
+
+    async def take(self, key: str, burst: float, rate: float) -> Tuple[bool, float]:
+        from app.db import async_engine
+
+        async with async_engine.begin() as conn:
+            tokens, allowed = (await conn.execute(self.TAKE, {"key": key, "burst": burst, "rate": rate})).one()
+            if random.random() < 0.001:
+                await conn.execute(self.CLEANUP)
+        return allowed, 0.0 if allowed else (1 - tokens) / rate
+
+
+_BACKENDS = {"memory": MemoryBackend, "postgres": PostgresBackend}
+_backend = None
+
+
+def get_backend():
+    global _backend
+    if _backend is None:
+        if RATE_LIMIT_BACKEND not in _BACKENDS:
+            raise ValueError(f"Unknown rate limit backend: {RATE_LIMIT_BACKEND}")
+        _backend = _BACKENDS[RATE_LIMIT_BACKEND]()
+    return _backend
+
+
+def rate_limit(name: str, default: str):
+    """
+    Dependencia para rutas: `dependencies=[Depends(rate_limit("cotizacion", "5/minute"))]`.
+    El límite se puede cambiar con RATE_LIMIT_COTIZACION sin tocar código.
+    """
+    burst, rate = parse_limit(os.getenv(f"RATE_LIMIT_{name.upper()}", default))
+
+    async def dependency(request: Request):
+        if not RATE_LIMIT_ENABLED:
+            return
+        allowed, retry_after = await get_backend().take(f"{name}:{client_ip(request)}", burst, rate)
+        if not allowed:
+            raise HTTPException(
+                status_code=429,
+                detail="Too many requests",
+                headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+            )
+
+    return dependency
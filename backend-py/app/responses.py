@@ -0,0 +1,34 @@
+"""
+Respuestas JSON rápidas.
+
+Cuando un handler devuelve instancias SQLModel con `response_model=List[...]`, FastAPI las
+vuelve a validar contra el modelo, las pasa por jsonable_encoder y recién después las
+codifica con `json`. Los listados ya leen filas como dicts desde SQL (app/pagination.py),
+así que pueden ir directo a bytes con orjson devolviendo una `ORJSONResponse`: FastAPI no
+valida ni re-encodea un Response. El `response_model` de la ruta se mantiene solo para la
+documentación OpenAPI.
+
+benchmarks/bench_serialization.py compara ambos caminos.
+"""
+from typing import Any
+import orjson
+from fastapi import Response
+from fastapi.responses import JSONResponse
+
+OPTIONS = orjson.OPT_NON_STR_KEYS
+
+
+class ORJSONResponse(JSONResponse):
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=OPTIONS)
+
+
+def json_response(content: Any, response: Response = None, status_code: int = 200) -> ORJSONResponse:
+    """
+    ORJSONResponse que conserva los headers ya puestos en el `response` inyectado
+    (ETag/Last-Modified de `conditional`, cursores de paginación, etc.).
+    """
+    headers = dict(response.headers) if response is not None else None
+    return ORJSONResponse(content=content, status_code=status_code, headers=headers)
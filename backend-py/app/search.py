@@ -0,0 +1,171 @@
+"""
+Búsqueda full-text sobre proyectos, blog, experiencia y certificaciones.
+
+- PostgreSQL: columna `search_vector` (tsvector) que calcula un trigger BEFORE
+  INSERT/UPDATE, con índice GIN en cada tabla. No es una columna GENERATED ... STORED
+  porque agregarla reescribe la tabla entera con un lock exclusivo.
+- SQLite (tests/desarrollo): tabla virtual FTS5 `search_index` mantenida con triggers.
+
+`ensure_search_schema(conn)` crea lo necesario para el dialecto de la conexión y es
+idempotente; la llama la revisión de Alembic 0004_search, que además completa en lotes
+el search_vector de las filas existentes y crea el índice GIN con CONCURRENTLY.
+"""
+from typing import Optional
+from sqlalchemy import text
+
+CONFIG = "spanish"
+
+# tipo -> (tabla, columna de título, columna del snippet, expresión tsvector)
+DOCUMENTS = {
+    "proyecto": (
+        "proyecto", "title", "description",
+        f"setweight(to_tsvector('{CONFIG}', coalesce(title, '')), 'A') || "
+        f"setweight(jsonb_to_tsvector('simple', coalesce(stack, '[]'::jsonb), '[\"string\"]'), 'A') || "
+        f"setweight(to_tsvector('{CONFIG}', coalesce(description, '')), 'B')",
+    ),
+    "blog": (
+        "blog", "title", "content",
+        f"setweight(to_tsvector('{CONFIG}', coalesce(title, '')), 'A') || "
+        f"setweight(to_tsvector('{CONFIG}', coalesce(content, '')), 'B')",
+    ),
+    "experience": (
+        "experience", "position", "description",
+        f"setweight(to_tsvector('{CONFIG}', coalesce(position, '') || ' ' || coalesce(company, '')), 'A') || "
+        f"setweight(jsonb_to_tsvector('simple', coalesce(technologies, '[]'::jsonb), '[\"string\"]'), 'A') || "
+        f"setweight(to_tsvector('{CONFIG}', coalesce(description, '')), 'B')",
+    ),
+    "certification": (
+        "certification", "title", "description",
+        f"setweight(to_tsvector('{CONFIG}', coalesce(title, '')), 'A') || "
+        f"setweight(to_tsvector('{CONFIG}', coalesce(issuer, '') || ' ' || coalesce(description, '')), 'B')",
+    ),
+}
+
+# Texto indexado en SQLite por tipo: (título, cuerpo)
+_SQLITE_COLUMNS = {
+    "proyecto": ("{p}title", "coalesce({p}description, '') || ' ' || coalesce({p}stack, '')"),
+    "blog": ("{p}title", "coalesce({p}content, '')"),
+    "experience": (
+        "coalesce({p}position, '') || ' ' || coalesce({p}company, '')",
+        "coalesce({p}description, '') || ' ' || coalesce({p}technologies, '')",
+    ),
+    "certification": ("{p}title", "coalesce({p}issuer, '') || ' ' || coalesce({p}description, '')"),
+}
+
+
+def ensure_search_schema(conn):
+    """Crea columnas/índices (PostgreSQL) o la tabla FTS5 y sus triggers (SQLite)"""
+    if conn.dialect.name == "postgresql":
+        _ensure_postgres(conn)
+    elif conn.dialect.name == "sqlite":
+        _ensure_sqlite(conn)
+
+
+def _ensure_postgres(conn):
+    for kind, (table, _, _, vector) in DOCUMENTS.items():
+        generated = conn.execute(text(
+            "SELECT is_generated FROM information_schema.columns "
+            "WHERE table_name = :t AND column_name = 'search_vector'"
+        ), {"t": table}).scalar()
+        if generated == "ALWAYS":
+            # BD creada cuando la columna era GENERATED: se mantiene sola
+            continue
+        # Sin default: solo cambia el catálogo, la tabla no se reescribe
+        conn.execute(text(f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS search_vector tsvector"))
+        conn.execute(text(
+            f"CREATE OR REPLACE FUNCTION {table}_search_vector() RETURNS trigger AS $$ "
+            f"BEGIN SELECT {vector} INTO NEW.search_vector FROM (SELECT NEW.*) AS doc; RETURN NEW; END "
+            f"$$ LANGUAGE plpgsql"
+        ))
+        conn.execute(text(f"DROP TRIGGER IF EXISTS {table}_search_vector ON {table}"))
+        conn.execute(text(
+            f"CREATE TRIGGER {table}_search_vector BEFORE INSERT OR UPDATE ON {table} "
+            f"FOR EACH ROW EXECUTE FUNCTION {table}_search_vector()"
+        ))
+
+
+def _ensure_sqlite(conn):
+    exists = conn.execute(text(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'search_index'"
+    )).first()
+    if not exists:
+        conn.execute(text(
+            "CREATE VIRTUAL TABLE search_index USING fts5("
+            "kind UNINDEXED, ref_id UNINDEXED, title, body, tokenize = 'unicode61 remove_diacritics 2')"
+        ))
+
+    for kind, (title, body) in _SQLITE_COLUMNS.items():
+        new_title, new_body = title.format(p="new."), body.format(p="new.")
+        insert = (
+            f"INSERT INTO search_index (kind, ref_id, title, body) "
+            f"VALUES ('{kind}', new.id, {new_title}, {new_body});"
+        )
+        delete = f"DELETE FROM search_index WHERE kind = '{kind}' AND ref_id = old.id;"
+        conn.execute(text(f"CREATE TRIGGER IF NOT EXISTS {kind}_search_ai AFTER INSERT ON {kind} BEGIN {insert} END"))
+        conn.execute(text(f"CREATE TRIGGER IF NOT EXISTS {kind}_search_ad AFTER DELETE ON {kind} BEGIN {delete} END"))
+        conn.execute(text(f"CREATE TRIGGER IF NOT EXISTS {kind}_search_au AFTER UPDATE ON {kind} BEGIN {delete} {insert} END"))
+
+    if not exists:
+        # Indexar lo que ya existía antes de crear la tabla FTS
+        for kind, (title, body) in _SQLITE_COLUMNS.items():
+            conn.execute(text(
+                f"INSERT INTO search_index (kind, ref_id, title, body) "
+                f"SELECT '{kind}', id, {title.format(p='')}, {body.format(p='')} FROM {kind}"
+            ))
+
+
+def _postgres_query(kinds: list) -> str:
+    parts = [
+        f"SELECT '{kind}' AS kind, id, {title_col} AS title, {body_col} AS body, "
+        f"ts_rank(search_vector, query) AS rank FROM {table}, q WHERE search_vector @@ query"
+        for kind, (table, title_col, body_col, _) in DOCUMENTS.items() if kind in kinds
+    ]
+    # El stack / technologies se indexa con 'simple' (nombres propios, sin stemming): la
+    # consulta en español cambiaría los términos ("docker" -> "dock"), así que se combina
+    # (OR) con la misma consulta en 'simple'.
+    # El snippet (ts_headline) solo se calcula para la página ya recortada
+    return (
+        f"WITH q AS (SELECT websearch_to_tsquery('{CONFIG}', :q) || websearch_to_tsquery('simple', :q) AS query), "
+        f"hits AS ({' UNION ALL '.join(parts)} ORDER BY rank DESC, kind, id LIMIT :limit OFFSET :offset) "
+        f"SELECT kind, id, title, rank, "
+        f"ts_headline('{CONFIG}', coalesce(body, ''), q.query, "
+        f"'StartSel=<mark>, StopSel=</mark>, MaxFragments=2, MaxWords=25, MinWords=8') AS snippet "
+        f"FROM hits, q ORDER BY rank DESC, kind, id"
+    )
+
+
+def _sqlite_match(q: str) -> str:
+    # Cada palabra como término literal (sin operadores FTS5) y con prefijo
+    terms = ['"' + term.replace('"', '""') + '"*' for term in q.split()]
+    return " ".join(terms)
+
+
+def _sqlite_query(kinds: list) -> str:
+    placeholders = ", ".join(f"'{kind}'" for kind in kinds)
+    # bm25: menor es mejor; se invierte el signo para que rank sea "mayor es mejor"
+    return (
+        "SELECT kind, ref_id AS id, title, -bm25(search_index, 0, 0, 10.0, 1.0) AS rank, "
+        "snippet(search_index, 3, '<mark>', '</mark>', '…', 16) AS snippet "
+        f"FROM search_index WHERE search_index MATCH :q AND kind IN ({placeholders}) "
+        "ORDER BY rank DESC, kind, id LIMIT :limit OFFSET :offset"
+    )
+
+
+async def search(conn, q: str, kinds: Optional[list] = None, limit: int = 20, offset: int = 0) -> list:
+    """Ejecuta la búsqueda con una conexión async y devuelve los resultados como dicts"""
+    kinds = kinds or list(DOCUMENTS)
+    if conn.dialect.name == "postgresql":
+        sql, params = _postgres_query(kinds), {"q": q, "limit": limit, "offset": offset}
+    else:
+        match = _sqlite_match(q)
+        if not match:
+            return []
+        sql, params = _sqlite_query(kinds), {"q": match, "limit": limit, "offset": offset}
+    rows = (await conn.execute(text(sql), params)).mappings().all()
+    # El orden ya viene de SQL con el rank completo. Al serializarlo se recorta a 6 cifras
+    # significativas, no decimales: bm25 en FTS5 da valores del orden de 1e-6.
+    return [
+        {"type": row["kind"], "id": row["id"], "title": row["title"],
+         "snippet": row["snippet"], "rank": float(f"{float(row['rank']):.6g}")}
+        for row in rows
+    ]
@@ -0,0 +1,162 @@
+"""
+Instrumentación de SQL por petición.
+
+- instrument_engine(engine): listeners before/after_cursor_execute (registrados en
+  app/db.py para ambos engines) que atribuyen cada sentencia a la petición en curso
+  mediante un contextvar, que se propaga a los threads y greenlets de la petición.
+- QueryTraceMiddleware: crea las estadísticas de la petición, agrega el header
+  `Server-Timing: db;dur=..;desc="N queries", app;dur=..` (visible en las devtools del
+  navegador) y al terminar avisa si una misma sentencia se repitió más de
+  N_PLUS_ONE_THRESHOLD veces (el patrón N+1 típico: una consulta por fila de un listado).
+- Slow-query log: sentencias de más de SLOW_QUERY_MS se imprimen y quedan en un buffer
+  circular en memoria (GET /internal/queries).
+
+Los parámetros de las consultas no se registran salvo SLOW_QUERY_LOG_PARAMS=1 (pueden
+traer datos personales de las cotizaciones).
+"""
+import os
+import re
+import time
+from collections import deque
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Optional
+from sqlalchemy import event
+from starlette.datastructures import MutableHeaders
+
+SERVER_TIMING_ENABLED = os.getenv("SERVER_TIMING_ENABLED", "1") not in ("0", "false", "False")
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "200"))
+SLOW_QUERY_LOG_PARAMS = os.getenv("SLOW_QUERY_LOG_PARAMS", "0") in ("1", "true", "True")
+SLOW_QUERY_MAX_CHARS = int(os.getenv("SLOW_QUERY_MAX_CHARS", "2000"))
+# Repeticiones de una misma sentencia en una petición a partir de las cuales se avisa (0 = nunca)
+N_PLUS_ONE_THRESHOLD = int(os.getenv("N_PLUS_ONE_THRESHOLD", "10"))
+
+slow_queries = deque(maxlen=int(os.getenv("SLOW_QUERY_BUFFER", "100")))
+n_plus_one_warnings = deque(maxlen=int(os.getenv("SLOW_QUERY_BUFFER", "100")))
+
+
+class RequestStats:
+    __slots__ = ("method", "path", "db_time", "db_queries", "statements")
+
+    def __init__(self, method: str = "", path: str = ""):
+        self.method = method
+        self.path = path
+        self.db_time = 0.0
+        self.db_queries = 0
+        self.statements = {}  # sentencia (ya parametrizada) -> veces ejecutada
+
+
+current_request: ContextVar[Optional[RequestStats]] = ContextVar("current_request", default=None)
+
+_IN_LIST = re.compile(r"\((?:\s*(?:\?|%\(\w+\)s|\$\d+|:\w+)\s*,)+\s*(?:\?|%\(\w+\)s|\$\d+|:\w+)\s*\)")
+_SPACES = re.compile(r"\s+")
+
+
+def statement_shape(statement: str) -> str:
+    """Sentencia normalizada: espacios colapsados y listas IN (?, ?, ...) -> (...)"""
+    return _IN_LIST.sub("(...)", _SPACES.sub(" ", statement).strip())
+
+
+def _record_slow(statement: str, parameters, elapsed: float, stats: Optional[RequestStats]):
+    entry = {
+        "at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "duration_ms": round(elapsed * 1000, 3),
+        "request": f"{stats.method} {stats.path}" if stats else None,
+        "statement": statement_shape(statement)[:SLOW_QUERY_MAX_CHARS],
+    }
+    if SLOW_QUERY_LOG_PARAMS:
+        entry["parameters"] = repr(parameters)[:SLOW_QUERY_MAX_CHARS]
+    slow_queries.append(entry)
+    print(f"⚠️ Consulta lenta ({entry['duration_ms']} ms) en {entry['request'] or 'fuera de una petición'}: "
+          f"{entry['statement'][:300]}")
+
+
+def instrument_engine(engine):
+    """Registra los listeners de consultas sobre un engine sync (o `async_engine.sync_engine`)"""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_start"].pop()
+        stats = current_request.get()
+        if stats is not None:
+            stats.db_time += elapsed
+            stats.db_queries += 1
+            stats.statements[statement] = stats.statements.get(statement, 0) + 1
+        if elapsed * 1000 >= SLOW_QUERY_MS:
+            _record_slow(statement, parameters, elapsed, stats)
+
+    @event.listens_for(engine, "handle_error")
+    def _error(exception_context):
+        # La consulta falló: no queda un after_cursor_execute que saque el inicio
+        connection = exception_context.connection
+        if connection is not None and connection.info.get("query_start"):
+            connection.info["query_start"].pop()
+
+
+def server_timing(stats: RequestStats, elapsed: float) -> str:
+    return (f'db;dur={stats.db_time * 1000:.1f};desc="{stats.db_queries} queries", '
+            f"app;dur={elapsed * 1000:.1f}")
+
+
+def check_repeated(stats: RequestStats):
+    """Aviso N+1: la misma forma de sentencia ejecutada más de N_PLUS_ONE_THRESHOLD veces"""
+    if not N_PLUS_ONE_THRESHOLD or stats.db_queries <= N_PLUS_ONE_THRESHOLD:
+        return
+    shapes = {}
+    for statement, count in stats.statements.items():
+        shape = statement_shape(statement)
+        shapes[shape] = shapes.get(shape, 0) + count
+    for shape, count in shapes.items():
+        if count > N_PLUS_ONE_THRESHOLD:
+            n_plus_one_warnings.append({
+                "at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                "request": f"{stats.method} {stats.path}",
+                "count": count,
+                "statement": shape[:SLOW_QUERY_MAX_CHARS],
+            })
+            print(f"⚠️ Posible N+1 en {stats.method} {stats.path}: {count} veces {shape[:300]}")
+
+
+class QueryTraceMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats(scope["method"], scope["path"])
+        token = current_request.set(stats)
+        start = time.perf_counter()
+
+        async def timing_send(message):
+            if message["type"] == "http.response.start" and SERVER_TIMING_ENABLED:
+                # Lo que la ruta consultó hasta empezar a responder (no incluye streaming posterior)
+                headers = MutableHeaders(scope=message)
+                headers.append("Server-Timing", server_timing(stats, time.perf_counter() - start))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, timing_send)
+        finally:
+            current_request.reset(token)
+            check_repeated(stats)
+
+
+def query_stats() -> dict:
+    """Para GET /internal/queries"""
+    return {
+        "settings": {
+            "slow_query_ms": SLOW_QUERY_MS,
+            "n_plus_one_threshold": N_PLUS_ONE_THRESHOLD,
+            "log_params": SLOW_QUERY_LOG_PARAMS,
+            "server_timing": SERVER_TIMING_ENABLED,
+        },
+        "slow": list(slow_queries),
+        "n_plus_one": list(n_plus_one_warnings),
+    }
@@ -0,0 +1,50 @@
+import json
+from typing import Iterable
+from sqlalchemy import JSON, and_, exists, func, select, type_coerce
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.types import TypeDecorator
+
+
+class JSONText(TypeDecorator):
+    """
+    Columna JSONB en PostgreSQL (JSON en SQLite) que en Python se sigue viendo como
+    el texto JSON de siempre, así la API y el frontend no cambian de forma.
+    """
+
+    impl = JSON
+    cache_ok = True
+
+    def load_dialect_impl(self, dialect):
+        if dialect.name == "postgresql":
+            return dialect.type_descriptor(JSONB())
+        return dialect.type_descriptor(JSON())
+
+    def process_bind_param(self, value, dialect):
+        if value is None or not isinstance(value, str):
+            return value
+        try:
+            return json.loads(value)
+        except ValueError:
+            # Texto que no es JSON: se guarda como string JSON para no perderlo
+            return value
+
+    def process_result_value(self, value, dialect):
+        if value is None or isinstance(value, str):
+            return value
+        return json.dumps(value, ensure_ascii=False)
+
+
+def json_array_contains(column, values: Iterable[str], dialect_name: str):
+    """
+    Condición "el array JSON de `column` contiene todos los `values`".
+    En PostgreSQL es `column @> '[...]'`, que usa el índice GIN; en SQLite se
+    resuelve con json_each.
+    """
+    values = list(values)
+    if dialect_name == "postgresql":
+        return type_coerce(column, JSONB).contains(values)
+    conditions = []
+    for value in values:
+        items = func.json_each(column).table_valued("value")
+        conditions.append(exists(select(1).select_from(items).where(items.c.value == value)))
+    return and_(*conditions)
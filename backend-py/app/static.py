@@ -0,0 +1,122 @@
+"""
+Servido de /uploads.
+
+- Nombres content-addressed (sha256 de app/storage.py, con o sin sufijo de derivado
+  "-w640-webp", ver app/api/upload.py) nunca cambian de contenido: se envían con
+  Cache-Control inmutable de un año.
+  El resto usa un max-age corto (STATIC_MAX_AGE).
+- Range / If-Range los resuelve FileResponse de Starlette (seek en videos).
+- Si existe un hermano precomprimido (`archivo.br` / `archivo.gz`) y el cliente lo acepta,
+  se sirve ese con Content-Encoding, salvo en peticiones con Range (los offsets son del
+  archivo original). Si el hermano existe, también la versión sin comprimir lleva
+  `Vary: Accept-Encoding` (si no, un cache compartido la serviría a todos).
+- STATIC_SEND_MODE=x-accel-redirect | x-sendfile: Python solo resuelve la ruta y las
+  cabeceras, y nginx/Apache envían el archivo. Ejemplo nginx:
+
+      location /_protected_uploads/ {
+          internal;
+          alias /app/uploads/;
+          gzip_static on;
+      }
+"""
+import os
+import re
+from mimetypes import guess_type
+from fastapi.staticfiles import StaticFiles
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+
+STATIC_SEND_MODE = os.getenv("STATIC_SEND_MODE", "").strip().lower()
+STATIC_ACCEL_PREFIX = "/" + os.getenv("STATIC_ACCEL_PREFIX", "/_protected_uploads/").strip("/") + "/"
+STATIC_MAX_AGE = int(os.getenv("STATIC_MAX_AGE", "3600"))
+
+IMMUTABLE = "public, max-age=31536000, immutable"
+HASHED_NAME = re.compile(r"^[0-9a-f]{64}(-w\d+-[a-z0-9]+)?(\.[a-z0-9]+)?$")
+# (Accept-Encoding, sufijo del archivo) en orden de preferencia
+PRECOMPRESSED = (("br", ".br"), ("gzip", ".gz"))
+
+
+def cache_control_for(name: str) -> str:
+    if HASHED_NAME.match(name):
+        return IMMUTABLE
+    return f"public, max-age={STATIC_MAX_AGE}"
+
+
+def _media_type(path) -> str:
+    return guess_type(str(path))[0] or "application/octet-stream"
+
+
+def _accepted_encodings(request_headers: Headers) -> set:
+    accepted = set()
+    for part in request_headers.get("accept-encoding", "").split(","):
+        coding, _, params = part.strip().partition(";")
+        if coding and params.replace(" ", "") not in ("q=0", "q=0.0"):
+            accepted.add(coding.lower())
+    return accepted
+
+
+def _precompressed_sibling(full_path: str, request_headers: Headers):
+    """(ruta, stat, encoding) del hermano precomprimido a servir, o None"""
+    accepted = _accepted_encodings(request_headers)
+    for encoding, suffix in PRECOMPRESSED:
+        if encoding not in accepted:
+            continue
+        try:
+            stat_result = os.stat(full_path + suffix)
+        except OSError:
+            continue
+        return full_path + suffix, stat_result, encoding
+    return None
+
+
+def _has_precompressed(full_path: str) -> bool:
+    return any(os.path.exists(full_path + suffix) for _, suffix in PRECOMPRESSED)
+
+
+class UploadsStaticFiles(StaticFiles):
+    def __init__(self, *args, send_mode: str = STATIC_SEND_MODE, accel_prefix: str = STATIC_ACCEL_PREFIX, **kwargs):
+        super().__init__(*args, **kwargs)
+        if send_mode not in ("", "x-accel-redirect", "x-sendfile"):
+            raise ValueError(f"Unknown STATIC_SEND_MODE: {send_mode}")
+        self.send_mode = send_mode
+        self.accel_prefix = accel_prefix
+
+    def file_response(self, full_path, stat_result, scope, status_code=200) -> Response:
+        request_headers = Headers(scope=scope)
+        name = os.path.basename(full_path)
+        headers = {"Cache-Control": cache_control_for(name)}
+
+        if self.send_mode:
+            return self._delegated_response(full_path, stat_result, headers)
+
+        media_type = _media_type(full_path)
+        sibling = None
+        if "range" not in request_headers:
+            sibling = _precompressed_sibling(str(full_path), request_headers)
+        if sibling:
+            path, stat_result, encoding = sibling
+            headers.update({"Content-Encoding": encoding, "Vary": "Accept-Encoding"})
+            response = FileResponse(path, status_code=status_code, headers=headers,
+                                    media_type=media_type, stat_result=stat_result)
+        else:
+            if _has_precompressed(str(full_path)):
+                headers["Vary"] = "Accept-Encoding"
+            response = FileResponse(full_path, status_code=status_code, headers=headers,
+                                    media_type=media_type, stat_result=stat_result)
+
+        if self.is_not_modified(response.headers, request_headers):
+            return Response(status_code=304, headers={
+                key: value for key, value in response.headers.items()
+                if key in ("cache-control", "etag", "last-modified", "vary")
+            })
+        return response
+
+    def _delegated_response(self, full_path, stat_result, headers: dict) -> Response:
+        """Respuesta vacía con la ruta para que el proxy envíe el archivo (Range incluido)"""
+        media_type = _media_type(full_path)
+        if self.send_mode == "x-sendfile":
+            headers["X-Sendfile"] = os.path.abspath(full_path)
+        else:
+            relative = os.path.relpath(full_path, self.directory).replace(os.sep, "/")
+            headers["X-Accel-Redirect"] = self.accel_prefix + relative
+        return Response(status_code=200, headers=headers, media_type=media_type)
@@ -0,0 +1,170 @@
+"""
+Backends de almacenamiento para las subidas.
+
+Los archivos se guardan con su SHA-256 como nombre (content-addressed): subir dos veces
+el mismo archivo produce la misma clave, y la tabla StoredFile permite devolver la URL
+existente sin volver a transferirlo.
+
+Los métodos son bloqueantes (disco / HTTP): llamarlos desde un thread.
+"""
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from typing import BinaryIO, Optional
+
+UPLOADS_DIR = Path(os.getenv("UPLOADS_DIR", "uploads"))
+# Prefijo público de los archivos locales (el frontend usa URLs absolutas)
+PUBLIC_BASE_URL = os.getenv("PUBLIC_BASE_URL", "http://localhost:8000").rstrip("/")
+# A partir de este tamaño se sube a Cloudinary por partes (upload_large)
+LARGE_UPLOAD_BYTES = 20 * 1024 * 1024
+
+EXTENSIONS = {
+    "image/jpeg": ".jpg",
+    "image/png": ".png",
+    "image/gif": ".gif",
+    "image/webp": ".webp",
+    "image/avif": ".avif",
+    "image/heic": ".heic",
+    "video/mp4": ".mp4",
+    "video/quicktime": ".mov",
+    "video/webm": ".webm",
+    "application/pdf": ".pdf",
+}
+
+
+def storage_key(sha256: str, content_type: str) -> str:
+    return sha256 + EXTENSIONS.get(content_type, "")
+
+
+class StorageBackend:
+    name = "base"
+
+    def save(self, fileobj: BinaryIO, key: str, content_type: str, size: int) -> str:
+        """Guarda el archivo bajo `key` y devuelve su URL pública"""
+        raise NotImplementedError
+
+    def delete(self, url: str, content_type: Optional[str] = None) -> bool:
+        raise NotImplementedError
+
+    def owns(self, url: str) -> bool:
+        """True si la URL pertenece a este backend"""
+        raise NotImplementedError
+
+
+class LocalStorage(StorageBackend):
+    """Disco local, servido por el mount /uploads de app/main.py"""
+
+    name = "local"
+
+    def __init__(self, directory: Path = UPLOADS_DIR, base_url: str = PUBLIC_BASE_URL + "/uploads"):
+        self.directory = directory
+        self.base_url = base_url
+
+    def url_for(self, key: str) -> str:
+        return f"{self.base_url}/{key}"
+
+    def save(self, fileobj, key, content_type, size):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        target = self.directory / key
+        if not target.exists():
+            # Escritura atómica: a un temporal en el mismo directorio y luego rename
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, prefix=".upload-")
+            try:
+                with os.fdopen(fd, "wb") as out:
+                    fileobj.seek(0)
+                    shutil.copyfileobj(fileobj, out, 1024 * 1024)
+                os.replace(tmp_path, target)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+        return self.url_for(key)
+
+    def owns(self, url):
+        return url.startswith(self.base_url + "/") or url.startswith("/uploads/")
+
+    def delete(self, url, content_type=None):
+        name = url.rsplit("/", 1)[-1]
+        target = self.directory / name
+        # Evitar salir del directorio de uploads con nombres tipo "../"
+        if target.resolve().parent != self.directory.resolve() or not target.exists():
+            return False
+        target.unlink()
+        return True
+
+
+class CloudinaryStorage(StorageBackend):
+    name = "cloudinary"
+    folder = "portafolio"
+
+    def __init__(self):
+        self._configured = False
+
+    def _client(self):
+        # Configuración perezosa: no tocar Cloudinary hasta la primera subida
+        import cloudinary
+        import cloudinary.uploader
+
+        if not self._configured:
+            cloudinary.config(
+                cloud_name=str(os.getenv("CLOUDINARY_CLOUD_NAME", "")).strip(),
+                api_key=str(os.getenv("CLOUDINARY_API_KEY", "")).strip(),
+                api_secret=str(os.getenv("CLOUDINARY_API_SECRET", "")).strip(),
+                secure=True
+            )
+            self._configured = True
+        return cloudinary.uploader
+
+    def save(self, fileobj, key, content_type, size):
+        uploader = self._client()
+        fileobj.seek(0)
+        # public_id = clave sin la extensión final (hash, o hash-ancho-formato en los
+        # derivados): si ya existe en Cloudinary no se sobreescribe
+        options = {
+            "public_id": f"{self.folder}/{key.rsplit('.', 1)[0]}",
+            "resource_type": "auto",
+            "overwrite": False,
+        }
+        if size > LARGE_UPLOAD_BYTES:
+            result = uploader.upload_large(fileobj, **options)
+        else:
+            result = uploader.upload(fileobj, **options)
+        return result.get("secure_url")
+
+    def owns(self, url):
+        return "cloudinary.com" in url
+
+    def delete(self, url, content_type=None):
+        # Ejemplo: https://res.cloudinary.com/demo/image/upload/v12345/portafolio/public_id.jpg
+        # El public_id sería 'portafolio/public_id'
+        parts = url.split("/")
+        public_id = "/".join(parts[-2:]).rsplit(".", 1)[0]
+        resource_type = "video" if content_type and content_type.startswith("video/") else "image"
+        result = self._client().destroy(public_id, resource_type=resource_type)
+        return result.get("result") == "ok"
+
+
+_BACKENDS = {"local": LocalStorage, "cloudinary": CloudinaryStorage}
+_instances = {}
+
+
+def get_storage(name: Optional[str] = None) -> StorageBackend:
+    """
+    Backend configurado en STORAGE_BACKEND (local | cloudinary). Por defecto Cloudinary si
+    hay credenciales y disco local si no.
+    """
+    if name is None:
+        name = os.getenv("STORAGE_BACKEND") or ("cloudinary" if os.getenv("CLOUDINARY_CLOUD_NAME") else "local")
+    if name not in _BACKENDS:
+        raise ValueError(f"Unknown storage backend: {name}")
+    if name not in _instances:
+        _instances[name] = _BACKENDS[name]()
+    return _instances[name]
+
+
+def backend_for_url(url: str) -> Optional[StorageBackend]:
+    for name in _BACKENDS:
+        backend = get_storage(name)
+        if backend.owns(url):
+            return backend
+    return None
@@ -0,0 +1,241 @@
+"""
+Versiones de tabla compartidas entre workers, para ETag / Last-Modified y la cache.
+
+Cada tabla pública tiene una fila en `table_version` que se incrementa en la misma
+transacción que la escritura (eventos de Session registrados con track_writes en
+app/db.py): una escritura atendida por cualquier worker cambia la versión que ven todos.
+Cada proceso lee la tabla entera (una consulta) y la reutiliza VERSION_TTL segundos; las
+escrituras propias la marcan vencida para que ese worker no espere el TTL. Cuando vence,
+una sola lectura por proceso queda en vuelo y las peticiones concurrentes la esperan.
+
+El ETag depende solo de la ruta, el query string, las versiones y la revisión de Alembic
+del código (un deploy que cambia el esquema de la respuesta también lo cambia), así que
+es el mismo en todos los workers mientras no haya escrituras. Las variantes comprimidas
+(app/compression.py) llevan el encoding como sufijo ("<hash>-br"): son otros bytes y un
+ETag fuerte no puede repetirse entre representaciones distintas.
+"""
+import asyncio
+import hashlib
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Iterable, Optional
+from fastapi import Request, Response
+from sqlalchemy import DateTime, bindparam, event, text
+from sqlalchemy.orm import Session
+
+# Tablas con versión: las que sirven los GET con ETag y cache (stored_file por las `images`
+# que agregan proyectos y blog)
+VERSIONED = ("blog", "proyecto", "experience", "education", "timeline", "certification", "contact", "profile",
+             "stored_file")
+VERSION_TTL = float(os.getenv("VERSION_TTL", "1"))
+
+_lock = threading.Lock()
+_snapshot: dict = {}  # tabla -> (versión, modified_at como timestamp)
+_fetched_at = 0.0
+_stale_count = 0  # mark_stale() desde el arranque: una lectura previa no sirve después de una escritura
+_inflight: Optional[tuple] = None  # (_stale_count al empezar, task de _refresh)
+_code_revision: Optional[str] = None
+
+
+class NotModified(Exception):
+    """Se lanza antes de tocar la BD cuando el cliente ya tiene la versión actual"""
+
+    def __init__(self, headers: dict):
+        self.headers = headers
+
+
+# ---------- Escritura: versión incrementada en la transacción ----------
+
+_BUMP = text("UPDATE table_version SET version = version + 1, modified_at = :now WHERE name = :name").bindparams(
+    bindparam("now", type_=DateTime(timezone=True))
+)
+_INSERT = text("INSERT INTO table_version (name, version, modified_at) VALUES (:name, 1, :now)").bindparams(
+    bindparam("now", type_=DateTime(timezone=True))
+)
+
+
+def _bump(connection, tables: Iterable[str]):
+    now = datetime.now(timezone.utc)
+    for table in sorted(set(tables) & set(VERSIONED)):
+        params = {"name": table, "now": now}
+        if not connection.execute(_BUMP, params).rowcount:
+            # Fila sembrada por la migración 0010; por si la BD se creó de otra forma
+            connection.execute(_INSERT, params)
+
+
+def _after_flush(session, flush_context):
+    # new / dirty / deleted todavía tienen el estado previo al flush
+    tables = {getattr(obj, "__tablename__", None) for obj in (*session.new, *session.dirty, *session.deleted)}
+    if tables & set(VERSIONED):
+        _bump(session.connection(), tables)
+
+
+def _do_orm_execute(state):
+    # UPDATE / DELETE / INSERT en lote (session.execute(update(Model), ...)), que no pasan por el flush
+    if state.is_update or state.is_delete or state.is_insert:
+        table = getattr(state.statement, "table", None)
+        if table is not None and getattr(table, "name", None) in VERSIONED:
+            _bump(state.session.connection(), [table.name])
+
+
+def track_writes():
+    """Registra los eventos de Session (sync y async) que versionan las escrituras"""
+    if not event.contains(Session, "after_flush", _after_flush):
+        event.listen(Session, "after_flush", _after_flush)
+        event.listen(Session, "do_orm_execute", _do_orm_execute)
+
+
+# ---------- Lectura ----------
+
+def mark_stale():
+    """Después de una escritura propia: la próxima lectura vuelve a consultar las versiones"""
+    global _fetched_at, _stale_count
+    with _lock:
+        _fetched_at = 0.0
+        _stale_count += 1
+
+
+def _timestamp(value) -> float:
+    if isinstance(value, str):
+        # SQLite devuelve el texto tal cual se guardó
+        value = datetime.fromisoformat(value)
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+async def _refresh(stale_count: int):
+    global _fetched_at, _snapshot
+    from app.db import async_engine
+
+    async with async_engine.connect() as conn:
+        rows = (await conn.execute(text("SELECT name, version, modified_at FROM table_version"))).all()
+    with _lock:
+        _snapshot = {name: (version, _timestamp(modified)) for name, version, modified in rows}
+        # Si hubo una escritura mientras tanto, la lectura puede ser anterior: sigue vencida
+        if stale_count == _stale_count:
+            _fetched_at = time.monotonic()
+
+
+async def _refresh_once():
+    """
+    Single-flight: si ya hay una lectura en vuelo (de este event loop, empezada después
+    de la última escritura propia) se espera esa en vez de lanzar otra.
+    """
+    global _inflight
+    loop = asyncio.get_running_loop()
+    with _lock:
+        stale_count = _stale_count
+        if _inflight is None or _inflight[0] != stale_count or _inflight[1].done() or _inflight[1].get_loop() is not loop:
+            _inflight = (stale_count, loop.create_task(_refresh(stale_count)))
+        task = _inflight[1]
+    # shield: si se cancela una petición que espera, la lectura sigue para las demás
+    await asyncio.shield(task)
+
+
+async def current(tables: Iterable[str]) -> tuple:
+    """Versión de cada tabla (leída de la BD como mucho cada VERSION_TTL segundos)"""
+    if time.monotonic() - _fetched_at > VERSION_TTL:
+        await _refresh_once()
+    return tuple(_snapshot.get(table, (0, 0.0))[0] for table in tables)
+
+
+def last_modified(tables: Iterable[str]) -> float:
+    return max((_snapshot.get(table, (0, 0.0))[1] for table in tables), default=0.0)
+
+
+def _revision() -> str:
+    global _code_revision
+    if _code_revision is None:
+        from app.migrations import head_revision
+
+        _code_revision = head_revision() or ""
+    return _code_revision
+
+
+async def etag_for(tables: Iterable[str], request: Request) -> str:
+    """ETag fuerte: revisión del esquema + versión de cada tabla + query string (paginación, filtros, etc.)"""
+    tables = sorted(tables)
+    parts = [_revision(), request.url.path, str(sorted(request.query_params.multi_items()))]
+    parts += [f"{table}:{version}" for table, version in zip(tables, await current(tables))]
+    return '"' + hashlib.sha1("|".join(parts).encode()).hexdigest() + '"'
+
+
+# Encodings que app/compression.py agrega como sufijo del ETag
+ETAG_ENCODINGS = ("br", "gzip")
+
+
+def encoded_etag(etag: str, encoding: str) -> str:
+    """ETag de la variante comprimida: '"abc"' -> '"abc-br"' (conserva W/)"""
+    weak = "W/" if etag.startswith("W/") else ""
+    return f'{weak}{etag.removeprefix("W/")[:-1]}-{encoding}"'
+
+
+def _base_etag(tag: str) -> str:
+    # If-None-Match usa comparación débil: W/"x" coincide con "x"; y cualquier variante
+    # comprimida ("x-br", "x-gzip") representa la misma versión que "x"
+    tag = tag.strip().removeprefix("W/")
+    for encoding in ETAG_ENCODINGS:
+        suffix = f'-{encoding}"'
+        if tag.endswith(suffix):
+            return tag[:-len(suffix)] + '"'
+    return tag
+
+
+def _etag_match(header: str, etag: str) -> Optional[str]:
+    """Etiqueta de If-None-Match que coincide con `etag` (None si ninguna)"""
+    if header.strip() == "*":
+        return etag
+    for value in header.split(","):
+        if _base_etag(value) == etag:
+            return value.strip()
+    return None
+
+
+def _not_modified_since(header: str, modified: float) -> bool:
+    try:
+        since = parsedate_to_datetime(header).timestamp()
+    except (TypeError, ValueError):
+        return False
+    # Last-Modified tiene resolución de segundos
+    return int(modified) <= since
+
+
+async def check_not_modified(request: Request, response: Optional[Response], *tables: str):
+    """
+    Calcula ETag/Last-Modified para las tablas indicadas. Si el cliente ya tiene esa
+    versión lanza NotModified (-> 304); si no, deja los headers en `response`.
+    """
+    etag = await etag_for(tables, request)
+    modified = last_modified(tables)
+    headers = {
+        "ETag": etag,
+        "Last-Modified": formatdate(modified, usegmt=True),
+        "Cache-Control": "no-cache",
+    }
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        matched = _etag_match(if_none_match, etag)
+        if matched is not None:
+            # El 304 repite la etiqueta de la variante que tiene el cliente (comprimida o no)
+            raise NotModified({**headers, "ETag": matched})
+    else:
+        if_modified_since = request.headers.get("if-modified-since")
+        if if_modified_since and _not_modified_since(if_modified_since, modified):
+            raise NotModified(headers)
+
+    if response is not None:
+        response.headers.update(headers)
+
+
+def conditional(*tables: str):
+    """Dependencia para rutas GET: `dependencies=[Depends(conditional("proyecto"))]`"""
+
+    async def dependency(request: Request, response: Response):
+        await check_not_modified(request, response, *tables)
+
+    return dependency
@@ -0,0 +1,195 @@
+"""
+Worker del outbox de correos (tabla email_outbox).
+
+    python -m app.workers.outbox          # bucle: revisa cada OUTBOX_POLL_SECONDS
+    python -m app.workers.outbox --once   # envía lo pendiente y termina (cron / pruebas)
+
+Cada ciclo reclama un lote con SELECT ... FOR UPDATE SKIP LOCKED (varios workers no se
+pisan), lo marca "sending" con un lease y le suma el intento, envía el lote por una sola
+conexión SMTP y guarda el resultado. Un fallo reprograma el correo con backoff exponencial
+(con jitter) hasta OUTBOX_MAX_ATTEMPTS, y después queda en "failed". Si el worker muere a
+mitad de un lote, el lease vence y el correo se vuelve a reclamar; como el intento ya se
+contó, un correo que tira el worker abajo termina en "failed" y no se reintenta para siempre.
+
+Para probar en local contra un SMTP de mentira:
+
+    python -m aiosmtpd -n -l localhost:1025      (o MailHog)
+    SMTP_HOST=localhost SMTP_PORT=1025 SMTP_SECURITY=none python -m app.workers.outbox --once
+"""
+import argparse
+import os
+import random
+import signal
+import smtplib
+import time
+from datetime import timedelta
+from email.message import EmailMessage
+from typing import Dict, List, Optional
+from sqlalchemy import update
+from sqlmodel import Session, select
+from app.db import engine
+from app.models import EmailOutbox, utcnow
+
+SMTP_HOST = os.getenv("SMTP_HOST", "localhost")
+SMTP_PORT = int(os.getenv("SMTP_PORT", "587"))
+SMTP_USER = os.getenv("SMTP_USER", "")
+SMTP_PASSWORD = os.getenv("SMTP_PASSWORD", "")
+SMTP_SECURITY = os.getenv("SMTP_SECURITY", "starttls").lower()  # starttls | ssl | none
+SMTP_FROM = os.getenv("SMTP_FROM", "no-reply@localhost")
+SMTP_TIMEOUT = float(os.getenv("SMTP_TIMEOUT", "30"))
+
+BATCH_SIZE = int(os.getenv("OUTBOX_BATCH_SIZE", "20"))
+POLL_SECONDS = float(os.getenv("OUTBOX_POLL_SECONDS", "5"))
+MAX_ATTEMPTS = int(os.getenv("OUTBOX_MAX_ATTEMPTS", "8"))
+BACKOFF_BASE = float(os.getenv("OUTBOX_BACKOFF_BASE", "30"))
+BACKOFF_MAX = float(os.getenv("OUTBOX_BACKOFF_MAX", "3600"))
+# Tiempo que un lote reclamado queda reservado antes de poder reclamarse de nuevo
+LEASE_SECONDS = float(os.getenv("OUTBOX_LEASE_SECONDS", "300"))
+
+_stopping = False
+
+
+def backoff_delay(attempts: int) -> float:
+    """Segundos hasta el próximo intento: base * 2^(n-1), con tope y ±20% de jitter"""
+    delay = min(BACKOFF_BASE * 2 ** max(attempts - 1, 0), BACKOFF_MAX)
+    return delay * random.uniform(0.8, 1.2)
+
+
+def claim_batch(session: Session, limit: int = BATCH_SIZE) -> List[EmailOutbox]:
+    now = utcnow()
+    stmt = (
+        select(EmailOutbox)
+        .where(EmailOutbox.status.in_(("pending", "sending")), EmailOutbox.next_attempt_at <= now)
+        .order_by(EmailOutbox.next_attempt_at)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+    claimed = []
+    for item in session.exec(stmt).all():
+        if not item.to_address:
+            item.status, item.last_error = "failed", "Sin destinatario (QUOTE_NOTIFY_TO / SMTP_FROM)"
+        elif item.attempts >= MAX_ATTEMPTS:
+            # Reclamado MAX_ATTEMPTS veces sin resultado registrado: el worker murió enviándolo
+            item.status = "failed"
+            item.last_error = item.last_error or "Lease vencido sin resultado en todos los intentos"
+        else:
+            item.status = "sending"
+            item.attempts += 1
+            item.next_attempt_at = now + timedelta(seconds=LEASE_SECONDS)
+            claimed.append(item)
+        session.add(item)
+    session.commit()
+    return claimed
+
+
+def build_message(item: EmailOutbox) -> EmailMessage:
+    message = EmailMessage()
+    message["From"] = SMTP_FROM
+    message["To"] = item.to_address
+    if item.reply_to:
+        message["Reply-To"] = item.reply_to
+    message["Subject"] = item.subject
+    message.set_content(item.body)
+    return message
+
+
+def _connect() -> smtplib.SMTP:
+    if SMTP_SECURITY == "ssl":
+        smtp = smtplib.SMTP_SSL(SMTP_HOST, SMTP_PORT, timeout=SMTP_TIMEOUT)
+    else:
+        smtp = smtplib.SMTP(SMTP_HOST, SMTP_PORT, timeout=SMTP_TIMEOUT)
+        if SMTP_SECURITY == "starttls":
+            smtp.starttls()
+    if SMTP_USER:
+        smtp.login(SMTP_USER, SMTP_PASSWORD)
+    return smtp
+
+
+def send_batch(items: List[EmailOutbox]) -> Dict[int, Optional[str]]:
+    """Envía el lote por una sola conexión. Devuelve {id: None si salió, o el error}"""
+    results = {}
+    try:
+        smtp = _connect()
+    except (OSError, smtplib.SMTPException) as e:
+        return {item.id: f"connect: {e}" for item in items}
+
+    try:
+        for item in items:
+            try:
+                smtp.send_message(build_message(item))
+                results[item.id] = None
+            except smtplib.SMTPServerDisconnected as e:
+                # La conexión se cayó: el resto del lote se reintenta más tarde
+                for pending in items:
+                    results.setdefault(pending.id, f"disconnected: {e}")
+                break
+            except (OSError, smtplib.SMTPException) as e:
+                results[item.id] = str(e)
+    finally:
+        try:
+            smtp.quit()
+        except (OSError, smtplib.SMTPException):
+            pass
+    return results
+
+
+def record_results(session: Session, items: List[EmailOutbox], results: Dict[int, Optional[str]]):
+    now = utcnow()
+    params = []
+    for item in items:
+        attempts = item.attempts  # ya incluye este intento (claim_batch)
+        error = results.get(item.id)
+        if error is None:
+            params.append({"id": item.id, "status": "sent", "attempts": attempts, "sent_at": now, "last_error": None})
+        elif attempts >= MAX_ATTEMPTS:
+            params.append({"id": item.id, "status": "failed", "attempts": attempts, "last_error": error[:1000]})
+        else:
+            params.append({
+                "id": item.id, "status": "pending", "attempts": attempts, "last_error": error[:1000],
+                "next_attempt_at": now + timedelta(seconds=backoff_delay(attempts)),
+            })
+    # UPDATE por clave primaria en lote (executemany), agrupado por conjunto de columnas
+    by_keys: Dict[tuple, list] = {}
+    for row in params:
+        by_keys.setdefault(tuple(sorted(row)), []).append(row)
+    for rows in by_keys.values():
+        session.execute(update(EmailOutbox), rows)
+    session.commit()
+
+
+def process_batch() -> int:
+    """Reclama, envía y registra un lote. Devuelve cuántos correos procesó."""
+    with Session(engine, expire_on_commit=False) as session:
+        items = claim_batch(session)
+        if not items:
+            return 0
+        results = send_batch(items)
+        record_results(session, items, results)
+        sent = sum(1 for error in results.values() if error is None)
+        print(f"📧 Outbox: {sent}/{len(items)} enviados")
+        return len(items)
+
+
+def run(once: bool = False):
+    while not _stopping:
+        processed = process_batch()
+        if processed:
+            continue
+        if once:
+            break
+        time.sleep(POLL_SECONDS)
+
+
+def _stop(signum, frame):
+    # Terminar el lote en curso y salir (SIGTERM de docker / systemd)
+    global _stopping
+    _stopping = True
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Envía los correos pendientes del outbox")
+    parser.add_argument("--once", action="store_true", help="Vaciar lo pendiente y terminar")
+    args = parser.parse_args()
+    signal.signal(signal.SIGTERM, _stop)
+    signal.signal(signal.SIGINT, _stop)
+    run(once=args.once)
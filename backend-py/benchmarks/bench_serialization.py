@@ -0,0 +1,119 @@
+"""
+Compara la serialización de un listado de proyectos:
+
+  - fastapi:  handler devuelve instancias SQLModel con response_model=List[Proyecto]
+              (se validan otra vez contra el modelo y se serializan)
+  - orjson:   handler devuelve las filas como dicts con ORJSONResponse (app/responses.py)
+
+Mide tanto el paso de serialización aislado como la petición completa (TestClient).
+
+    python benchmarks/bench_serialization.py [--rows 100] [--requests 300]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from typing import List
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from pydantic import TypeAdapter
+from app.dates import derive
+from app.models import Proyecto
+from app.responses import ORJSONResponse
+
+
+def make_rows(count: int) -> list:
+    media = json.dumps([{"type": "image", "url": f"https://example.com/img/{i}.webp"} for i in range(6)])
+    rows = []
+    for i in range(count):
+        values = {
+            "id": i,
+            "title": f"Proyecto {i}",
+            "category": "web",
+            "status": "Completado",
+            "version": "1.0.0",
+            "description": "Plataforma de gestión con paneles y reportes. " * 20,
+            "image_url": f"https://example.com/cover/{i}.webp",
+            "video_url": None,
+            "media": media,
+            "demo_url": "https://demo.example.com",
+            "repo_url": "https://github.com/example/repo",
+            "stack": json.dumps(["Next.js", "FastAPI", "PostgreSQL", "Docker"]),
+            "deployment_date": "2024-05-01",
+            "client_name": "Cliente",
+            "sort_order": i,
+        }
+        # Armadas desde el modelo: todas sus columnas (derivadas y defaults incluidos), como
+        # las filas que devuelve la BD
+        rows.append(Proyecto(**values, **derive("proyecto", values)).model_dump())
+    return rows
+
+
+def timed(fn, repeat: int) -> float:
+    """Mejor tiempo por llamada en milisegundos"""
+    best = float("inf")
+    for _ in range(5):
+        start = time.perf_counter()
+        for _ in range(repeat):
+            fn()
+        best = min(best, (time.perf_counter() - start) / repeat)
+    return best * 1000
+
+
+def bench_serialize(rows: list, repeat: int) -> dict:
+    instances = [Proyecto(**row) for row in rows]
+    adapter = TypeAdapter(List[Proyecto])
+
+    def fastapi_path():
+        # Lo que hace FastAPI con un response_model: validar de nuevo y serializar con pydantic
+        validated = adapter.validate_python(instances, from_attributes=True)
+        adapter.dump_json(validated)
+
+    def orjson_path():
+        ORJSONResponse(content=rows)
+
+    return {"fastapi_ms": timed(fastapi_path, repeat), "orjson_ms": timed(orjson_path, repeat)}
+
+
+def bench_requests(rows: list, repeat: int) -> dict:
+    instances = [Proyecto(**row) for row in rows]
+    app = FastAPI()
+
+    @app.get("/fastapi", response_model=List[Proyecto])
+    def fastapi_route():
+        return instances
+
+    @app.get("/orjson", response_model=List[Proyecto])
+    def orjson_route():
+        return ORJSONResponse(content=rows)
+
+    client = TestClient(app)
+    assert client.get("/fastapi").json() == client.get("/orjson").json()
+    return {
+        "fastapi_ms": timed(lambda: client.get("/fastapi"), repeat),
+        "orjson_ms": timed(lambda: client.get("/orjson"), repeat),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=100)
+    parser.add_argument("--requests", type=int, default=300)
+    args = parser.parse_args()
+
+    rows = make_rows(args.rows)
+    for name, result in [
+        ("serialización", bench_serialize(rows, args.requests)),
+        ("petición completa", bench_requests(rows, args.requests // 3 or 1)),
+    ]:
+        speedup = result["fastapi_ms"] / result["orjson_ms"]
+        print(f"{name} ({args.rows} filas): fastapi {result['fastapi_ms']:.3f} ms | "
+              f"orjson {result['orjson_ms']:.3f} ms | x{speedup:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,412 @@
+"""
+Prueba de carga reproducible de la API con latencias por ruta.
+
+    # 1) Datos sintéticos en la BD de DATABASE_URL (aplica antes `alembic upgrade head`)
+    python benchmarks/load_test.py seed --projects 5000 --certs 2000 --reset
+
+    # 2) Carga: levanta uvicorn local (o --url para una API ya corriendo) y escribe el JSON
+    python benchmarks/load_test.py run --mix mixed --concurrency 32 --duration 30 --out results/main.json
+
+    # 3) Comparar dos corridas (por ejemplo entre releases)
+    python benchmarks/load_test.py compare results/v1.json results/v2.json
+
+El mix es un perfil (public, admin, mixed) o pesos por escenario:
+`--mix list_proyectos=60,get_proyecto=30,update_proyecto=10`. Con la misma --seed el
+dataset y la secuencia de peticiones de cada conexión son los mismos.
+
+Funciona con SQLite o PostgreSQL local (lo que diga DATABASE_URL). Requiere httpx
+(requirements-dev.txt).
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import re
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+from collections import defaultdict
+from datetime import datetime, timezone
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+
+# ---------- Dataset sintético ----------
+
+STACK = ["Flutter", "FastAPI", "NestJS", "PostgreSQL", "Next.js", "Docker", "React", "Node.js",
+         "JWT", "CI/CD", "Grafana", "AWS", "Redis", "Kubernetes", "TypeScript", "Python"]
+WORDS = ["gestión", "plataforma", "pagos", "inventario", "analítica", "móvil", "reportes",
+         "facturación", "notificaciones", "dashboard", "ventas", "clientes", "logística"]
+
+
+def synthetic_projects(count: int, rng: random.Random) -> list:
+    """Proyectos con la forma de seed_projects.py, con títulos, stack y textos variados"""
+    from seed_projects import proyectos_data
+
+    rows = []
+    for i in range(count):
+        base = proyectos_data[i % len(proyectos_data)]
+        stack = rng.sample(STACK, rng.randint(3, 8))
+        media = [{"type": "image", "url": f"/img/bench/{i}-{n}.webp"} for n in range(rng.randint(1, 5))]
+        rows.append(dict(
+            base,
+            title=f"{base['title']} #{i}",
+            description=f"{base['description']} {' '.join(rng.sample(WORDS, 4))}.",
+            stack=json.dumps(stack),
+            media=json.dumps(media),
+            deployment_date=f"{rng.randint(2019, 2026)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+            sort_order=i,
+        ))
+    return rows
+
+
+def synthetic_certs(count: int, rng: random.Random) -> list:
+    """Certificaciones con la forma de seed_certs.py"""
+    from seed_certs import certs_data
+
+    rows = []
+    for i in range(count):
+        base = certs_data[i % len(certs_data)]
+        rows.append(dict(base, title=f"{base['title']} #{i}", date=str(rng.randint(2015, 2026)), sort_order=i))
+    return rows
+
+
+def seed(args):
+    from sqlalchemy import delete, insert
+    from sqlmodel import Session
+    from app.dates import derive
+    from app.db import engine, init_db
+    from app.models import Certification, Proyecto
+
+    init_db()
+    rng = random.Random(args.seed)
+    # Por la Session (bulk INSERT / DELETE del ORM): do_orm_execute incrementa table_version
+    # en la misma transacción, así la app corriendo no sigue sirviendo ETags y cache viejos
+    with Session(engine) as session, session.begin():
+        if args.reset:
+            session.execute(delete(Proyecto))
+            session.execute(delete(Certification))
+        for model, rows in (
+            (Proyecto, synthetic_projects(args.projects, rng)),
+            (Certification, synthetic_certs(args.certs, rng)),
+        ):
+            # El bulk INSERT no pasa por los eventos de cada objeto: las fechas tipadas se calculan acá
+            rows = [dict(row, **derive(model.__tablename__, row)) for row in rows]
+            for start in range(0, len(rows), 1000):
+                session.execute(insert(model), rows[start:start + 1000])
+            print(f"✅ {len(rows)} filas en {model.__tablename__}")
+
+
+# ---------- Escenarios ----------
+
+class Context:
+    """Ids existentes (se leen al empezar) para armar peticiones a recursos reales"""
+
+    def __init__(self, project_ids: list, cert_ids: list):
+        self.project_ids = project_ids
+        self.cert_ids = cert_ids
+
+
+def _list_proyectos(ctx, rng):
+    return "GET", "/api/proyectos?limit=20", None
+
+
+def _list_proyectos_all(ctx, rng):
+    return "GET", "/api/proyectos", None
+
+
+def _list_proyectos_by_date(ctx, rng):
+    start = rng.randint(2019, 2025)
+    return "GET", f"/api/proyectos?order=-date&from={start}&to={start + 1}&limit=20", None
+
+
+def _get_proyecto(ctx, rng):
+    return "GET", f"/api/proyectos/{rng.choice(ctx.project_ids)}", None
+
+
+def _list_certifications(ctx, rng):
+    return "GET", "/api/certifications?limit=50", None
+
+
+def _portfolio(ctx, rng):
+    return "GET", "/api/portfolio", None
+
+
+def _search(ctx, rng):
+    return "GET", f"/api/search?q={rng.choice(WORDS)}", None
+
+
+def _update_proyecto(ctx, rng):
+    body = {"status": rng.choice(["En Producción", "En Desarrollo", "Producción Interna"])}
+    return "PUT", f"/api/proyectos/{rng.choice(ctx.project_ids)}", body
+
+
+def _create_certification(ctx, rng):
+    body = {"title": f"Bench {rng.random():.8f}", "issuer": "Load Test", "date": "2026"}
+    return "POST", "/api/certifications", body
+
+
+def _reorder_certifications(ctx, rng):
+    ids = rng.sample(ctx.cert_ids, min(20, len(ctx.cert_ids)))
+    return "POST", "/api/certifications/bulk", {"order": ids}
+
+
+SCENARIOS = {
+    "list_proyectos": _list_proyectos,
+    "list_proyectos_all": _list_proyectos_all,
+    "list_proyectos_by_date": _list_proyectos_by_date,
+    "get_proyecto": _get_proyecto,
+    "list_certifications": _list_certifications,
+    "portfolio": _portfolio,
+    "search": _search,
+    "update_proyecto": _update_proyecto,
+    "create_certification": _create_certification,
+    "reorder_certifications": _reorder_certifications,
+}
+
+MIXES = {
+    "public": "list_proyectos=35,get_proyecto=30,list_certifications=15,portfolio=10,search=8,list_proyectos_all=2",
+    "admin": "update_proyecto=50,create_certification=30,reorder_certifications=20",
+    "mixed": "list_proyectos=30,get_proyecto=25,list_certifications=12,portfolio=8,search=8,"
+             "list_proyectos_all=2,update_proyecto=8,create_certification=4,reorder_certifications=3",
+}
+
+
+def parse_mix(spec: str) -> dict:
+    weights = {}
+    for part in MIXES.get(spec, spec).split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in SCENARIOS:
+            raise SystemExit(f"Unknown scenario: {name!r} (available: {', '.join(SCENARIOS)})")
+        weights[name] = float(weight or 1)
+    return weights
+
+
+# ---------- Carga ----------
+
+def percentile(sorted_values: list, pct: float) -> float:
+    """Percentil por rango más cercano (sobre una lista ya ordenada)"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, round(pct / 100 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+async def load_context(client) -> Context:
+    async def ids(path):
+        resp = await client.get(path, params={"fields": "id"})
+        resp.raise_for_status()
+        return [row["id"] for row in resp.json()]
+
+    project_ids, cert_ids = await ids("/api/proyectos"), await ids("/api/certifications")
+    if not project_ids or not cert_ids:
+        raise SystemExit("Empty dataset: run `python benchmarks/load_test.py seed` first")
+    return Context(project_ids, cert_ids)
+
+
+async def run_load(url: str, weights: dict, concurrency: int, duration: float, warmup: float, seed_value: int):
+    import httpx
+
+    samples = defaultdict(list)   # escenario -> latencias (s)
+    errors = defaultdict(int)
+    routes = {}
+    names, weight_values = list(weights), list(weights.values())
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=url, timeout=30, limits=limits) as client:
+        ctx = await load_context(client)
+        start = time.perf_counter()
+        measure_from, deadline = start + warmup, start + warmup + duration
+
+        async def worker(index: int):
+            rng = random.Random(seed_value * 1000 + index)
+            while True:
+                now = time.perf_counter()
+                if now >= deadline:
+                    return
+                name = rng.choices(names, weight_values)[0]
+                method, path, body = SCENARIOS[name](ctx, rng)
+                routes.setdefault(name, (method, re.sub(r"/\d+", "/{id}", path.split("?")[0])))
+                began = time.perf_counter()
+                try:
+                    resp = await client.request(method, path, json=body)
+                    failed = resp.status_code >= 400
+                except httpx.HTTPError:
+                    failed = True
+                if began >= measure_from:
+                    samples[name].append(time.perf_counter() - began)
+                    if failed:
+                        errors[name] += 1
+
+        await asyncio.gather(*(worker(i) for i in range(concurrency)))
+
+    return samples, errors, routes
+
+
+def summarize(samples: dict, errors: dict, routes: dict, duration: float) -> dict:
+    def stats(values):
+        ordered = sorted(values)
+        return {
+            "mean": round(statistics.fmean(ordered) * 1000, 3) if ordered else 0.0,
+            "p50": round(percentile(ordered, 50) * 1000, 3),
+            "p95": round(percentile(ordered, 95) * 1000, 3),
+            "p99": round(percentile(ordered, 99) * 1000, 3),
+            "max": round(ordered[-1] * 1000, 3) if ordered else 0.0,
+        }
+
+    result = {}
+    for name in sorted(samples):
+        method, path = routes[name]
+        result[name] = {
+            "method": method,
+            "path": path,
+            "requests": len(samples[name]),
+            "errors": errors.get(name, 0),
+            "rps": round(len(samples[name]) / duration, 2),
+            "latency_ms": stats(samples[name]),
+        }
+    everything = [value for values in samples.values() for value in values]
+    totals = {
+        "requests": len(everything),
+        "errors": sum(errors.values()),
+        "rps": round(len(everything) / duration, 2),
+        "latency_ms": stats(everything),
+    }
+    return {"routes": result, "totals": totals}
+
+
+def start_server(port: int, workers: int):
+    """uvicorn local sin rate limiting (la carga sale toda de una IP)"""
+    env = dict(os.environ, RATE_LIMIT_ENABLED="0")
+    command = [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port),
+               "--workers", str(workers), "--log-level", "warning", "--no-access-log"]
+    proc = subprocess.Popen(command, cwd=ROOT, env=env, stdout=subprocess.DEVNULL)
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/health", timeout=1) as resp:
+                if resp.status == 200:
+                    return proc
+        except OSError:
+            time.sleep(0.1)
+    proc.terminate()
+    raise SystemExit("API did not start")
+
+
+def git_commit() -> str:
+    try:
+        out = subprocess.run(["git", "describe", "--always", "--dirty"], cwd=ROOT, capture_output=True, text=True)
+        return out.stdout.strip() or "unknown"
+    except OSError:
+        return "unknown"
+
+
+def database_kind() -> str:
+    from app.db import DATABASE_URL
+
+    return DATABASE_URL.split("://", 1)[0].split("+", 1)[0]
+
+
+def print_report(report: dict):
+    print(f"{'route':<24}{'req':>8}{'err':>6}{'rps':>9}{'p50':>9}{'p95':>9}{'p99':>9}  (ms)")
+    rows = list(report["routes"].items()) + [("TOTAL", report["totals"])]
+    for name, data in rows:
+        latency = data["latency_ms"]
+        print(f"{name:<24}{data['requests']:>8}{data['errors']:>6}{data['rps']:>9.1f}"
+              f"{latency['p50']:>9.1f}{latency['p95']:>9.1f}{latency['p99']:>9.1f}")
+
+
+def run(args):
+    weights = parse_mix(args.mix)
+    proc = None if args.url else start_server(args.port, args.workers)
+    url = args.url or f"http://127.0.0.1:{args.port}"
+    try:
+        samples, errors, routes = asyncio.run(
+            run_load(url, weights, args.concurrency, args.duration, args.warmup, args.seed)
+        )
+    finally:
+        if proc:
+            proc.terminate()
+            proc.wait()
+
+    report = summarize(samples, errors, routes, args.duration)
+    report["meta"] = {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "git_commit": git_commit(),
+        "database": database_kind() if not args.url else "external",
+        "url": url,
+        "workers": args.workers if not args.url else None,
+        "concurrency": args.concurrency,
+        "duration_s": args.duration,
+        "warmup_s": args.warmup,
+        "mix": weights,
+        "seed": args.seed,
+        "python": platform.python_version(),
+    }
+    print_report(report)
+    if args.out:
+        os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok=True)
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, sort_keys=True, ensure_ascii=False)
+            f.write("\n")
+        print(f"✅ Resultado en {args.out}")
+
+
+def compare(args):
+    with open(args.old, encoding="utf-8") as f:
+        old = json.load(f)
+    with open(args.new, encoding="utf-8") as f:
+        new = json.load(f)
+
+    def change(before, after):
+        return f"{(after - before) / before * 100:+.1f}%" if before else "n/a"
+
+    print(f"{old['meta']['git_commit']} -> {new['meta']['git_commit']}")
+    print(f"{'route':<24}{'rps':>10}{'p50':>10}{'p95':>10}{'p99':>10}")
+    old_rows = dict(old["routes"], TOTAL=old["totals"])
+    new_rows = dict(new["routes"], TOTAL=new["totals"])
+    for name in [name for name in new_rows if name in old_rows]:
+        before, after = old_rows[name], new_rows[name]
+        print(f"{name:<24}{change(before['rps'], after['rps']):>10}"
+              + "".join(f"{change(before['latency_ms'][p], after['latency_ms'][p]):>10}" for p in ("p50", "p95", "p99")))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    seed_parser = commands.add_parser("seed", help="Cargar datos sintéticos")
+    seed_parser.add_argument("--projects", type=int, default=5000)
+    seed_parser.add_argument("--certs", type=int, default=2000)
+    seed_parser.add_argument("--seed", type=int, default=42)
+    seed_parser.add_argument("--reset", action="store_true", help="Borrar proyectos y certificaciones antes")
+    seed_parser.set_defaults(func=seed)
+
+    run_parser = commands.add_parser("run", help="Correr la carga")
+    run_parser.add_argument("--url", help="API ya corriendo (por defecto levanta uvicorn local)")
+    run_parser.add_argument("--port", type=int, default=8766)
+    run_parser.add_argument("--workers", type=int, default=1, help="Workers de uvicorn (solo sin --url)")
+    run_parser.add_argument("--mix", default="mixed", help=f"Perfil ({', '.join(MIXES)}) o escenario=peso,...")
+    run_parser.add_argument("--concurrency", type=int, default=16)
+    run_parser.add_argument("--duration", type=float, default=30)
+    run_parser.add_argument("--warmup", type=float, default=5)
+    run_parser.add_argument("--seed", type=int, default=42)
+    run_parser.add_argument("--out", help="Archivo JSON de resultados")
+    run_parser.set_defaults(func=run)
+
+    compare_parser = commands.add_parser("compare", help="Comparar dos resultados JSON")
+    compare_parser.add_argument("old")
+    compare_parser.add_argument("new")
+    compare_parser.set_defaults(func=compare)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+"""
+Fixtures comunes: la app contra una BD SQLite y un directorio de subidas temporales.
+
+Las variables de entorno se fijan antes de importar app.* (los módulos las leen al
+importarse).
+"""
+import io
+import os
+import tempfile
+
+import pytest
+
+_TMP = tempfile.mkdtemp(prefix="portafolio-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_TMP, 'test.db')}"
+os.environ["UPLOADS_DIR"] = os.path.join(_TMP, "uploads")
+os.environ["STORAGE_BACKEND"] = "local"
+os.environ["INTERNAL_TOKEN"] = "test-token"
+os.environ.setdefault("FRONTEND_URL", "http://localhost:3000")
+
+
+@pytest.fixture(scope="session")
+def client():
+    from fastapi.testclient import TestClient
+    from app.db import init_db
+    from app.images import shutdown_pool
+    from app.main import app
+
+    init_db()
+    with TestClient(app) as test_client:
+        yield test_client
+    shutdown_pool()
+
+
+@pytest.fixture
+def jpeg_bytes():
+    from PIL import Image
+
+    buffer = io.BytesIO()
+    Image.new("RGB", (1200, 800), (200, 30, 40)).save(buffer, "JPEG")
+    return buffer.getvalue()
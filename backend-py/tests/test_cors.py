@@ -0,0 +1,15 @@
+from app.api.upload import UPLOAD_MAX_BYTES
+
+ORIGIN = "http://localhost:3000"
+
+
+def test_early_413_carries_cors_headers(client):
+    # BodySizeLimitMiddleware responde por el Content-Length sin leer el cuerpo
+    response = client.post(
+        "/api/upload",
+        content=b"x",
+        headers={"Origin": ORIGIN, "Content-Type": "application/octet-stream",
+                 "Content-Length": str(UPLOAD_MAX_BYTES + 1)},
+    )
+    assert response.status_code == 413
+    assert response.headers["access-control-allow-origin"] == ORIGIN
@@ -0,0 +1,49 @@
+import json
+
+PROYECTO = {
+    "title": "Demo", "category": "web", "status": "online", "version": "1.0",
+    "description": "Proyecto de prueba", "demo_url": "https://demo", "repo_url": "https://repo",
+    "stack": '["FastAPI"]',
+}
+
+
+def _upload(client, data):
+    response = client.post("/api/upload", files={"file": ("foto.jpg", data, "image/jpeg")})
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_file_info_by_url_and_sha(client, jpeg_bytes):
+    uploaded = _upload(client, jpeg_bytes)
+
+    by_url = client.get("/api/upload/info", params={"url": uploaded["url"]}).json()
+    by_sha = client.get("/api/upload/info", params={"sha256": uploaded["sha256"]}).json()
+    assert by_url == by_sha
+    assert by_url["variants"] == uploaded["variants"]
+    assert by_url["placeholder"] == uploaded["placeholder"]
+    assert client.get("/api/upload/info", params={"url": "https://nope"}).status_code == 404
+
+
+def test_proyecto_payloads_include_image_variants(client, jpeg_bytes):
+    uploaded = _upload(client, jpeg_bytes)
+    media = json.dumps([{"type": "image", "url": uploaded["url"]}])
+    created = client.post("/api/proyectos", json={**PROYECTO, "image_url": uploaded["url"], "media": media}).json()
+
+    detail = client.get(f"/api/proyectos/{created['id']}").json()
+    listed = next(row for row in client.get("/api/proyectos").json() if row["id"] == created["id"])
+    snapshot = client.get("/api/portfolio", params={"include": "proyectos"}).json()
+    in_portfolio = next(row for row in snapshot["proyectos"] if row["id"] == created["id"])
+
+    for payload in (detail, listed, in_portfolio):
+        image = payload["images"][uploaded["url"]]
+        assert image["variants"] == uploaded["variants"]
+        assert image["placeholder"] == uploaded["placeholder"]
+        assert (image["width"], image["height"]) == (1200, 800)
+
+
+def test_blog_payloads_include_images_from_content(client, jpeg_bytes):
+    uploaded = _upload(client, jpeg_bytes)
+    created = client.post("/api/blog/", json={"title": "Post", "content": f"Texto ![foto]({uploaded['url']})"}).json()
+
+    detail = client.get(f"/api/blog/{created['id']}").json()
+    assert detail["images"][uploaded["url"]]["variants"] == uploaded["variants"]
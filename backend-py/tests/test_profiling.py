@@ -0,0 +1,19 @@
+import pytest
+
+from app import profiling
+
+
+def _scope(**headers):
+    return {"type": "http", "path": "/api/proyectos",
+            "headers": [(name.replace("_", "-").encode(), value.encode()) for name, value in headers.items()]}
+
+
+@pytest.mark.parametrize("headers, expected", [
+    ({"x_profile": "1", "x_internal_token": "test-token"}, True),
+    ({"x_profile": "1", "authorization": "Bearer test-token"}, True),
+    ({"x_profile": "1", "authorization": "Bearer wrong"}, False),
+    ({"x_profile": "1"}, False),
+])
+def test_explicit_profile_requires_internal_token(monkeypatch, headers, expected):
+    monkeypatch.setattr(profiling, "PROFILING_ENABLED", True)
+    assert profiling.wants_profile(_scope(**headers)) is expected
@@ -0,0 +1,14 @@
+from tests.test_images import PROYECTO
+
+
+def test_sqlite_ranks_keep_their_order(client):
+    titles = ["zeppelin zeppelin zeppelin", "zeppelin python", "zeppelin"]
+    for title in titles:
+        response = client.post("/api/proyectos", json={**PROYECTO, "title": title, "image_url": "https://img"})
+        assert response.status_code == 200
+
+    results = client.get("/api/search", params={"q": "zeppelin", "type": "proyecto"}).json()["results"]
+    ranks = [result["rank"] for result in results]
+    assert len(results) == len(titles)
+    assert ranks == sorted(ranks, reverse=True)
+    assert len(set(ranks)) == len(ranks)
@@ -0,0 +1,39 @@
+import gzip
+from urllib.parse import urlparse
+
+from app.static import IMMUTABLE, cache_control_for
+
+SHA = "ab" * 32
+
+
+def test_hashed_names_are_immutable():
+    assert cache_control_for(f"{SHA}.jpg") == IMMUTABLE
+    assert cache_control_for(f"{SHA}-w640-webp.webp") == IMMUTABLE
+    assert cache_control_for(f"{SHA}-w320-avif.avif") == IMMUTABLE
+    assert cache_control_for("logo.png") != IMMUTABLE
+
+
+def test_uploaded_variant_is_served_immutable(client, jpeg_bytes):
+    response = client.post("/api/upload", files={"file": ("foto.jpg", jpeg_bytes, "image/jpeg")})
+    assert response.status_code == 200
+    variants = response.json()["variants"]
+    assert variants
+
+    served = client.get(urlparse(variants[0]["url"]).path)
+    assert served.status_code == 200
+    assert "immutable" in served.headers["cache-control"]
+
+
+def test_identity_response_varies_when_precompressed_sibling_exists(client):
+    from app.storage import UPLOADS_DIR
+
+    UPLOADS_DIR.mkdir(parents=True, exist_ok=True)
+    (UPLOADS_DIR / "notas.txt").write_text("hola " * 100)
+    (UPLOADS_DIR / "notas.txt.gz").write_bytes(gzip.compress(b"hola " * 100))
+
+    compressed = client.get("/uploads/notas.txt", headers={"Accept-Encoding": "gzip"})
+    identity = client.get("/uploads/notas.txt", headers={"Accept-Encoding": "identity"})
+    assert compressed.headers["content-encoding"] == "gzip"
+    assert "content-encoding" not in identity.headers
+    assert "Accept-Encoding" in compressed.headers["vary"]
+    assert "Accept-Encoding" in identity.headers["vary"]
@@ -0,0 +1,27 @@
+import asyncio
+
+from sqlalchemy import event
+
+from app import versions
+from app.db import async_engine
+
+
+def test_expired_snapshot_is_refreshed_once(client):
+    selects = []
+
+    def count(conn, cursor, statement, *args):
+        if "FROM table_version" in statement:
+            selects.append(statement)
+
+    async def concurrent_reads():
+        versions.mark_stale()
+        return await asyncio.gather(*(versions.current(["proyecto"]) for _ in range(20)))
+
+    event.listen(async_engine.sync_engine, "before_cursor_execute", count)
+    try:
+        results = client.portal.call(concurrent_reads)
+    finally:
+        event.remove(async_engine.sync_engine, "before_cursor_execute", count)
+
+    assert len(selects) == 1
+    assert len(set(results)) == 1